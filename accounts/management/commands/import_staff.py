@@ -0,0 +1,65 @@
+# accounts/management/commands/import_staff.py
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.staff_import import import_staff, parse_staff_csv
+from restaurant.models import Outlet
+
+
+class Command(BaseCommand):
+    """
+    Bulk create staff from a CSV (with a header line) or a JSON list
+
+    Columns: username, email, password, first_name, last_name, phone, role_id
+
+    Usage:
+        python manage.py import_staff staff.csv --created-by admin
+        python manage.py import_staff staff.json --created-by admin --outlet downtown
+        python manage.py import_staff staff.csv --created-by manager1 --dry-run
+    """
+    help = 'Import staff accounts from CSV / JSON (same role rules as the create user API)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or .json file')
+        parser.add_argument('--created-by', required=True, help='Username of the Admin / Manager importing')
+        parser.add_argument('--outlet', help="Outlet code (default: the creator's outlet)")
+        parser.add_argument('--dry-run', action='store_true', help='Only validate')
+
+    def handle(self, *args, **options):
+        creator = User.objects.select_related('profile').filter(username=options['created_by']).first()
+        if creator is None:
+            raise CommandError(f"User {options['created_by']} not found")
+
+        outlet = creator.profile.outlet
+        if options['outlet']:
+            if outlet is not None and outlet.code != options['outlet']:
+                raise CommandError(f'{creator.username} can only import staff into {outlet.code}')
+            outlet = Outlet.objects.filter(code=options['outlet']).first()
+            if outlet is None:
+                raise CommandError(f"Outlet {options['outlet']} not found")
+
+        try:
+            with open(options['path'], encoding='utf-8-sig') as f:
+                text = f.read()
+            rows = json.loads(text) if options['path'].lower().endswith('.json') else parse_staff_csv(text)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read {options["path"]}: {e}')
+        if not isinstance(rows, list):
+            raise CommandError('A JSON file must contain a list of users')
+
+        start = time.perf_counter()
+        created, errors = import_staff(rows, creator, outlet=outlet, dry_run=options['dry_run'])
+        if errors:
+            for error in errors:
+                self.stderr.write(f"Row {error['row']} ({error['username']}): {error['message']}")
+            raise CommandError(f'{len(errors)} of {len(rows)} rows are invalid, no users were created')
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'✅ All {len(rows)} rows are valid'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ Created {len(created)} users in {time.perf_counter() - start:.1f}s'
+            ))
@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-19 11:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_alter_userprofile_options_userprofile_created_by'),
+        ('restaurant', '0007_outlets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='outlet',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='staff', to='restaurant.outlet'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-19 13:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_userprofile_outlet'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DevicePin',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('device_id', models.UUIDField(unique=True)),
+                ('device_name', models.CharField(blank=True, max_length=100)),
+                ('pin_hash', models.CharField(max_length=255)),
+                ('failed_attempts', models.PositiveSmallIntegerField(default=0)),
+                ('locked_until', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='device_pins', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'device_pins',
+            },
+        ),
+    ]
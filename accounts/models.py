@@ -15,6 +15,14 @@ class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     role_id = models.IntegerField(choices=ROLE_CHOICES)
     phone = models.CharField(max_length=15, blank=True, null=True)
+    # Outlet the staff member works in; empty for Admins who span all outlets
+    outlet = models.ForeignKey(
+        'restaurant.Outlet',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='staff'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(
         User, 
@@ -32,6 +40,29 @@ class UserProfile(models.Model):
         ordering = ['-created_at']
 
 
+class DevicePin(models.Model):
+    """
+    Short PIN login bound to one tablet.
+    The PIN is hashed together with a random device secret that only the
+    tablet holds, so the cheap PIN hash cannot be brute-forced from the
+    database alone. Repeated wrong PINs lock the device out for a while.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='device_pins')
+    device_id = models.UUIDField(unique=True)
+    device_name = models.CharField(max_length=100, blank=True)
+    pin_hash = models.CharField(max_length=255)
+    failed_attempts = models.PositiveSmallIntegerField(default=0)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.device_name or self.device_id}"
+    
+    class Meta:
+        db_table = 'device_pins'
+
+
 # Signal to automatically create profile when User is created
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -0,0 +1,55 @@
+# accounts/pins.py
+"""
+Device-bound PIN hashing.
+
+PINs use PBKDF2 like passwords, but with far fewer iterations
+(settings.PIN_HASH_ITERATIONS) so a shift-start login storm stays cheap.
+That is only safe because the hashed value is ``device_secret + pin``: the
+256-bit device secret lives on the tablet, not in the database.
+The iteration count is stored in each hash, so changing the setting only
+affects PINs set afterwards.
+"""
+import base64
+import hashlib
+import secrets
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare, get_random_string, pbkdf2
+
+
+PIN_ALGORITHM = 'pbkdf2_sha256'
+
+
+def pin_iterations():
+    return getattr(settings, 'PIN_HASH_ITERATIONS', 20000)
+
+
+def new_device_secret():
+    return secrets.token_urlsafe(32)
+
+
+def is_valid_pin(pin):
+    length = getattr(settings, 'PIN_LENGTH', (4, 6))
+    return isinstance(pin, str) and pin.isdigit() and length[0] <= len(pin) <= length[1]
+
+
+def _digest(device_secret, pin, salt, iterations):
+    value = pbkdf2(f'{device_secret}:{pin}', salt, iterations, digest=hashlib.sha256)
+    return base64.b64encode(value).decode('ascii')
+
+
+def make_pin_hash(device_secret, pin):
+    salt = get_random_string(16)
+    iterations = pin_iterations()
+    return f'{PIN_ALGORITHM}${iterations}${salt}${_digest(device_secret, pin, salt, iterations)}'
+
+
+def check_pin(device_secret, pin, encoded):
+    try:
+        algorithm, iterations, salt, digest = encoded.split('$', 3)
+        iterations = int(iterations)
+    except ValueError:
+        return False
+    if algorithm != PIN_ALGORITHM:
+        return False
+    return constant_time_compare(digest, _digest(device_secret, pin, salt, iterations))
@@ -0,0 +1,222 @@
+# accounts/staff_import.py
+"""
+Bulk staff import (CSV or JSON) for onboarding an outlet.
+
+Rows are validated up front - usernames and emails against the database in
+one query - and nothing is written unless every row is valid. Passwords are
+hashed in a process pool (the hashing is deliberately slow, ~0.5s each), then
+users and profiles are written with two bulk_create calls.
+
+Models are imported inside functions: pool processes import this module
+without Django set up.
+"""
+import csv
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.db import transaction
+from django.db.models import Q
+
+
+STAFF_FIELDS = ['username', 'email', 'password', 'first_name', 'last_name', 'phone', 'role_id']
+
+# Same rules as create_user: Admin creates anyone, Manager only Waiter / Cashier
+CREATABLE_ROLES = {
+    1: [1, 2, 3, 4],
+    2: [3, 4],
+}
+
+
+def parse_staff_csv(text):
+    """Rows of a CSV with a header line (see STAFF_FIELDS)"""
+    reader = csv.DictReader(io.StringIO(text))
+    return [{key.strip(): (value or '').strip() for key, value in row.items() if key} for row in reader]
+
+
+def validate_staff_rows(rows, creator_role):
+    """
+    Returns (staff, errors): cleaned rows, and {'row', 'username', 'message'}
+    for every invalid one (rows are numbered from 1)
+    """
+    from django.contrib.auth.models import User
+
+    allowed_roles = CREATABLE_ROLES.get(creator_role)
+    staff, errors = [], []
+
+    def error(number, row, message):
+        errors.append({'row': number, 'username': row.get('username'), 'message': message})
+
+    seen_usernames, seen_emails = set(), set()
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append({'row': number, 'username': None, 'message': 'Row must be an object'})
+            continue
+
+        username = str(row.get('username') or '').strip()
+        email = str(row.get('email') or '').strip()
+        password = str(row.get('password') or '')
+        try:
+            role_id = int(row.get('role_id'))
+        except (TypeError, ValueError):
+            role_id = None
+
+        if not username or not password or not role_id:
+            error(number, row, 'Username, password, and role are required')
+            continue
+        if role_id not in [1, 2, 3, 4]:
+            error(number, row, 'Invalid role_id')
+            continue
+        if allowed_roles is None:
+            error(number, row, 'You do not have permission to create users')
+            continue
+        if role_id not in allowed_roles:
+            error(number, row, 'Managers can only create Waiter and Cashier accounts')
+            continue
+        if username in seen_usernames:
+            error(number, row, 'Username appears more than once in the file')
+            continue
+        if email and email.lower() in seen_emails:
+            error(number, row, 'Email appears more than once in the file')
+            continue
+
+        seen_usernames.add(username)
+        if email:
+            seen_emails.add(email.lower())
+        staff.append({
+            'row': number,
+            'username': username,
+            'email': email,
+            'password': password,
+            'first_name': str(row.get('first_name') or ''),
+            'last_name': str(row.get('last_name') or ''),
+            'phone': str(row.get('phone') or ''),
+            'role_id': role_id,
+        })
+
+    # One query for every username / email already taken
+    taken = User.objects.filter(
+        Q(username__in=[person['username'] for person in staff])
+        | Q(email__in=[person['email'] for person in staff if person['email']])
+    ).values_list('username', 'email')
+    taken_usernames = {username for username, _ in taken}
+    taken_emails = {email.lower() for _, email in taken if email}
+
+    valid = []
+    for person in staff:
+        if person['username'] in taken_usernames:
+            error(person['row'], person, 'Username already exists')
+        elif person['email'] and person['email'].lower() in taken_emails:
+            error(person['row'], person, 'Email already exists')
+        else:
+            valid.append(person)
+
+    errors.sort(key=lambda entry: entry['row'])
+    return valid, errors
+
+
+# ---------- password hashing pool ----------
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def get_hash_pool():
+    """Process pool for password hashing, created on first use (spawned: no forked DB connections)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=_setting('STAFF_IMPORT_HASH_WORKERS', None),
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+    return _pool
+
+
+def _encode(hasher, password):
+    # Hashers need no settings, so pool processes do not set Django up
+    return hasher.encode(password, hasher.salt())
+
+
+def hash_passwords(passwords):
+    """Hash with the project's default hasher, in the pool (inline for a single password)"""
+    global _pool
+    hasher = get_hasher('default')
+    if len(passwords) <= 1:
+        return [_encode(hasher, password) for password in passwords]
+    try:
+        return list(get_hash_pool().map(_encode, [hasher] * len(passwords), passwords))
+    except BrokenProcessPool:
+        # A worker died: start a fresh pool next time
+        _pool = None
+        raise
+
+
+# ---------- import ----------
+
+def import_staff(rows, creator, outlet=None, dry_run=False):
+    """
+    Validate and create staff accounts, all or nothing.
+    Returns (created, errors); nothing is written when errors is not empty.
+    """
+    from django.contrib.auth.models import User
+    from .models import UserProfile
+
+    staff, errors = validate_staff_rows(rows, creator.profile.role_id)
+    if errors or dry_run or not staff:
+        return [], errors
+
+    hashes = hash_passwords([person['password'] for person in staff])
+
+    with transaction.atomic():
+        User.objects.bulk_create([
+            User(
+                username=person['username'],
+                email=person['email'],
+                password=password_hash,
+                first_name=person['first_name'],
+                last_name=person['last_name'],
+                # Managers get admin-site access, as in create_user
+                is_staff=person['role_id'] == 2,
+            )
+            for person, password_hash in zip(staff, hashes)
+        ])
+        # bulk_create() does not return ids on every backend: read them back
+        user_ids = dict(
+            User.objects.filter(username__in=[person['username'] for person in staff])
+            .values_list('username', 'id')
+        )
+        # bulk_create() skips the post_save signal, so profiles are created here
+        UserProfile.objects.bulk_create([
+            UserProfile(
+                user_id=user_ids[person['username']],
+                role_id=person['role_id'],
+                phone=person['phone'],
+                outlet=outlet,
+                created_by=creator,
+            )
+            for person in staff
+        ])
+
+    role_names = dict(UserProfile.ROLE_CHOICES)
+    created = [
+        {
+            'id': user_ids[person['username']],
+            'username': person['username'],
+            'email': person['email'],
+            'role_id': person['role_id'],
+            'role_name': role_names[person['role_id']],
+            'outlet': outlet.code if outlet else None,
+        }
+        for person in staff
+    ]
+    return created, errors
@@ -1,3 +1,103 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import DevicePin
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    PIN_HASH_ITERATIONS=1,
+    PIN_MAX_ATTEMPTS=3,
+)
+class PinLoginTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='pin_waiter', password='pw12345!x')
+        self.user.profile.role_id = 3
+        self.user.profile.save()
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post(reverse('setup_pin'), {'pin': '4821', 'device_name': 'Tablet 1'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.device = response.data['data']
+
+    def _pin_login(self, pin, device_secret=None):
+        return APIClient().post(reverse('pin_login'), {
+            'username': 'pin_waiter',
+            'device_id': self.device['device_id'],
+            'device_secret': device_secret or self.device['device_secret'],
+            'pin': pin,
+        }, format='json')
+
+    def test_correct_pin_logs_in(self):
+        response = self._pin_login('4821')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['role_id'], 3)
+        self.assertIn('token', response.data)
+
+    def test_wrong_device_secret_is_rejected(self):
+        response = self._pin_login('4821', device_secret='not-this-tablet')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(DevicePin.objects.get().failed_attempts, 1)
+
+    def test_device_locks_after_max_attempts(self):
+        for _ in range(2):
+            self.assertEqual(self._pin_login('0000').status_code, 401)
+        # The third wrong PIN locks the device; it still answers 401 itself
+        self.assertEqual(self._pin_login('0000').status_code, 401)
+
+        device = DevicePin.objects.get()
+        self.assertIsNotNone(device.locked_until)
+        self.assertEqual(device.failed_attempts, 0)
+
+        response = self._pin_login('4821')
+        self.assertEqual(response.status_code, 423)
+        self.assertFalse(response.data['success'])
+
+    def test_successful_login_resets_failed_attempts(self):
+        self._pin_login('0000')
+        self._pin_login('0000')
+        self.assertEqual(self._pin_login('4821').status_code, 200)
+        self.assertEqual(DevicePin.objects.get().failed_attempts, 0)
+        # Two more wrong PINs do not reach the limit again
+        self._pin_login('0000')
+        self._pin_login('0000')
+        self.assertEqual(self._pin_login('4821').status_code, 200)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class RefreshTokenTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='refresh_cashier', password='pw12345!x')
+        self.user.profile.role_id = 4
+        self.user.profile.save()
+
+        response = APIClient().post(reverse('login'), {
+            'username': 'refresh_cashier', 'password': 'pw12345!x',
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.refresh = response.data['refresh']
+
+    def _refresh(self, token):
+        return APIClient().post(reverse('token_refresh'), {'refresh': token}, format='json')
+
+    def test_refresh_rotates_the_token(self):
+        response = self._refresh(self.refresh)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('token', response.data)
+        self.assertNotEqual(response.data['refresh'], self.refresh)
+
+    def test_rotated_refresh_token_is_blacklisted(self):
+        rotated = self._refresh(self.refresh).data['refresh']
+
+        response = self._refresh(self.refresh)
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(response.data['success'])
+
+        # The new token keeps working
+        self.assertEqual(self._refresh(rotated).status_code, 200)
+
+    def test_missing_refresh_token(self):
+        self.assertEqual(self._refresh('').status_code, 400)
@@ -1,10 +1,17 @@
 # accounts/urls.py
 from django.urls import path
-from .views import login_view, create_user, get_users, delete_user
+from .views import (
+    login_view, refresh_token_view, setup_pin, pin_login,
+    create_user, import_staff, get_users, delete_user,
+)
 
 urlpatterns = [
     path('login/', login_view, name='login'),
+    path('token/refresh/', refresh_token_view, name='token_refresh'),
+    path('pin/setup/', setup_pin, name='setup_pin'),
+    path('pin/login/', pin_login, name='pin_login'),
     path('users/create/', create_user, name='create_user'),
+    path('users/import/', import_staff, name='import_staff'),
     path('users/', get_users, name='get_users'),
     path('users/delete/<int:user_id>/', delete_user, name='delete_user'),
 ]
\ No newline at end of file
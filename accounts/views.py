@@ -5,8 +5,21 @@ from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
-from .models import UserProfile
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
+from .models import UserProfile, DevicePin
+from .pins import is_valid_pin, make_pin_hash, check_pin, new_device_secret
+from .staff_import import CREATABLE_ROLES, parse_staff_csv, import_staff as run_staff_import
 from django.db import transaction
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from datetime import timedelta
+import json
+import math
+import uuid
+from restaurant.models import Outlet
+from restaurant.fieldsets import Fieldset, Field
 
 
 @api_view(['POST'])
@@ -34,6 +47,7 @@ def create_user(request):
         last_name = request.data.get('last_name', '')
         phone = request.data.get('phone', '')
         role_id = request.data.get('role_id')
+        outlet_id = request.data.get('outlet_id')
 
         print("Requested role_id (raw):", role_id, type(role_id))
         try:
@@ -73,6 +87,16 @@ def create_user(request):
                 'message': 'You do not have permission to create users'
             }, status=403)
         
+        # Staff join the creator's outlet; an Admin without one picks it (or the user spans all)
+        outlet = current_user.profile.outlet
+        if outlet is None and outlet_id:
+            outlet = Outlet.objects.filter(id=outlet_id).first()
+            if outlet is None:
+                return Response({
+                    'success': False,
+                    'message': 'Outlet not found'
+                }, status=404)
+        
         # Check if username already exists
         if User.objects.filter(username=username).exists():
             return Response({
@@ -112,6 +136,7 @@ def create_user(request):
                 defaults={
                     'role_id': role_id,
                     'phone': phone,
+                    'outlet': outlet,
                     'created_by': current_user
                 }
             )
@@ -125,7 +150,8 @@ def create_user(request):
                 'email': user.email,
                 'role_id': role_id,
                 'role_name': profile.get_role_id_display(),
-                'phone': phone
+                'phone': phone,
+                'outlet': outlet.code if outlet else None
             }
         }, status=201)
         
@@ -136,12 +162,116 @@ def create_user(request):
         }, status=500)
 
 
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def import_staff(request):
+    """
+    Bulk create staff from a CSV / JSON file upload ("file") or a JSON list ("users")
+    Columns: username, email, password, first_name, last_name, phone, role_id
+    Same role rules as create_user; nothing is created unless every row is valid.
+    "dry_run": true only validates.
+    Access: Admin, Manager
+    """
+    try:
+        current_user = request.user
+        if current_user.profile.role_id not in CREATABLE_ROLES:
+            return Response({
+                'success': False,
+                'message': 'You do not have permission to create users'
+            }, status=403)
+
+        upload = request.FILES.get('file')
+        try:
+            if upload is not None:
+                text = upload.read().decode('utf-8-sig')
+                rows = json.loads(text) if upload.name.lower().endswith('.json') else parse_staff_csv(text)
+            else:
+                rows = request.data.get('users')
+        except (UnicodeDecodeError, ValueError) as e:
+            return Response({
+                'success': False,
+                'message': f'Could not read file: {str(e)}'
+            }, status=400)
+
+        if not isinstance(rows, list) or not rows:
+            return Response({
+                'success': False,
+                'message': 'Upload a CSV / JSON file or send a non-empty users list'
+            }, status=400)
+
+        max_rows = getattr(settings, 'STAFF_IMPORT_MAX_ROWS', 500)
+        if len(rows) > max_rows:
+            return Response({
+                'success': False,
+                'message': f'At most {max_rows} users per import'
+            }, status=400)
+
+        # Same outlet rule as create_user
+        outlet = current_user.profile.outlet
+        outlet_id = request.data.get('outlet_id')
+        if outlet is None and outlet_id:
+            outlet = Outlet.objects.filter(id=outlet_id).first()
+            if outlet is None:
+                return Response({
+                    'success': False,
+                    'message': 'Outlet not found'
+                }, status=404)
+
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        created, errors = run_staff_import(rows, current_user, outlet=outlet, dry_run=dry_run)
+
+        if errors:
+            return Response({
+                'success': False,
+                'message': f'{len(errors)} of {len(rows)} rows are invalid, no users were created',
+                'errors': errors
+            }, status=400)
+
+        if dry_run:
+            return Response({
+                'success': True,
+                'message': f'All {len(rows)} rows are valid',
+                'data': []
+            })
+
+        return Response({
+            'success': True,
+            'message': f'{len(created)} users created successfully',
+            'data': created
+        }, status=201)
+
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': f'Error importing users: {str(e)}'
+        }, status=500)
+
+
+ROLE_NAMES = dict(UserProfile.ROLE_CHOICES)
+
+USER_FIELDS = Fieldset(
+    id=Field('id'),
+    username=Field('username'),
+    email=Field('email'),
+    first_name=Field('first_name'),
+    last_name=Field('last_name'),
+    role_id=Field('profile__role_id'),
+    role_name=Field('profile__role_id', render=lambda row: ROLE_NAMES.get(row['profile__role_id'])),
+    phone=Field('profile__phone'),
+    outlet=Field('profile__outlet__code'),
+    created_at=Field('profile__created_at'),
+    is_active=Field('is_active'),
+)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_users(request):
     """
     Get all users
     Only Admin and Manager can view users
+    Supports ?fields= (see restaurant/fieldsets.py)
     """
     try:
         current_role = request.user.profile.role_id
@@ -153,26 +283,18 @@ def get_users(request):
                 'message': 'You do not have permission to view users'
             }, status=403)
         
-        # Get all users with profiles
-        users = User.objects.select_related('profile').all()
+        # Users with profiles (only their own outlet's staff for outlet-bound users)
+        users = User.objects.filter(profile__isnull=False)
+        if request.user.profile.outlet_id is not None:
+            users = users.filter(profile__outlet_id=request.user.profile.outlet_id)
         
-        users_data = []
-        for user in users:
-            try:
-                users_data.append({
-                    'id': user.id,
-                    'username': user.username,
-                    'email': user.email,
-                    'first_name': user.first_name,
-                    'last_name': user.last_name,
-                    'role_id': user.profile.role_id,
-                    'role_name': user.profile.get_role_id_display(),
-                    'phone': user.profile.phone,
-                    'created_at': user.profile.created_at,
-                    'is_active': user.is_active
-                })
-            except:
-                continue
+        try:
+            users_data = USER_FIELDS.apply(request, users)
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'message': str(e)
+            }, status=400)
         
         return Response({
             'success': True,
@@ -233,6 +355,22 @@ def delete_user(request, user_id):
         }, status=500)
 
 
+def _login_response(user, profile):
+    """JWT pair and user info returned by every login flow"""
+    refresh = RefreshToken.for_user(user)
+    
+    return Response({
+        'success': True,
+        'token': str(refresh.access_token),
+        'refresh': str(refresh),
+        'role_id': profile.role_id,
+        'username': user.username,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name
+    })
+
+
 @api_view(['POST'])
 @permission_classes([])
 def login_view(request):
@@ -255,30 +393,173 @@ def login_view(request):
         # Check if user has profile
         try:
             profile = user.profile
-            role_id = profile.role_id
         except:
             return Response({
                 'success': False,
                 'message': 'User profile not found'
             }, status=400)
         
-        # Generate JWT token
-        refresh = RefreshToken.for_user(user)
-        
-        return Response({
-            'success': True,
-            'token': str(refresh.access_token),
-            'refresh': str(refresh),
-            'role_id': role_id,
-            'username': user.username,
-            'email': user.email,
-            'first_name': user.first_name,
-            'last_name': user.last_name
-        })
+        return _login_response(user, profile)
     else:
         return Response({
             'success': False,
             'message': 'Invalid username or password'
         }, status=401)
+
+
+@api_view(['POST'])
+@permission_classes([])
+def refresh_token_view(request):
+    """
+    Exchange a refresh token for a new access token (no password hashing)
+    With ROTATE_REFRESH_TOKENS a new refresh token is returned too and the
+    old one is blacklisted, so an active tablet's session slides forward
+    """
+    refresh = request.data.get('refresh')
+    
+    if not refresh:
+        return Response({
+            'success': False,
+            'message': 'Refresh token required'
+        }, status=400)
+    
+    serializer = TokenRefreshSerializer(data={'refresh': refresh})
+    try:
+        serializer.is_valid(raise_exception=True)
+    except (TokenError, InvalidToken):
+        return Response({
+            'success': False,
+            'message': 'Refresh token is invalid or expired'
+        }, status=401)
     
+    return Response({
+        'success': True,
+        'token': serializer.validated_data['access'],
+        'refresh': serializer.validated_data.get('refresh', refresh)
+    })
 
+
+# ==================== PIN LOGIN ====================
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def setup_pin(request):
+    """
+    Register this tablet for PIN login (after a normal password login)
+    Returns device_id and device_secret once; the tablet stores both
+    Send an existing device_id to change the PIN of that device
+    Access: All roles
+    """
+    try:
+        pin = str(request.data.get('pin', ''))
+        if not is_valid_pin(pin):
+            length = getattr(settings, 'PIN_LENGTH', (4, 6))
+            return Response({
+                'success': False,
+                'message': f'PIN must be {length[0]}-{length[1]} digits'
+            }, status=400)
+        
+        device = None
+        if request.data.get('device_id'):
+            try:
+                device = DevicePin.objects.get(user=request.user, device_id=request.data['device_id'])
+            except (DevicePin.DoesNotExist, ValueError, ValidationError):
+                return Response({
+                    'success': False,
+                    'message': 'Device not found'
+                }, status=404)
+        
+        device_secret = new_device_secret()
+        if device is None:
+            device = DevicePin(user=request.user, device_id=uuid.uuid4())
+        device.device_name = request.data.get('device_name', device.device_name)
+        device.pin_hash = make_pin_hash(device_secret, pin)
+        device.failed_attempts = 0
+        device.locked_until = None
+        device.save()
+        
+        return Response({
+            'success': True,
+            'message': 'PIN login enabled for this device',
+            'data': {
+                'device_id': str(device.device_id),
+                'device_secret': device_secret
+            }
+        }, status=201)
+        
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+@api_view(['POST'])
+@permission_classes([])
+def pin_login(request):
+    """
+    Login with username + PIN on a registered tablet (device_id + device_secret)
+    Locks the device for PIN_LOCKOUT_MINUTES after PIN_MAX_ATTEMPTS wrong PINs
+    """
+    username = request.data.get('username')
+    device_id = request.data.get('device_id')
+    device_secret = request.data.get('device_secret')
+    pin = str(request.data.get('pin', ''))
+    
+    if not username or not device_id or not device_secret or not pin:
+        return Response({
+            'success': False,
+            'message': 'username, device_id, device_secret and pin required'
+        }, status=400)
+    
+    invalid = Response({
+        'success': False,
+        'message': 'Invalid PIN login'
+    }, status=401)
+    
+    try:
+        device_id = uuid.UUID(str(device_id))
+    except ValueError:
+        return invalid
+    
+    with transaction.atomic():
+        device = (
+            DevicePin.objects.select_for_update()
+            .select_related('user', 'user__profile')
+            .filter(device_id=device_id, user__username=username)
+            .first()
+        )
+        if device is None or not device.user.is_active:
+            return invalid
+        
+        now = timezone.now()
+        if device.locked_until and device.locked_until > now:
+            minutes = math.ceil((device.locked_until - now).total_seconds() / 60)
+            return Response({
+                'success': False,
+                'message': f'Too many wrong PINs. Try again in {minutes} minute(s) or log in with your password'
+            }, status=423)
+        
+        if not check_pin(device_secret, pin, device.pin_hash):
+            device.failed_attempts += 1
+            max_attempts = getattr(settings, 'PIN_MAX_ATTEMPTS', 5)
+            if device.failed_attempts >= max_attempts:
+                device.failed_attempts = 0
+                device.locked_until = now + timedelta(minutes=getattr(settings, 'PIN_LOCKOUT_MINUTES', 15))
+            device.save(update_fields=['failed_attempts', 'locked_until'])
+            return invalid
+        
+        device.failed_attempts = 0
+        device.locked_until = None
+        device.last_used_at = now
+        device.save(update_fields=['failed_attempts', 'locked_until', 'last_used_at'])
+    
+    try:
+        profile = device.user.profile
+    except UserProfile.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'User profile not found'
+        }, status=400)
+    
+    return _login_response(device.user, profile)
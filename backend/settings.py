@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -38,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'accounts',
     'restaurant',
@@ -45,13 +47,18 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'restaurant.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'restaurant.outlets.OutletMiddleware',
+    'restaurant.replicas.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Last: runs the view itself when a request asks to be profiled
+    'restaurant.profiling.ProfilingMiddleware',
 ]
 
 CORS_ALLOWED_ORIGINS = [
@@ -70,6 +77,92 @@ REST_FRAMEWORK = {
     ),
 }
 
+# JWT: short access tokens, rotating refresh tokens (each refresh returns a
+# new refresh token and blacklists the old one), so a tablet in use stays
+# logged in through a shift without re-entering its password
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
+    'REFRESH_TOKEN_LIFETIME': timedelta(hours=12),
+    'ROTATE_REFRESH_TOKENS': True,
+    'BLACKLIST_AFTER_ROTATION': True,
+}
+
+# Device-bound PIN login (accounts/pins.py)
+PIN_LENGTH = (4, 6)              # min / max digits
+PIN_HASH_ITERATIONS = 20000      # PBKDF2 iterations; passwords use Django's default (1,000,000+)
+PIN_MAX_ATTEMPTS = 5             # wrong PINs before the device is locked
+PIN_LOCKOUT_MINUTES = 15
+
+# Bulk staff import: passwords are hashed in a process pool
+STAFF_IMPORT_MAX_ROWS = 500
+STAFF_IMPORT_HASH_WORKERS = None   # pool processes; None = one per CPU
+
+# Idempotency-Key support on mutating restaurant endpoints
+IDEMPOTENCY_KEY_TTL_HOURS = 24          # how long a stored response is replayed
+IDEMPOTENCY_WAIT_TIMEOUT_SECONDS = 10   # how long a duplicate waits for the in-flight request
+IDEMPOTENCY_LOCK_TIMEOUT_SECONDS = 60   # in-flight keys older than this are treated as abandoned
+
+# Maximum operations accepted in one offline tablet sync
+SYNC_MAX_OPERATIONS = 500
+
+# Response compression: gzip, or brotli when the optional `brotli` package is installed
+COMPRESSION_MIN_BYTES = 1024         # smaller responses are sent uncompressed
+COMPRESSION_BROTLI_QUALITY = 5       # 0-11; higher is smaller but slower
+
+# Menu search: in-memory index per outlet, also rebuilt this often to pick up
+# menu changes made through other worker processes
+MENU_SEARCH_MAX_AGE_SECONDS = 60
+
+# Admin changelists of orders / bills count exactly up to this many rows,
+# then use the database's row estimate (restaurant/admin.py)
+ADMIN_EXACT_COUNT_LIMIT = 10000
+
+# Order event journal (restaurant/events.py)
+ORDER_EVENT_SETTLE_SECONDS = 2        # tails only return events at least this old (late commits)
+ORDER_EVENT_COMPACT_AFTER_DAYS = 30   # paid bills' events are collapsed into one snapshot
+ORDER_EVENT_RETENTION_DAYS = 365      # events older than this are deleted
+
+# Receipt rendering (text / ESC/POS / PDF) in a process pool
+RECEIPT_RENDER_WORKERS = None             # pool processes; None = one per CPU
+RECEIPT_RENDER_TIMEOUT_SECONDS = 10
+RECEIPT_CACHE_SECONDS = 7 * 24 * 3600     # rendered receipts of paid bills
+
+# Worker start-up: server workers (backend/wsgi.py, backend/asgi.py) warm imports,
+# menu indexes and the overdue scheduler in a background thread, started right
+# after the fork under gunicorn --preload, else on the worker's first request
+# (restaurant/startup.py). Set RESTAURANT_PREWARM=0 in the environment to skip it.
+PREWARM_ON_STARTUP = True
+
+# On-demand request profiling (?profile=sampling|deterministic, restaurant/profiling.py)
+PROFILE_DIR = BASE_DIR / 'profiles'      # newest PROFILE_RING_SIZE profiles are kept here
+PROFILE_RING_SIZE = 50
+PROFILE_DEFAULT_MODE = 'sampling'        # used for ?profile=1
+PROFILE_SAMPLE_INTERVAL_MS = 1
+PROFILE_TOKEN_MAX_AGE_SECONDS = 3600     # X-Profile-Token from `manage.py profile_token`
+
+# Reservations: best-fit table allocator with per-worker interval indexes (restaurant/reservations.py)
+RESERVATION_DEFAULT_MINUTES = 90         # window booked when no duration is given
+RESERVATION_LIVE_MINUTES = 30            # slots starting this soon need a table that is free right now
+RESERVATION_MAX_MINUTES = 360           # longest booking; a day's index also holds the next morning up to this
+RESERVATION_INDEX_MAX_AGE_SECONDS = 30   # how often each worker reloads bookings made by other workers
+
+# Walk-in waitlist: wait quotes from per-worker turn-time medians (restaurant/turn_times.py)
+TURN_TIME_WINDOW_DAYS = 28               # rolling window of paid bills the medians cover
+TURN_TIME_REFRESH_SECONDS = 900          # how often each worker recomputes them
+TURN_TIME_MIN_SAMPLES = 5                # fewer turns in a bucket/hour cell -> bucket median, then the default
+TURN_TIME_DEFAULT_MINUTES = 60
+
+# Kitchen prep forecasts, fitted by `manage.py refresh_forecasts` (restaurant/forecasting.py;
+# needs the optional `numpy` package, the prep endpoint does not)
+FORECAST_HISTORY_DAYS = 730              # order history the model learns from
+FORECAST_ALPHA = 0.3                     # weight of the latest week; older weeks decay by (1 - alpha)
+FORECAST_WINDOW_HOURS = 4                # default service window of the prep endpoint
+
+# Overdue bill alerts
+OVERDUE_BILL_MINUTES = 30            # pending longer than this -> overdue
+OVERDUE_RESYNC_SECONDS = 60          # how often each worker reloads pending bills from the DB
+OVERDUE_SSE_HEARTBEAT_SECONDS = 15   # keep-alive interval on the alert stream
+
 ROOT_URLCONF = 'backend.urls'
 
 TEMPLATES = [
@@ -104,6 +197,36 @@ DATABASES = {
     }
 }
 
+# Multi-outlet: each outlet's tables, menu, orders and bills can live on its
+# own database. Map outlet codes to aliases in DATABASES; unmapped outlets
+# (and all users / outlets themselves) stay in 'default'. Every alias needs
+# the full schema: python manage.py migrate --database <alias>
+#
+# Example with local SQLite files:
+#   DATABASES['outlet_downtown'] = {
+#       'ENGINE': 'django.db.backends.sqlite3',
+#       'NAME': BASE_DIR / 'outlet_downtown.sqlite3',
+#   }
+#   OUTLET_DATABASES = {'downtown': 'outlet_downtown'}
+DEFAULT_OUTLET_CODE = 'main'
+OUTLET_DATABASES = {}
+
+# Read replicas: safe (GET) requests read from a replica of the database they
+# would otherwise use; a client is pinned to the primary for
+# REPLICA_PIN_SECONDS after it writes. Migrations skip replica aliases.
+# Local testing with two SQLite files (python manage.py simulate_replication --lag 3):
+#
+#   DATABASES = {
+#       'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'primary.sqlite3'},
+#       'replica': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'replica.sqlite3',
+#                   'TEST': {'MIRROR': 'default'}},
+#   }
+#   REPLICA_DATABASES = {'default': ['replica']}
+REPLICA_DATABASES = {}
+REPLICA_PIN_SECONDS = 5
+
+DATABASE_ROUTERS = ['restaurant.replicas.ReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -12,5 +12,7 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Server process: prewarm each worker in the background (restaurant/startup.py)
+os.environ.setdefault('RESTAURANT_PREWARM', '1')
 
 application = get_wsgi_application()
@@ -1,8 +1,68 @@
 # restaurant/admin.py
+from django.conf import settings
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from .models import Table, MenuItem, Order, OrderItem, Bill
 
 
+class EstimatedCountPaginator(Paginator):
+    """
+    Changelist paginator for tables with millions of rows.
+
+    Counts exactly up to settings.ADMIN_EXACT_COUNT_LIMIT rows (a bounded
+    COUNT over a LIMIT subquery, so it never scans further). Past that, an
+    unfiltered changelist uses the database's own row estimate (PostgreSQL
+    reltuples / MySQL TABLE_ROWS); a filtered one stops at the limit - narrow
+    the filter (or use the date hierarchy) to page further.
+    """
+
+    def _exact_limit(self):
+        return getattr(settings, 'ADMIN_EXACT_COUNT_LIMIT', 10000)
+
+    def _is_unfiltered(self):
+        model = self.object_list.model
+        return self.object_list.query.where == model._default_manager.all().query.where
+
+    def _estimated_rows(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        table = queryset.model._meta.db_table
+        if connection.vendor == 'postgresql':
+            sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+        elif connection.vendor == 'mysql':
+            sql = ('SELECT TABLE_ROWS FROM information_schema.TABLES '
+                   'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s')
+        else:
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+        # reltuples is -1 before the first ANALYZE
+        return row[0] if row and row[0] and row[0] > 0 else None
+
+    @cached_property
+    def count(self):
+        limit = self._exact_limit()
+        count = self.object_list.order_by()[:limit].count()
+        if count < limit:
+            return count
+        if self._is_unfiltered():
+            estimate = self._estimated_rows()
+            if estimate is not None:
+                return max(estimate, limit)
+        return limit
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    """Changelist defaults for large tables: no full COUNT(*), estimated pagination"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # Order / Bill managers return ProbedDatesQuerySet (restaurant/models.py),
+    # whose datetimes() keeps the date hierarchy off SELECT DISTINCT
+
+
 @admin.register(Table)
 class TableAdmin(admin.ModelAdmin):
     list_display = ['table_number', 'seating_capacity', 'status', 'created_at']
@@ -21,21 +81,30 @@ class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 0
     readonly_fields = ['subtotal']
+    autocomplete_fields = ['menu_item']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('menu_item')
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(ScalableAdmin):
     list_display = ['id', 'table', 'status', 'created_by', 'total_amount', 'created_at']
     list_filter = ['status', 'created_at']
+    list_select_related = ['table', 'created_by']
     search_fields = ['table__table_number']
+    date_hierarchy = 'created_at'
+    autocomplete_fields = ['table', 'created_by']
+    raw_id_fields = ['bill']
     inlines = [OrderItemInline]
 
 
 @admin.register(Bill)
-class BillAdmin(admin.ModelAdmin):
+class BillAdmin(ScalableAdmin):
     list_display = ['id', 'table', 'total_amount', 'status', 'generated_at', 'paid_at']
     list_filter = ['status', 'generated_at']
+    list_select_related = ['table']
     search_fields = ['table__table_number']
+    date_hierarchy = 'generated_at'
+    autocomplete_fields = ['table', 'generated_by']
     readonly_fields = ['subtotal', 'tax_amount', 'total_amount']
-
-    
\ No newline at end of file
@@ -0,0 +1,131 @@
+# restaurant/amendments.py
+"""
+Order amendments: add lines, change a line's quantity, void a line.
+
+An amendment never re-reads the order's other lines. It changes the
+OrderItem rows it touches and moves Order.total_amount by the difference
+with one delta UPDATE (total_amount = total_amount + delta), in one
+transaction, so it costs the same on an order of 2 lines as of 200.
+
+The order UPDATE only matches an unbilled order (is_billed = False): once
+a bill has taken the order, amendments are refused. Bill.calculate_bill()
+locks the orders it bills, so an amendment running at the same time waits
+for the bill and is then refused, instead of changing a billed total.
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from .events import order_amended_event, record_events
+from .models import MenuItem, Order, OrderItem
+from .money import add_paise, from_paise, line_subtotal, to_paise
+from .outlets import outlet_atomic
+
+
+def parse_quantity(value):
+    """Positive int quantity, or ValueError"""
+    try:
+        quantity = int(value)
+    except (TypeError, ValueError):
+        quantity = 0
+    if quantity < 1:
+        raise ValueError('Quantity must be at least 1')
+    return quantity
+
+
+def _move_total(order_id, delta_paise):
+    """
+    total_amount += delta on the order, only while it is unbilled (this also
+    takes the order's row lock). Raises Order.DoesNotExist / ValueError.
+    """
+    updated = Order.objects.filter(id=order_id, is_billed=False).update(
+        total_amount=add_paise('total_amount', delta_paise),
+        # update() skips auto_now; bump updated_at for sync cursors
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        if Order.objects.filter(id=order_id).exists():
+            raise ValueError('Order is already billed')
+        raise Order.DoesNotExist('Order not found')
+
+
+def _finish(order_id, lines, delta_paise, user):
+    """Record the event; returns the order's new total"""
+    order = Order.objects.values('outlet_id', 'total_amount').get(id=order_id)
+    record_events([order_amended_event(order_id, order['outlet_id'], lines, from_paise(delta_paise), user)])
+    return order['total_amount']
+
+
+def add_items(order_id, items, user=None):
+    """
+    Add lines ([{menu_item_id, quantity}, ...]) to an unbilled order.
+    Returns (new OrderItems, order total).
+    """
+    if not items:
+        raise ValueError('Items required')
+    try:
+        menu_item_ids = [int(item.get('menu_item_id')) for item in items]
+    except (TypeError, ValueError):
+        raise MenuItem.DoesNotExist('Menu item not found')
+    wanted = [
+        (menu_item_id, parse_quantity(item.get('quantity')))
+        for menu_item_id, item in zip(menu_item_ids, items)
+    ]
+    menu_items = MenuItem.objects.in_bulk(menu_item_ids)
+    if len(menu_items) < len(set(menu_item_ids)):
+        raise MenuItem.DoesNotExist('Menu item not found')
+
+    # bulk_create skips OrderItem.save(), so price the lines here
+    lines = [
+        OrderItem(
+            order_id=order_id,
+            menu_item=menu_items[menu_item_id],
+            quantity=quantity,
+            price_at_order=menu_items[menu_item_id].price,
+            subtotal=line_subtotal(menu_items[menu_item_id].price, quantity),
+        )
+        for menu_item_id, quantity in wanted
+    ]
+    delta = sum(to_paise(line.subtotal) for line in lines)
+
+    with outlet_atomic():
+        _move_total(order_id, delta)
+        OrderItem.objects.bulk_create(lines)
+        total = _finish(
+            order_id, [(line.menu_item_id, line.quantity, line.price_at_order) for line in lines], delta, user
+        )
+    return lines, total
+
+
+def _locked_line(order_id, item_id):
+    return (
+        OrderItem.objects.select_for_update()
+        .only('id', 'menu_item_id', 'quantity', 'price_at_order', 'subtotal')
+        .get(id=item_id, order_id=order_id)
+    )
+
+
+def change_quantity(order_id, item_id, quantity, user=None):
+    """Set a line's quantity on an unbilled order. Returns (OrderItem, order total)."""
+    quantity = parse_quantity(quantity)
+    with outlet_atomic():
+        line = _locked_line(order_id, item_id)
+        change = quantity - line.quantity
+        delta = to_paise(line.price_at_order) * change
+        _move_total(order_id, delta)
+        OrderItem.objects.filter(id=line.id).update(
+            quantity=F('quantity') + change,
+            subtotal=add_paise('subtotal', delta),
+        )
+        line.quantity, line.subtotal = quantity, from_paise(to_paise(line.subtotal) + delta)
+        total = _finish(order_id, [(line.menu_item_id, change, line.price_at_order)], delta, user)
+    return line, total
+
+
+def void_item(order_id, item_id, user=None):
+    """Remove a line from an unbilled order. Returns the order total."""
+    with outlet_atomic():
+        line = _locked_line(order_id, item_id)
+        delta = -to_paise(line.subtotal)
+        _move_total(order_id, delta)
+        OrderItem.objects.filter(id=line.id).delete()
+        return _finish(order_id, [(line.menu_item_id, -line.quantity, line.price_at_order)], delta, user)
@@ -7,5 +7,9 @@ class RestaurantConfig(AppConfig):
     name = 'restaurant'
 
     def ready(self):
-        """Import signals when app is ready"""
-        import restaurant.signals
\ No newline at end of file
+        """Import signals when app is ready; prewarm server workers (restaurant/startup.py)"""
+        import restaurant.signals
+        from .startup import should_prewarm, schedule_prewarm
+
+        if should_prewarm():
+            schedule_prewarm()
@@ -0,0 +1,167 @@
+# restaurant/archive.py
+"""
+Hot/cold archival of paid bills.
+
+Paid bills older than N days are moved, together with their orders and order
+items, from the live tables into the *_archive tables. Each batch is one
+transaction (copy then delete), so the job can be stopped at any point and
+simply re-run: whatever was already moved is no longer in the live tables.
+"""
+from datetime import timedelta
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils import timezone
+
+from .models import (
+    Outlet, Bill, Order, OrderItem,
+    ArchivedBill, ArchivedOrder, ArchivedOrderItem,
+)
+from .outlets import outlet_atomic, outlet_context
+
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 30
+DEFAULT_BATCH_SIZE = 500
+
+BILL_FIELDS = [
+    'id', 'outlet_id', 'table_id', 'subtotal', 'tax_percentage', 'tax_amount', 'total_amount',
+    'status', 'generated_at', 'paid_at', 'generated_by_id',
+]
+ORDER_FIELDS = [
+    'id', 'outlet_id', 'table_id', 'bill_id', 'status', 'created_by_id', 'total_amount',
+    'is_billed', 'client_uuid', 'created_at', 'updated_at',
+]
+ORDER_ITEM_FIELDS = [
+    'id', 'order_id', 'menu_item_id', 'quantity', 'price_at_order', 'subtotal', 'created_at',
+]
+
+
+def archivable_bills(older_than_days=DEFAULT_ARCHIVE_AFTER_DAYS):
+    """Paid bills whose payment is older than the cutoff"""
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    return Bill.objects.filter(status='Paid', paid_at__lt=cutoff)
+
+
+def archive_batch(bill_ids):
+    """
+    Move one batch of bills (with their orders and items) to the archive.
+    Returns (bills, orders, order_items) moved.
+    """
+    with outlet_atomic():
+        # Lock the batch so a concurrent run cannot move the same rows
+        bill_ids = list(
+            Bill.objects.select_for_update()
+            .filter(id__in=bill_ids, status='Paid')
+            .values_list('id', flat=True)
+        )
+        if not bill_ids:
+            return 0, 0, 0
+
+        bills = list(Bill.objects.filter(id__in=bill_ids).values(*BILL_FIELDS))
+        orders = list(Order.objects.filter(bill_id__in=bill_ids).values(*ORDER_FIELDS))
+        order_ids = [order['id'] for order in orders]
+        items = list(OrderItem.objects.filter(order_id__in=order_ids).values(*ORDER_ITEM_FIELDS))
+
+        # ignore_conflicts: a row left behind by an interrupted run on a
+        # non-transactional engine must not make the whole batch fail
+        ArchivedBill.objects.bulk_create(
+            [ArchivedBill(**bill) for bill in bills], ignore_conflicts=True
+        )
+        ArchivedOrder.objects.bulk_create(
+            [ArchivedOrder(**order) for order in orders], ignore_conflicts=True
+        )
+        ArchivedOrderItem.objects.bulk_create(
+            [ArchivedOrderItem(**item) for item in items], ignore_conflicts=True
+        )
+
+        OrderItem.objects.filter(order_id__in=order_ids).delete()
+        Order.objects.filter(id__in=order_ids).delete()
+        Bill.objects.filter(id__in=bill_ids).delete()
+
+    return len(bills), len(orders), len(items)
+
+
+def archive_paid_bills(older_than_days=DEFAULT_ARCHIVE_AFTER_DAYS,
+                       batch_size=DEFAULT_BATCH_SIZE, max_batches=None, progress=None):
+    """
+    Archive paid bills of the current outlet in batches of ``batch_size`` ordered by id.
+    ``max_batches`` bounds a single run; ``progress`` is called with the
+    running totals after every batch.
+    Returns a dict with the totals moved.
+    """
+    totals = {'bills': 0, 'orders': 0, 'order_items': 0, 'batches': 0}
+    last_id = 0
+
+    while max_batches is None or totals['batches'] < max_batches:
+        bill_ids = list(
+            archivable_bills(older_than_days)
+            .filter(id__gt=last_id)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not bill_ids:
+            break
+
+        bills, orders, items = archive_batch(bill_ids)
+        last_id = bill_ids[-1]
+
+        totals['bills'] += bills
+        totals['orders'] += orders
+        totals['order_items'] += items
+        totals['batches'] += 1
+
+        if progress:
+            progress(totals)
+
+    return totals
+
+
+def archive_all_outlets(outlets=None, **options):
+    """
+    Run archive_paid_bills() for every outlet (each on its own database).
+    Returns {outlet_code: totals}.
+    """
+    if outlets is None:
+        outlets = Outlet.objects.all()
+
+    results = {}
+    for outlet in outlets:
+        with outlet_context(outlet):
+            results[outlet.code] = archive_paid_bills(**options)
+    return results
+
+
+def get_bill_or_archived(bill_id):
+    """
+    Live bill if it exists, otherwise the archived one.
+    Both expose .table, .orders and order.order_items the same way.
+    Raises Bill.DoesNotExist when the bill is in neither.
+    """
+    bill = Bill.objects.filter(id=bill_id).first()
+    if bill is not None:
+        return bill
+
+    try:
+        return ArchivedBill.objects.get(id=bill_id)
+    except ArchivedBill.DoesNotExist:
+        raise Bill.DoesNotExist(f'Bill {bill_id} not found')
+
+
+# Archived rows keep the ids of tables and menu items that may be deleted
+# later (no DB constraint): fall back to the stored id instead of failing.
+
+def table_label(bill):
+    """Table number of a live or archived bill, or '#<table id>' once the table is gone"""
+    try:
+        table = bill.table
+    except ObjectDoesNotExist:
+        table = None
+    return table.table_number if table is not None else f'#{bill.table_id}'
+
+
+def menu_item_label(item):
+    """Menu item name of a live or archived order line, or 'Item #<id>' once the item is gone"""
+    try:
+        menu_item = item.menu_item
+    except ObjectDoesNotExist:
+        menu_item = None
+    return menu_item.name if menu_item is not None else f'Item #{item.menu_item_id}'
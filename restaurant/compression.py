@@ -0,0 +1,120 @@
+# restaurant/compression.py
+"""
+Negotiated response compression (brotli or gzip) for large responses.
+
+Responses smaller than COMPRESSION_MIN_BYTES are sent as-is: on small
+payloads the compression headers and CPU cost outweigh the savings.
+Brotli is used when the client accepts it and the optional ``brotli``
+package is installed; otherwise gzip. Streaming responses (exports, the
+overdue-bill event stream) are left alone.
+
+Like Django's GZipMiddleware, every compressed body carries up to
+RANDOM_PADDING_BYTES of random padding that decoders skip (a gzip file
+name, a brotli metadata block), so its length does not reveal how well
+secrets in the response compress against reflected input (BREACH).
+"""
+import re
+import secrets
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+# Same bound as django.middleware.gzip.GZipMiddleware (at most 256 here)
+RANDOM_PADDING_BYTES = 100
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _accepted_encodings(header):
+    """{encoding: q} from an Accept-Encoding header"""
+    accepted = {}
+    for part in header.split(','):
+        encoding, _, params = part.strip().partition(';')
+        encoding = encoding.strip().lower()
+        if not encoding:
+            continue
+        q = 1.0
+        match = re.search(r'q=([0-9.]+)', params)
+        if match:
+            try:
+                q = float(match.group(1))
+            except ValueError:
+                q = 0.0
+        accepted[encoding] = q
+    return accepted
+
+
+def choose_encoding(header):
+    """'br', 'gzip' or None for an Accept-Encoding header"""
+    accepted = _accepted_encodings(header or '')
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best = None
+    for encoding in candidates:
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > 0 and (best is None or q > best[1]):
+            best = (encoding, q)
+    return best[0] if best else None
+
+
+def _brotli_padding(max_bytes):
+    """
+    A metadata meta-block of 1..max_bytes random bytes (RFC 7932, 9.2):
+    ISLAST 0, MNIBBLES 0, MSKIPBYTES 1, the skip length, then the bytes
+    """
+    length = secrets.randbelow(max_bytes) + 1
+    header = (3 << 1) | (1 << 4) | ((length - 1) << 6)
+    return header.to_bytes(2, 'little') + secrets.token_bytes(length)
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=_setting('COMPRESSION_BROTLI_QUALITY', 5))
+        # flush() leaves the stream byte-aligned after its header, where a
+        # metadata block can go
+        head = compressor.process(b'') + compressor.flush()
+        return (
+            head + _brotli_padding(RANDOM_PADDING_BYTES)
+            + compressor.process(content) + compressor.finish()
+        )
+    return compress_string(content, max_random_bytes=RANDOM_PADDING_BYTES)
+
+
+class CompressionMiddleware:
+    """Compress non-streaming responses above COMPRESSION_MIN_BYTES"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        if len(response.content) < _setting('COMPRESSION_MIN_BYTES', 1024):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        if response.has_header('ETag'):
+            # The compressed body is a different representation
+            response['ETag'] = re.sub(r'^"', 'W/"', response['ETag'])
+        return response
@@ -0,0 +1,430 @@
+# restaurant/events.py
+"""
+Order event journal.
+
+Every order lifecycle change (order created, status changed, items amended,
+moved to another table, bill generated, bill paid) appends an OrderEvent in the same transaction as the change. The
+event id is a monotonically increasing sequence: consumers tail the journal
+from a checkpoint instead of re-scanning current state.
+
+Payloads are compact JSON with short keys:
+
+    order_created   {"t": table_id, "i": [[menu_item_id, quantity, price], ...], "a": total}
+    order_status    {"s": status}
+    order_amended   {"i": [[menu_item_id, quantity_delta, price], ...], "a": total_delta}
+    order_moved     {"f": from_table_id, "t": to_table_id}
+    bill_generated  {"o": [order_ids], "a": total}
+    bill_paid       {"o": [order_ids], "a": total}
+    bill_snapshot   {"o": {order_id: timeline}}   (compaction, see compact_events)
+
+The OrderTimeline table is derived from the journal only: apply_events()
+keeps it current from a checkpoint, replay_events() rebuilds it in bulk.
+"""
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import OrderEvent, EventCheckpoint, OrderTimeline
+from .money import from_paise, to_paise
+from .outlets import outlet_atomic
+
+
+EVENT_TYPES = [choice for choice, _ in OrderEvent.EVENT_CHOICES]
+
+TIMELINE_CONSUMER = 'order_timeline'
+TIMELINE_FIELDS = [
+    'table_id', 'status', 'item_count', 'total_amount', 'bill_id',
+    'placed_at', 'in_kitchen_at', 'served_at', 'billed_at', 'paid_at', 'last_sequence',
+]
+_TIMESTAMP_FIELDS = ['placed_at', 'in_kitchen_at', 'served_at', 'billed_at', 'paid_at']
+
+# Order status -> timeline column stamped when the order first reaches it
+_STATUS_STEPS = {
+    'Placed': 'placed_at',
+    'In Kitchen': 'in_kitchen_at',
+    'Served': 'served_at',
+}
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _dumps(payload):
+    return json.dumps(payload, separators=(',', ':'))
+
+
+# ---------- writing (call inside the change's transaction) ----------
+
+def order_created_event(order, lines, user=None):
+    """Unsaved event for a new order; ``lines`` are its OrderItems"""
+    return OrderEvent(
+        outlet_id=order.outlet_id,
+        event_type='order_created',
+        order_id=order.id,
+        user_id=user.id if user else None,
+        payload=_dumps({
+            't': order.table_id,
+            'i': [[line.menu_item_id, line.quantity, str(line.price_at_order)] for line in lines],
+            'a': str(order.total_amount),
+        }),
+    )
+
+
+def order_status_event(order, status, user=None):
+    return OrderEvent(
+        outlet_id=order.outlet_id,
+        event_type='order_status',
+        order_id=order.id,
+        user_id=user.id if user else None,
+        payload=_dumps({'s': status}),
+    )
+
+
+def order_amended_event(order_id, outlet_id, lines, delta, user=None):
+    """
+    Lines added, changed or voided on an order: ``lines`` are
+    (menu_item_id, quantity_delta, price), ``delta`` the change of its total
+    """
+    return OrderEvent(
+        outlet_id=outlet_id,
+        event_type='order_amended',
+        order_id=order_id,
+        user_id=user.id if user else None,
+        payload=_dumps({
+            'i': [[menu_item_id, quantity, str(price)] for menu_item_id, quantity, price in lines],
+            'a': str(delta),
+        }),
+    )
+
+
+def order_moved_event(order_id, outlet_id, from_table_id, to_table_id, user=None):
+    """Order reassigned to another table (transfer / merge)"""
+    return OrderEvent(
+        outlet_id=outlet_id,
+        event_type='order_moved',
+        order_id=order_id,
+        user_id=user.id if user else None,
+        payload=_dumps({'f': from_table_id, 't': to_table_id}),
+    )
+
+
+def bill_event(event_type, bill, order_ids, user=None):
+    """bill_generated / bill_paid for ``bill`` covering ``order_ids``"""
+    return OrderEvent(
+        outlet_id=bill.outlet_id,
+        event_type=event_type,
+        bill_id=bill.id,
+        user_id=user.id if user else None,
+        payload=_dumps({'o': sorted(order_ids), 'a': str(bill.total_amount)}),
+    )
+
+
+def record_events(events):
+    """Append events in one INSERT, in list order"""
+    if events:
+        OrderEvent.objects.bulk_create(events)
+
+
+# ---------- reading ----------
+
+def serialize_event(event):
+    return {
+        'sequence': event.id,
+        'type': event.event_type,
+        'order_id': event.order_id,
+        'bill_id': event.bill_id,
+        'user_id': event.user_id,
+        'recorded_at': event.recorded_at,
+        'payload': json.loads(event.payload),
+    }
+
+
+def read_events(after=0, limit=DEFAULT_BATCH_SIZE, settle=True):
+    """
+    Events of the current outlet with a sequence above ``after``, oldest first.
+
+    Sequences are assigned at insert, not at commit, so a slow transaction
+    can commit an event below one a consumer has already seen. With
+    ``settle`` only events older than ORDER_EVENT_SETTLE_SECONDS are
+    returned, which leaves such transactions time to commit.
+    """
+    events = OrderEvent.objects.filter(id__gt=after)
+    if settle:
+        cutoff = timezone.now() - timedelta(seconds=_setting('ORDER_EVENT_SETTLE_SECONDS', 2))
+        events = events.filter(recorded_at__lte=cutoff)
+    return list(events.order_by('id')[:limit])
+
+
+def get_checkpoint(consumer):
+    checkpoint = EventCheckpoint.objects.filter(consumer=consumer).first()
+    return checkpoint.sequence if checkpoint else 0
+
+
+def save_checkpoint(consumer, sequence, outlet_id):
+    EventCheckpoint.objects.update_or_create(
+        outlet_id=outlet_id, consumer=consumer, defaults={'sequence': sequence}
+    )
+
+
+# ---------- OrderTimeline projection ----------
+
+def _new_state(outlet_id):
+    return {'outlet_id': outlet_id, 'table_id': None, 'status': '', 'item_count': 0,
+            'total_amount': '0', 'bill_id': None, 'placed_at': None, 'in_kitchen_at': None,
+            'served_at': None, 'billed_at': None, 'paid_at': None, 'last_sequence': 0}
+
+
+def _event_order_ids(event, payload):
+    if event.order_id is not None:
+        return [event.order_id]
+    orders = payload.get('o') or []
+    return [int(order_id) for order_id in orders]
+
+
+def fold_event(states, event, load=None):
+    """
+    Apply one event to ``states`` ({order_id: timeline dict}). Orders not in
+    ``states`` are fetched with ``load(order_id)`` (or start empty).
+    """
+    payload = json.loads(event.payload)
+    for order_id in _event_order_ids(event, payload):
+        state = states.get(order_id)
+        if state is None:
+            state = (load(order_id) if load else None) or _new_state(event.outlet_id)
+            states[order_id] = state
+
+        if event.event_type == 'order_created':
+            state.update(
+                table_id=payload['t'],
+                status='Placed',
+                item_count=sum(quantity for _, quantity, _ in payload['i']),
+                total_amount=payload['a'],
+                placed_at=event.recorded_at,
+            )
+        elif event.event_type == 'order_status':
+            state['status'] = payload['s']
+            step = _STATUS_STEPS.get(payload['s'])
+            if step and state[step] is None:
+                state[step] = event.recorded_at
+        elif event.event_type == 'order_amended':
+            state['item_count'] += sum(quantity for _, quantity, _ in payload['i'])
+            state['total_amount'] = str(from_paise(to_paise(state['total_amount']) + to_paise(payload['a'])))
+        elif event.event_type == 'order_moved':
+            state['table_id'] = payload['t']
+        elif event.event_type == 'bill_generated':
+            state.update(bill_id=event.bill_id, billed_at=event.recorded_at)
+        elif event.event_type == 'bill_paid':
+            state.update(bill_id=event.bill_id, paid_at=event.recorded_at)
+        elif event.event_type == 'bill_snapshot':
+            snapshot = payload['o'][str(order_id)]
+            state.update(snapshot)
+            for field in _TIMESTAMP_FIELDS:
+                if isinstance(state[field], str):
+                    state[field] = parse_datetime(state[field])
+        state['last_sequence'] = event.id
+
+
+def _timeline_row(order_id, state):
+    return OrderTimeline(order_id=order_id, **{
+        field: state[field] for field in ['outlet_id'] + TIMELINE_FIELDS
+    })
+
+
+def apply_events(events):
+    """
+    Incrementally apply a batch of events to OrderTimeline: one read of the
+    touched rows, then one bulk insert and one bulk update
+    """
+    touched = set()
+    for event in events:
+        touched.update(_event_order_ids(event, json.loads(event.payload)))
+    existing = {
+        row['order_id']: row
+        for row in OrderTimeline.objects.filter(order_id__in=touched).values('order_id', 'outlet_id', *TIMELINE_FIELDS)
+    }
+
+    states = {}
+    for event in events:
+        fold_event(states, event, load=lambda order_id: existing.get(order_id))
+
+    rows = [_timeline_row(order_id, state) for order_id, state in states.items()]
+    OrderTimeline.objects.bulk_create([row for row in rows if row.order_id not in existing])
+    updated = [row for row in rows if row.order_id in existing]
+    if updated:
+        ids = dict(
+            OrderTimeline.objects.filter(order_id__in=[row.order_id for row in updated])
+            .values_list('order_id', 'id')
+        )
+        for row in updated:
+            row.id = ids[row.order_id]
+        OrderTimeline.objects.bulk_update(updated, TIMELINE_FIELDS)
+    return len(states)
+
+
+def project_events(outlet_id, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Bring the current outlet's OrderTimeline up to date from its checkpoint.
+    Each batch and the checkpoint are committed together (exactly once).
+    Returns the number of events applied.
+    """
+    applied = 0
+    while True:
+        with outlet_atomic():
+            after = get_checkpoint(TIMELINE_CONSUMER)
+            events = read_events(after, batch_size)
+            if not events:
+                return applied
+            apply_events(events)
+            save_checkpoint(TIMELINE_CONSUMER, events[-1].id, outlet_id)
+        applied += len(events)
+
+
+def replay_events(outlet_id, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Rebuild the current outlet's OrderTimeline from the journal: the table is
+    emptied, events are streamed in sequence order and rows are written with
+    bulk inserts as soon as an order is paid (open orders at the end).
+    Returns (events, orders).
+    """
+    with outlet_atomic():
+        OrderTimeline.objects.all().delete()
+        states, done = {}, {}
+        flushed, late = set(), []
+        events = orders = last = 0
+
+        for event in OrderEvent.objects.order_by('id').iterator(chunk_size=batch_size):
+            events += 1
+            last = event.id
+            if flushed.intersection(_event_order_ids(event, json.loads(event.payload))):
+                # Change to an order already written (e.g. status edited after payment)
+                late.append(event)
+                continue
+            fold_event(states, event)
+            if event.event_type in ('bill_paid', 'bill_snapshot'):
+                for order_id in _event_order_ids(event, json.loads(event.payload)):
+                    if order_id in states:
+                        done[order_id] = states.pop(order_id)
+            if len(done) >= batch_size:
+                OrderTimeline.objects.bulk_create([_timeline_row(*item) for item in done.items()])
+                orders += len(done)
+                flushed.update(done)
+                done = {}
+                if progress:
+                    progress(events, orders)
+
+        done.update(states)
+        OrderTimeline.objects.bulk_create(
+            [_timeline_row(*item) for item in done.items()], batch_size=batch_size
+        )
+        orders += len(done)
+        if late:
+            apply_events(late)
+        if last:
+            save_checkpoint(TIMELINE_CONSUMER, last, outlet_id)
+
+    return events, orders
+
+
+# ---------- retention ----------
+
+def _safe_sequence():
+    """Events up to this sequence have been read by every consumer"""
+    lowest = EventCheckpoint.objects.aggregate(lowest=Min('sequence'))['lowest']
+    if lowest is None:
+        # No consumers yet: nothing to wait for
+        return OrderEvent.objects.aggregate(last=Max('id'))['last'] or 0
+    return lowest
+
+
+def _snapshot_state(state):
+    return {
+        field: (value.isoformat() if field in _TIMESTAMP_FIELDS and value else value)
+        for field, value in state.items() if field in TIMELINE_FIELDS
+    }
+
+
+def compact_events(older_than_days=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Collapse the events of each paid bill older than the cutoff (its orders'
+    events, bill_generated, bill_paid) into one bill_snapshot event that
+    keeps the sequence of the last of them. Replays give the same timeline.
+    Only events every consumer has read are touched.
+    Returns (bills compacted, events removed).
+    """
+    days = _setting('ORDER_EVENT_COMPACT_AFTER_DAYS', 30) if older_than_days is None else older_than_days
+    cutoff = timezone.now() - timedelta(days=days)
+    safe = _safe_sequence()
+    bills = removed = 0
+    last_id = 0
+
+    while True:
+        paid = list(
+            OrderEvent.objects.filter(
+                event_type='bill_paid', recorded_at__lt=cutoff, id__gt=last_id, id__lte=safe
+            ).order_by('id')[:batch_size]
+        )
+        if not paid:
+            break
+        last_id = paid[-1].id
+
+        with outlet_atomic():
+            order_ids = {
+                order_id for event in paid for order_id in json.loads(event.payload)['o']
+            }
+            bill_ids = [event.bill_id for event in paid]
+            group = list(
+                OrderEvent.objects.filter(Q(order_id__in=order_ids) | Q(bill_id__in=bill_ids), id__lte=safe)
+                .order_by('id')
+            )
+
+            by_bill = {}
+            bill_of_order = {}
+            for event in paid:
+                for order_id in json.loads(event.payload)['o']:
+                    bill_of_order[order_id] = event.bill_id
+            for event in group:
+                bill_id = event.bill_id if event.order_id is None else bill_of_order.get(event.order_id)
+                by_bill.setdefault(bill_id, []).append(event)
+
+            keep, snapshots = [], []
+            for bill_id, events in by_bill.items():
+                states = {}
+                for event in events:
+                    fold_event(states, event)
+                last = max(events, key=lambda event: event.id)
+                last.event_type = 'bill_snapshot'
+                last.order_id = None
+                last.bill_id = bill_id
+                last.payload = _dumps({
+                    'o': {str(order_id): _snapshot_state(state) for order_id, state in states.items()}
+                })
+                keep.append(last.id)
+                snapshots.append(last)
+
+            OrderEvent.objects.bulk_update(snapshots, ['event_type', 'order_id', 'bill_id', 'payload'])
+            deleted, _ = OrderEvent.objects.filter(
+                id__in=[event.id for event in group]
+            ).exclude(id__in=keep).delete()
+
+        bills += len(snapshots)
+        removed += deleted
+
+    return bills, removed
+
+
+def purge_events(older_than_days=None):
+    """
+    Delete events older than ORDER_EVENT_RETENTION_DAYS that every consumer
+    has read. Returns the number deleted.
+    """
+    days = _setting('ORDER_EVENT_RETENTION_DAYS', 365) if older_than_days is None else older_than_days
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = OrderEvent.objects.filter(recorded_at__lt=cutoff, id__lte=_safe_sequence()).delete()
+    return deleted
@@ -0,0 +1,246 @@
+# restaurant/exports.py
+"""
+Streaming exports of Bill / Order / OrderItem rows for accounting.
+
+Rows are read in keyset-ordered chunks (``id > last_id ORDER BY id LIMIT n``)
+and written straight to the response, so memory stays flat no matter how
+many rows the date range covers.
+"""
+import csv
+import itertools
+import zlib
+from datetime import datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import (
+    Bill, Order, OrderItem,
+    ArchivedBill, ArchivedOrder, ArchivedOrderItem,
+)
+
+
+DEFAULT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = ['csv', 'ndjson']
+
+# Each export: live model and its archive counterpart, date column used for
+# ?from/?to, status column used for ?status, and the (header, lookup) pairs
+# fetched with values_list().
+EXPORTS = {
+    'bills': {
+        'model': Bill,
+        'archive_model': ArchivedBill,
+        'date_field': 'generated_at',
+        'status_field': 'status',
+        'columns': [
+            ('bill_id', 'id'),
+            ('table', 'table__table_number'),
+            ('subtotal', 'subtotal'),
+            ('tax_percentage', 'tax_percentage'),
+            ('tax_amount', 'tax_amount'),
+            ('total_amount', 'total_amount'),
+            ('status', 'status'),
+            ('generated_at', 'generated_at'),
+            ('paid_at', 'paid_at'),
+            ('generated_by', 'generated_by__username'),
+        ],
+    },
+    'orders': {
+        'model': Order,
+        'archive_model': ArchivedOrder,
+        'date_field': 'created_at',
+        'status_field': 'status',
+        'columns': [
+            ('order_id', 'id'),
+            ('table', 'table__table_number'),
+            ('bill_id', 'bill_id'),
+            ('status', 'status'),
+            ('is_billed', 'is_billed'),
+            ('total_amount', 'total_amount'),
+            ('created_by', 'created_by__username'),
+            ('created_at', 'created_at'),
+        ],
+    },
+    'order_items': {
+        'model': OrderItem,
+        'archive_model': ArchivedOrderItem,
+        'date_field': 'created_at',
+        'status_field': 'order__status',
+        'columns': [
+            ('order_item_id', 'id'),
+            ('order_id', 'order_id'),
+            ('table', 'order__table__table_number'),
+            ('menu_item', 'menu_item__name'),
+            ('category', 'menu_item__category'),
+            ('quantity', 'quantity'),
+            ('price_at_order', 'price_at_order'),
+            ('subtotal', 'subtotal'),
+            ('order_status', 'order__status'),
+            ('created_at', 'created_at'),
+        ],
+    },
+}
+
+
+class _Echo:
+    """Pseudo-buffer for csv.writer: write() hands the line straight back"""
+
+    def write(self, value):
+        return value
+
+
+def parse_export_bound(value, end_of_day=False):
+    """
+    Parse a ?from / ?to value (date or datetime) into an aware datetime.
+    A bare date covers the whole day, so ?to=2025-01-31 includes the 31st.
+    Raises ValueError on anything unparseable.
+    """
+    if not value:
+        return None
+
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid date: {value}')
+        parsed = datetime.combine(day, time.max if end_of_day else time.min)
+
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def build_export_queryset(export_name, date_from=None, date_to=None, status=None,
+                          archived=False):
+    """
+    Filtered, unordered queryset for one export (ordering is added per chunk).
+    ``archived=True`` builds the same query against the archive table.
+    """
+    spec = EXPORTS[export_name]
+    model = spec['archive_model'] if archived else spec['model']
+    queryset = model.objects.all()
+
+    if date_from is not None:
+        queryset = queryset.filter(**{f"{spec['date_field']}__gte": date_from})
+    if date_to is not None:
+        queryset = queryset.filter(**{f"{spec['date_field']}__lte": date_to})
+    if status:
+        queryset = queryset.filter(**{spec['status_field']: status})
+
+    return queryset
+
+
+def iter_export_rows(queryset, lookups, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield value tuples using keyset pagination on the primary key.
+
+    Every chunk is an independent ``WHERE id > last_id ORDER BY id LIMIT n``
+    query, so the database never holds a long-running cursor and the cost of
+    a chunk does not grow with how far into the export we are (unlike OFFSET).
+    """
+    fields = ['id'] + list(lookups)
+    last_id = 0
+
+    while True:
+        chunk = (
+            queryset.filter(id__gt=last_id)
+            .order_by('id')
+            .values_list(*fields)[:chunk_size]
+        )
+        count = 0
+        for row in chunk.iterator(chunk_size=chunk_size):
+            count += 1
+            last_id = row[0]
+            yield row[1:]
+
+        if count < chunk_size:
+            return
+
+
+def _format_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_csv(header, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([_format_value(value) for value in row])
+
+
+def iter_ndjson(header, rows):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(dict(zip(header, row))) + '\n'
+
+
+def iter_gzip(chunks, flush_bytes=64 * 1024):
+    """
+    Gzip a stream of text chunks on the fly.
+    Output is flushed every ``flush_bytes`` of input so the client keeps
+    receiving data instead of waiting for the whole export.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    pending = 0
+
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        pending += len(data)
+        out = compressor.compress(data)
+        if pending >= flush_bytes:
+            out += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if out:
+            yield out
+
+    yield compressor.flush()
+
+
+def stream_export(export_name, export_format='csv', date_from=None, date_to=None,
+                  status=None, compress=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Return an iterator over the encoded export (str chunks, or bytes if compressed)
+    """
+    spec = EXPORTS[export_name]
+    header = [name for name, _ in spec['columns']]
+    lookups = [lookup for _, lookup in spec['columns']]
+
+    # Live rows first, then archived history (ids never overlap)
+    rows = itertools.chain.from_iterable(
+        iter_export_rows(
+            build_export_queryset(export_name, date_from, date_to, status, archived=archived),
+            lookups,
+            chunk_size=chunk_size,
+        )
+        for archived in (False, True)
+    )
+
+    if export_format == 'ndjson':
+        chunks = iter_ndjson(header, rows)
+    else:
+        chunks = iter_csv(header, rows)
+
+    if compress:
+        return iter_gzip(chunks)
+    return chunks
+
+
+def export_filename(export_name, export_format, compress=False):
+    filename = f"{export_name}.{export_format}"
+    if compress:
+        filename += '.gz'
+    return filename
+
+
+def export_content_type(export_format, compress=False):
+    if compress:
+        return 'application/gzip'
+    if export_format == 'ndjson':
+        return 'application/x-ndjson'
+    return 'text/csv'
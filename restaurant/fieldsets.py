@@ -0,0 +1,100 @@
+# restaurant/fieldsets.py
+"""
+Sparse fieldsets for list endpoints.
+
+    ?fields=id,status          only these fields
+    ?include=items             nested lists to add (e.g. order items)
+
+Without either parameter an endpoint returns exactly what it always did.
+With ``fields`` only the listed fields are returned; nested lists are only
+loaded when named in ``fields`` or ``include``. The selection drives the
+query too: only the columns behind the selected fields are fetched (via
+``values()``) and nested lists are fetched in one extra query, or not at all.
+"""
+
+
+class Field:
+    """A response field: the columns it needs and how to render it from a values() row"""
+
+    def __init__(self, *columns, render=None):
+        self.columns = columns
+        self.render = render or (lambda row: row[columns[0]])
+
+
+def money(column):
+    return Field(column, render=lambda row: str(row[column]))
+
+
+class Nested:
+    """A nested list, loaded for all parent ids at once: loader(ids) -> {parent_id: [...]}"""
+
+    def __init__(self, loader):
+        self.loader = loader
+
+
+class Fieldset:
+    """Named Field / Nested entries of one endpoint's response items"""
+
+    def __init__(self, **fields):
+        self.fields = fields
+
+    def _names(self, value):
+        return [name.strip() for name in value.split(',') if name.strip()] if value else []
+
+    def select(self, request):
+        """
+        Field names selected by the request, in declaration order.
+        Raises ValueError on an unknown field.
+        """
+        fields = self._names(request.query_params.get('fields'))
+        include = self._names(request.query_params.get('include'))
+
+        unknown = [name for name in fields + include if name not in self.fields]
+        if unknown:
+            raise ValueError(
+                f"Unknown field(s): {', '.join(unknown)}. Choose from: {', '.join(self.fields)}"
+            )
+
+        if fields:
+            wanted = set(fields) | set(include)
+        elif include:
+            wanted = {
+                name for name, field in self.fields.items() if isinstance(field, Field)
+            } | set(include)
+        else:
+            wanted = set(self.fields)
+        return [name for name in self.fields if name in wanted]
+
+    def columns(self, selected):
+        """Columns to pass to values(); 'id' is always fetched to attach nested lists"""
+        columns = ['id']
+        for name in selected:
+            field = self.fields[name]
+            if isinstance(field, Field):
+                columns.extend(column for column in field.columns if column not in columns)
+        return columns
+
+    def serialize(self, rows, selected):
+        rows = list(rows)
+        nested = {
+            name: self.fields[name].loader([row['id'] for row in rows]) if rows else {}
+            for name in selected
+            if isinstance(self.fields[name], Nested)
+        }
+
+        data = []
+        for row in rows:
+            item = {}
+            for name in selected:
+                field = self.fields[name]
+                if isinstance(field, Nested):
+                    item[name] = nested[name].get(row['id'], [])
+                else:
+                    item[name] = field.render(row)
+            data.append(item)
+        return data
+
+    def apply(self, request, queryset):
+        """select() + values() + serialize() in one go. Raises ValueError on an unknown field."""
+        selected = self.select(request)
+        return self.serialize(queryset.values(*self.columns(selected)), selected)
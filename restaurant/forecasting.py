@@ -0,0 +1,184 @@
+# restaurant/forecasting.py
+"""
+Demand forecasting per menu item for kitchen prep.
+
+The refresh_forecasts batch job loads the order lines of the last
+FORECAST_HISTORY_DAYS (live and archived), grouped in the database by
+menu item, day and hour, into one NumPy array:
+
+    quantities[item, week, weekday, hour]     week 0 = the 7 days before today
+
+and fits every item at once: the forecast of a weekday / hour slot is an
+exponentially weighted average of that slot over past weeks, the latest
+week weighted FORECAST_ALPHA, the one before alpha * (1 - alpha), and so
+on. An item only averages over the weeks since it first sold, so new dishes
+are not diluted by the weeks before they existed. The fit is a single
+tensordot over the week axis.
+
+Results are stored in DemandForecast (one row per item and slot with a
+non-trivial forecast). The prep endpoint only sums those rows over the
+slots of the next service window, so requests never touch order history
+and do not need NumPy: it is an optional dependency, imported only when
+the batch job runs.
+"""
+from datetime import datetime, timedelta, time as day_time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Q, Sum
+from django.db.models.functions import ExtractHour, TruncDate
+from django.utils import timezone
+
+from .models import ArchivedOrderItem, DemandForecast, MenuItem, OrderItem
+from .outlets import get_current_outlet, get_default_outlet, outlet_atomic
+
+# Forecasts below this (items per hour) are not stored
+MIN_STORED_QUANTITY = 0.01
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def numpy():
+    """
+    The optional numpy package, imported on first use: only the batch job
+    needs it, and importing it at start-up would slow every worker's boot
+    """
+    try:
+        import numpy
+    except ImportError:  # optional dependency
+        raise ImproperlyConfigured('Demand forecasting needs the optional numpy package (pip install numpy)')
+    return numpy
+
+
+def _history_rows(model, since, until):
+    """(menu_item_id, day, hour, quantity) of one order-line table, grouped in the database"""
+    return (
+        model.objects.filter(created_at__gte=since, created_at__lt=until)
+        # Archived lines keep the ids of menu items deleted since (no DB
+        # constraint); DemandForecast rows can only point at live ones
+        .filter(menu_item_id__in=MenuItem.objects.values('id'))
+        .annotate(day=TruncDate('created_at'), hour=ExtractHour('created_at'))
+        .values('menu_item_id', 'day', 'hour')
+        .annotate(total=Sum('quantity'))
+        .values_list('menu_item_id', 'day', 'hour', 'total')
+        .order_by()
+    )
+
+
+def load_history(today, days):
+    """
+    Order-line quantities of the ``days`` complete days before ``today``
+    (live and archived) as parallel arrays: (menu_item_id, days_ago, hour, quantity)
+    """
+    np = numpy()
+    until = timezone.make_aware(datetime.combine(today, day_time.min))
+    since = until - timedelta(days=days)
+    rows = list(_history_rows(OrderItem, since, until)) + list(_history_rows(ArchivedOrderItem, since, until))
+    if not rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, np.zeros(0, dtype=np.float32)
+
+    item_ids, day_values, hours, quantities = zip(*rows)
+    days_ago = (np.datetime64(today, 'D') - np.array(day_values, dtype='datetime64[D]')).astype(np.int64)
+    return (
+        np.array(item_ids, dtype=np.int64),
+        days_ago,
+        np.array(hours, dtype=np.int64),
+        np.array(quantities, dtype=np.float32),
+    )
+
+
+def bucket_history(item_ids, days_ago, hours, quantities, today, weeks):
+    """
+    Sum the rows into quantities[item, week, weekday, hour] (weekday 0 = Monday).
+    Returns (sorted distinct menu item ids, array).
+    """
+    np = numpy()
+    items = np.unique(item_ids)
+    shape = (len(items), weeks, 7, 24)
+    keep = (days_ago >= 1) & (days_ago <= weeks * 7)
+    days_ago = days_ago[keep]
+    rows = np.searchsorted(items, item_ids[keep])
+    week = (days_ago - 1) // 7
+    weekday = (today.weekday() - days_ago) % 7
+    # Live and archived lines can share a slot: bincount sums them
+    slots = np.ravel_multi_index((rows, week, weekday, hours[keep]), shape)
+    grid = np.bincount(slots, weights=quantities[keep], minlength=int(np.prod(shape)))
+    return items, grid.astype(np.float32).reshape(shape)
+
+
+def fit(grid, alpha):
+    """
+    Exponentially weighted average over the week axis for every item, weekday
+    and hour at once: returns forecast[item, weekday, hour]
+    """
+    np = numpy()
+    items, weeks = grid.shape[:2]
+    if not items:
+        return np.zeros((0, 7, 24), dtype=np.float32)
+    weights = alpha * (1 - alpha) ** np.arange(weeks, dtype=np.float64)
+
+    weighted = np.tensordot(grid, weights.astype(np.float32), axes=([1], [0]))
+    # Oldest week each item sold in; weeks before it do not count
+    sold = grid.reshape(items, weeks, -1).any(axis=2)
+    first_week = weeks - 1 - np.argmax(sold[:, ::-1], axis=1)
+    return weighted / np.cumsum(weights)[first_week].astype(np.float32)[:, None, None]
+
+
+def refresh_forecasts(now=None):
+    """
+    Refit the current outlet's forecasts and replace its DemandForecast rows.
+    Returns (items forecast, rows stored).
+    """
+    np = numpy()
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    days = _setting('FORECAST_HISTORY_DAYS', 730)
+    weeks = max(1, days // 7)
+
+    item_ids, days_ago, hours, quantities = load_history(today, weeks * 7)
+    items, grid = bucket_history(item_ids, days_ago, hours, quantities, today, weeks)
+    forecast = fit(grid, _setting('FORECAST_ALPHA', 0.3))
+
+    outlet = get_current_outlet() or get_default_outlet()
+    rows, weekdays, slot_hours = np.nonzero(forecast >= MIN_STORED_QUANTITY)
+    forecasts = [
+        DemandForecast(
+            outlet_id=outlet.id, menu_item_id=int(items[row]), weekday=int(weekday), hour=int(hour),
+            quantity=round(float(forecast[row, weekday, hour]), 3), refreshed_at=now,
+        )
+        for row, weekday, hour in zip(rows, weekdays, slot_hours)
+    ]
+    with outlet_atomic():
+        DemandForecast.objects.filter(outlet_id=outlet.id).delete()
+        DemandForecast.objects.bulk_create(forecasts, batch_size=5000)
+    return len(items), len(forecasts)
+
+
+# ---------- prep endpoint (no NumPy needed) ----------
+
+def service_window(now=None, hours=None):
+    """(start, end, [(weekday, hour), ...]) of the next ``hours`` local hours, from the current one"""
+    hours = hours or _setting('FORECAST_WINDOW_HOURS', 4)
+    start = timezone.localtime(now or timezone.now()).replace(minute=0, second=0, microsecond=0)
+    slots = [(start + timedelta(hours=step)) for step in range(hours)]
+    return start, start + timedelta(hours=hours), [(slot.weekday(), slot.hour) for slot in slots]
+
+
+def expected_quantities(slots, categories=None, limit=None):
+    """Expected quantity per menu item over ``slots``, largest first (one query)"""
+    slot_filter = Q()
+    for weekday, hour in slots:
+        slot_filter |= Q(weekday=weekday, hour=hour)
+    queryset = DemandForecast.objects.filter(slot_filter)
+    if categories:
+        queryset = queryset.filter(menu_item__category__in=categories)
+    queryset = (
+        queryset
+        .values('menu_item_id', 'menu_item__name', 'menu_item__category')
+        .annotate(expected=Sum('quantity'))
+        .order_by('-expected', 'menu_item__name')
+    )
+    return queryset[:limit] if limit else queryset
@@ -0,0 +1,154 @@
+# restaurant/idempotency.py
+"""
+Idempotency-Key support for mutating endpoints.
+
+The first request with a given key (per user) claims a row in
+`idempotency_keys`, runs the view and stores its response. Retries with the
+same key get the stored response back without running the view again.
+A retry that arrives while the first request is still running waits for it
+to finish instead of executing in parallel.
+"""
+import functools
+import hashlib
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import IdempotencyKey
+
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _fingerprint(request):
+    """Hash of method, path and body: the same key must not be reused for another request"""
+    payload = json.dumps(request.data, sort_keys=True, default=str)
+    raw = f"{request.method}\n{request.path}\n{payload}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _claim(user, key, request_hash):
+    """
+    Try to become the owner of a key. Returns (record, is_owner).
+    Expired rows and in-flight rows abandoned by a crashed worker are
+    cleared first so they can be claimed again.
+    """
+    now = timezone.now()
+    lock_timeout = timedelta(seconds=_setting('IDEMPOTENCY_LOCK_TIMEOUT_SECONDS', 60))
+    ttl = timedelta(hours=_setting('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+
+    IdempotencyKey.objects.filter(user=user, key=key).filter(
+        Q(expires_at__lt=now) | Q(response_status__isnull=True, created_at__lt=now - lock_timeout)
+    ).delete()
+
+    while True:
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    user=user,
+                    key=key,
+                    request_hash=request_hash,
+                    expires_at=now + ttl,
+                )
+            return record, True
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(user=user, key=key).first()
+            if record is not None:
+                return record, False
+            # Owner gave up (5xx) between our insert and read: try again
+
+
+def _wait_for_response(record):
+    """Poll until the owning request stores its response. None on timeout or if it failed."""
+    deadline = time.monotonic() + _setting('IDEMPOTENCY_WAIT_TIMEOUT_SECONDS', 10)
+    interval = 0.05
+
+    while record.response_status is None:
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(interval)
+        interval = min(interval * 2, 0.5)
+        record = IdempotencyKey.objects.filter(id=record.id).first()
+        if record is None:
+            return None
+
+    return record
+
+
+def _replay(record):
+    response = Response(json.loads(record.response_body), status=record.response_status)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+
+def idempotent(view_func):
+    """
+    Decorator for mutating DRF function views (place it under @permission_classes).
+    Requests without an Idempotency-Key header run unchanged.
+    Only 2xx/4xx responses are stored; a 5xx or exception releases the key
+    so the client can retry for real.
+    """
+    @functools.wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_func(request, *args, **kwargs)
+
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({
+                'success': False,
+                'message': f'{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters'
+            }, status=400)
+
+        request_hash = _fingerprint(request)
+        record, is_owner = _claim(request.user, key, request_hash)
+
+        if not is_owner:
+            if record.request_hash != request_hash:
+                return Response({
+                    'success': False,
+                    'message': f'{IDEMPOTENCY_HEADER} was already used for a different request'
+                }, status=422)
+
+            record = _wait_for_response(record)
+            if record is None:
+                return Response({
+                    'success': False,
+                    'message': 'A request with this Idempotency-Key is still being processed'
+                }, status=409)
+            return _replay(record)
+
+        try:
+            response = view_func(request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if response.status_code >= 500:
+            record.delete()
+        else:
+            record.response_status = response.status_code
+            record.response_body = json.dumps(response.data, cls=JSONEncoder)
+            record.save(update_fields=['response_status', 'response_body'])
+
+        return response
+
+    return wrapper
+
+
+def purge_expired_keys():
+    """Delete expired keys. Returns the number of rows removed."""
+    deleted, _ = IdempotencyKey.objects.filter(expires_at__lt=timezone.now()).delete()
+    return deleted
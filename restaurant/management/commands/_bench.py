@@ -0,0 +1,139 @@
+# restaurant/management/commands/_bench.py
+"""
+Shared helpers for the bench_* management commands.
+
+Benchmarks run against a throwaway test database (test_<NAME>), never
+against the configured one, so they are safe to run on a real install.
+"""
+import statistics
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+from django.utils import timezone
+
+from restaurant.models import Table, MenuItem, Order, OrderItem, Bill
+from restaurant.outlets import get_default_outlet
+
+
+def measure(fn, repeat=20, warmup=2):
+    """Run fn repeatedly and return the median wall time in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def seed_floor(tables=20, menu_items=50, outlet=None):
+    """Create tables, menu items and one user of each role. Returns (tables, items, users)"""
+    outlet = outlet or get_default_outlet()
+    users = {}
+    for role_id, username in [(1, 'bench_admin'), (2, 'bench_manager'),
+                              (3, 'bench_waiter'), (4, 'bench_cashier')]:
+        user = User.objects.create_user(username=username, password='bench-pass-123')
+        user.profile.role_id = role_id
+        user.profile.save()
+        users[role_id] = user
+
+    Table.objects.bulk_create([
+        Table(outlet=outlet, table_number=f'T-{i:03d}', seating_capacity=2 + (i % 4) * 2)
+        for i in range(1, tables + 1)
+    ])
+    categories = [choice for choice, _ in MenuItem.CATEGORY_CHOICES]
+    MenuItem.objects.bulk_create([
+        MenuItem(
+            outlet=outlet,
+            name=f'Item {i:04d}',
+            category=categories[i % len(categories)],
+            price=Decimal(50 + (i % 40) * 10),
+        )
+        for i in range(1, menu_items + 1)
+    ])
+    return (
+        list(Table.objects.filter(outlet=outlet)),
+        list(MenuItem.objects.filter(outlet=outlet)),
+        users,
+    )
+
+
+def _next_id(model):
+    return (model.objects.aggregate(max_id=Max('id'))['max_id'] or 0) + 1
+
+
+def seed_paid_history(order_items, tables, menu_items, user, items_per_order=4,
+                      days_ago=90, batch_size=5000):
+    """
+    Bulk-insert paid bills with served, billed orders totalling ``order_items``
+    items, all dated ``days_ago`` days back. Bypasses model save() and signals.
+    Ids are assigned explicitly because bulk_create() does not return them on MySQL.
+    """
+    paid_at = timezone.now() - timedelta(days=days_ago)
+    orders_needed = max(1, order_items // items_per_order)
+    bill_id, order_id, item_id = _next_id(Bill), _next_id(Order), _next_id(OrderItem)
+    first_bill_id, first_order_id = bill_id, order_id
+    created = 0
+
+    while created < orders_needed:
+        count = min(batch_size, orders_needed - created)
+        bills, orders, items = [], [], []
+
+        for i in range(count):
+            table = tables[(created + i) % len(tables)]
+            bills.append(Bill(
+                id=bill_id, outlet_id=table.outlet_id, table=table, subtotal=Decimal('400.00'),
+                tax_amount=Decimal('20.00'), total_amount=Decimal('420.00'),
+                status='Paid', paid_at=paid_at, generated_by=user,
+            ))
+            orders.append(Order(
+                id=order_id, outlet_id=table.outlet_id, table=table, bill_id=bill_id, status='Served',
+                is_billed=True, created_by=user, total_amount=Decimal('400.00'),
+            ))
+            for j in range(items_per_order):
+                items.append(OrderItem(
+                    id=item_id, order_id=order_id,
+                    menu_item=menu_items[(order_id + j) % len(menu_items)],
+                    quantity=1, price_at_order=Decimal('100.00'), subtotal=Decimal('100.00'),
+                ))
+                item_id += 1
+            bill_id += 1
+            order_id += 1
+
+        Bill.objects.bulk_create(bills)
+        Order.objects.bulk_create(orders)
+        OrderItem.objects.bulk_create(items)
+        created += count
+
+    # auto_now_add ignores explicit values on insert; backdate in bulk
+    Bill.objects.filter(id__gte=first_bill_id).update(generated_at=paid_at)
+    Order.objects.filter(id__gte=first_order_id).update(created_at=paid_at, updated_at=paid_at)
+    OrderItem.objects.filter(order_id__gte=first_order_id).update(created_at=paid_at)
+
+
+class BenchmarkCommand(BaseCommand):
+    """
+    Base class: handle() creates the test database (and test environment, so
+    APIClient requests are accepted), calls run_benchmark() and always tears
+    both down again.
+    """
+
+    def run_benchmark(self, *args, **options):
+        raise NotImplementedError
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            self.run_benchmark(*args, **options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
@@ -0,0 +1,61 @@
+# restaurant/management/commands/archive_history.py
+from django.core.management.base import BaseCommand, CommandError
+
+from restaurant.archive import (
+    DEFAULT_ARCHIVE_AFTER_DAYS, DEFAULT_BATCH_SIZE, archivable_bills, archive_all_outlets,
+)
+from restaurant.models import Outlet
+from restaurant.outlets import outlet_context
+
+
+class Command(BaseCommand):
+    """
+    Move paid bills older than N days (with orders and items) to the archive tables
+
+    Usage:
+        python manage.py archive_history --days 30 --batch-size 500
+        python manage.py archive_history --max-batches 20   # bounded run, re-run to resume
+        python manage.py archive_history --outlet downtown  # one outlet only (default: all)
+    """
+    help = 'Archive old paid bills, their orders and order items'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=DEFAULT_ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--max-batches', type=int, default=None)
+        parser.add_argument('--outlet', help='Outlet code (default: every outlet)')
+        parser.add_argument('--dry-run', action='store_true', help='Only count archivable bills')
+
+    def handle(self, *args, **options):
+        outlets = Outlet.objects.all()
+        if options['outlet']:
+            outlets = outlets.filter(code=options['outlet'])
+            if not outlets.exists():
+                raise CommandError(f"Outlet {options['outlet']} not found")
+
+        if options['dry_run']:
+            for outlet in outlets:
+                with outlet_context(outlet):
+                    count = archivable_bills(options['days']).count()
+                self.stdout.write(f'{outlet.code}: {count} paid bills older than {options["days"]} days')
+            return
+
+        def progress(totals):
+            self.stdout.write(
+                f"  batch {totals['batches']}: {totals['bills']} bills, "
+                f"{totals['orders']} orders, {totals['order_items']} items"
+            )
+
+        results = archive_all_outlets(
+            outlets,
+            older_than_days=options['days'],
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+            progress=progress if options['verbosity'] > 1 else None,
+        )
+
+        for code, totals in results.items():
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {code}: archived {totals['bills']} bills, {totals['orders']} orders, "
+                f"{totals['order_items']} order items in {totals['batches']} batches"
+            ))
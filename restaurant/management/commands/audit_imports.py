@@ -0,0 +1,98 @@
+# restaurant/management/commands/audit_imports.py
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Run in a fresh interpreter so nothing is imported yet
+SCRIPT = '''
+import importlib, importlib.util, sys, time
+
+# -X importtime only reports import statements / __import__, and Django loads
+# apps, settings and middleware with importlib.import_module: route it through __import__
+def import_module(name, package=None):
+    name = importlib.util.resolve_name(name, package)
+    __import__(name)
+    return sys.modules[name]
+importlib.import_module = import_module
+
+started = time.perf_counter()
+__import__({module!r})
+booted = time.perf_counter()
+if {urls!r}:
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+print('BOOT_MS', (booted - started) * 1000, (time.perf_counter() - booted) * 1000)
+'''
+
+
+def parse_importtime(output):
+    """[(name, self_us, cumulative_us, depth)] from python -X importtime stderr"""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return imports
+
+
+class Command(BaseCommand):
+    """
+    Import-time audit of a worker boot: what backend.wsgi (or backend.asgi)
+    imports, the slowest modules and the time per package. With --urls the
+    URL configuration (every view module) is imported too, as it is on a
+    worker's first request.
+
+    Usage:
+        python manage.py audit_imports
+        python manage.py audit_imports --module backend.asgi --urls --top 30
+    """
+    help = 'Report the slowest imports when a worker boots'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default='backend.wsgi', help='Entry point (default: backend.wsgi)')
+        parser.add_argument('--urls', action='store_true', help='Also import the URL configuration')
+        parser.add_argument('--top', type=int, default=20, help='Modules to list')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ)
+        # Audit the boot only: no background prewarm in the child
+        env['RESTAURANT_PREWARM'] = '0'
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c',
+             SCRIPT.format(module=options['module'], urls=options['urls'])],
+            capture_output=True, text=True, env=env,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Importing {options['module']} failed:\n{result.stderr[-2000:]}")
+
+        boot_ms, urls_ms = (float(value) for value in result.stdout.split('BOOT_MS')[-1].split())
+        imports = parse_importtime(result.stderr)
+        top = options['top']
+
+        self.stdout.write(f"{options['module']}: {boot_ms:.0f}ms to import (including django.setup())")
+        if options['urls']:
+            self.stdout.write(f'URL configuration: {urls_ms:.0f}ms more')
+        self.stdout.write(f'{len(imports)} modules imported\n')
+
+        self.stdout.write(f'Slowest by cumulative time (top {top}):')
+        for name, self_us, cumulative_us, depth in sorted(imports, key=lambda entry: -entry[2])[:top]:
+            self.stdout.write(f'  {cumulative_us / 1000:>8.1f}ms {self_us / 1000:>8.1f}ms self  {name}')
+
+        self.stdout.write(f'\nSlowest by self time (top {top}):')
+        for name, self_us, cumulative_us, depth in sorted(imports, key=lambda entry: -entry[1])[:top]:
+            self.stdout.write(f'  {self_us / 1000:>8.1f}ms  {name}')
+
+        packages = defaultdict(lambda: [0, 0])
+        for name, self_us, _, _ in imports:
+            package = packages[name.split('.')[0]]
+            package[0] += self_us
+            package[1] += 1
+        self.stdout.write(f'\nSelf time per top-level package (top {top}):')
+        for package, (self_us, count) in sorted(packages.items(), key=lambda entry: -entry[1][0])[:top]:
+            self.stdout.write(f'  {self_us / 1000:>8.1f}ms {count:>5} modules  {package}')
@@ -0,0 +1,96 @@
+# restaurant/management/commands/bench_admin.py
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from restaurant.admin import OrderItemInline
+from restaurant.models import Order, Bill
+from ._bench import BenchmarkCommand, measure, seed_floor, seed_paid_history
+
+
+class Command(BenchmarkCommand):
+    """
+    Admin changelist / change page latency and query counts on a large orders table
+
+    Usage:
+        python manage.py bench_admin
+        python manage.py bench_admin --orders 1000000 --compare
+    """
+    help = 'Benchmark Django admin pages for orders and bills'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=1000000, help='Paid orders (and bills) to seed')
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--compare', action='store_true',
+                            help='Also time the pages with stock ModelAdmin settings')
+
+    def _pages(self):
+        order = Order.objects.order_by('id').first()
+        year, month = order.created_at.year, order.created_at.month
+        return {
+            'orders': '/admin/restaurant/order/',
+            'orders page 50': '/admin/restaurant/order/?p=50',
+            'orders filtered': '/admin/restaurant/order/?status__exact=Served',
+            'orders by month': f'/admin/restaurant/order/?created_at__year={year}&created_at__month={month}',
+            'order change': f'/admin/restaurant/order/{order.id}/change/',
+            'bills': '/admin/restaurant/bill/',
+        }
+
+    def _run(self, label, client, pages, repeat):
+        self.stdout.write(label)
+        for name, url in pages.items():
+            # The query log is capped; a full one breaks CaptureQueriesContext
+            reset_queries()
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f'{url}: {response.status_code}')
+            ms = measure(lambda: client.get(url), repeat=repeat, warmup=1)
+            self.stdout.write(f'  {name:<18} {ms:>10.1f}ms {len(queries):>6} queries')
+
+    def _stock_settings(self):
+        """Undo the scalability settings on the registered admins; returns a restore function"""
+        saved = []
+
+        def override(target, name, value):
+            saved.append((target, name, target.__dict__.get(name, getattr(target, name))))
+            setattr(target, name, value)
+
+        for model_admin in (admin.site._registry[Order], admin.site._registry[Bill]):
+            override(model_admin, 'paginator', Paginator)
+            override(model_admin, 'show_full_result_count', True)
+            override(model_admin, 'list_select_related', False)
+        override(OrderItemInline, 'autocomplete_fields', ())
+        override(OrderItemInline, 'get_queryset', admin.TabularInline.get_queryset)
+
+        def restore():
+            for target, name, value in reversed(saved):
+                setattr(target, name, value)
+        return restore
+
+    def run_benchmark(self, *args, **options):
+        tables, menu_items, users = seed_floor(tables=50, menu_items=200)
+        self.stdout.write(f'Seeding {options["orders"]:,} orders...')
+        seed_paid_history(options['orders'], tables, menu_items, users[4], items_per_order=1)
+        # Give a few orders several items for the change page inline
+        first = Order.objects.order_by('id').values_list('id', flat=True).first()
+        seed_paid_history(40, tables, menu_items, users[4], items_per_order=20)
+
+        superuser = User.objects.create_superuser('bench_super', password='bench-pass-123')
+        client = Client()
+        client.force_login(superuser)
+        pages = self._pages()
+        pages['order change'] = pages['order change'].replace(
+            f'/{first}/', f"/{Order.objects.order_by('-id').values_list('id', flat=True).first()}/"
+        )
+
+        self._run('scalable admin', client, pages, options['repeat'])
+        if options['compare']:
+            restore = self._stock_settings()
+            try:
+                self._run('stock ModelAdmin', client, pages, options['repeat'])
+            finally:
+                restore()
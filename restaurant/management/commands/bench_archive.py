@@ -0,0 +1,79 @@
+# restaurant/management/commands/bench_archive.py
+from decimal import Decimal
+
+from rest_framework.test import APIClient
+
+from restaurant.archive import archive_paid_bills
+from restaurant.models import Table, Order, OrderItem, Bill
+from ._bench import BenchmarkCommand, measure, seed_floor, seed_paid_history
+
+
+class Command(BenchmarkCommand):
+    """
+    Show that live-path latency stays flat as history grows, once paid bills are archived
+
+    Usage:
+        python manage.py bench_archive
+        python manage.py bench_archive --sizes 10000,100000,1000000,10000000 --compare
+    """
+    help = 'Benchmark live endpoints against growing (archived) order history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000,1000000',
+                            help='Comma separated total history sizes in order items')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--compare', action='store_true',
+                            help='Also time the endpoints before archiving each step')
+
+    def _seed_hot(self, tables, menu_items, waiter, cashier):
+        """A few open orders and pending bills: the data the floor actually works with"""
+        for table in tables[:5]:
+            order = Order.objects.create(table=table, created_by=waiter, status='Served')
+            for menu_item in menu_items[:3]:
+                OrderItem.objects.create(order=order, menu_item=menu_item, quantity=2,
+                                         price_at_order=menu_item.price)
+            order.calculate_total()
+            Table.objects.filter(id=table.id).update(status='Bill Requested')
+
+        for table in tables[5:10]:
+            Bill.objects.create(table=table, generated_by=cashier, status='Pending Payment',
+                                subtotal=Decimal('100.00'), total_amount=Decimal('105.00'))
+
+    def _time_live_path(self, cashier_client, hot_table, repeat):
+        return {
+            'pending_bills': measure(
+                lambda: cashier_client.get('/api/restaurant/bills/pending/'), repeat),
+            'ready_for_bill': measure(
+                lambda: cashier_client.get('/api/restaurant/tables/ready-for-bill/'), repeat),
+            'table_orders': measure(
+                lambda: cashier_client.get(f'/api/restaurant/orders/table/{hot_table.id}/'), repeat),
+        }
+
+    def _report(self, label, size, timings):
+        cells = '  '.join(f'{name}={ms:7.2f}ms' for name, ms in timings.items())
+        self.stdout.write(f'{label:<10} {size:>10,} items  {cells}')
+
+    def run_benchmark(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        repeat = options['repeat']
+
+        tables, menu_items, users = seed_floor(tables=50, menu_items=60)
+        self._seed_hot(tables, menu_items, users[3], users[4])
+
+        cashier_client = APIClient()
+        cashier_client.force_authenticate(users[4])
+        hot_table = tables[0]
+
+        history = 0
+        for size in sizes:
+            self.stdout.write(f'Seeding history up to {size:,} order items...')
+            seed_paid_history(size - history, tables, menu_items, users[4])
+            history = size
+
+            if options['compare']:
+                self._report('live-only', size, self._time_live_path(cashier_client, hot_table, repeat))
+
+            archive_paid_bills(older_than_days=30, batch_size=2000)
+            live_items = OrderItem.objects.count()
+            self._report('archived', size, self._time_live_path(cashier_client, hot_table, repeat))
+            self.stdout.write(f'           live order_items after archiving: {live_items:,}')
@@ -0,0 +1,151 @@
+# restaurant/management/commands/bench_forecast.py
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from restaurant.forecasting import bucket_history, fit, load_history, numpy, refresh_forecasts
+from restaurant.models import ArchivedOrder, ArchivedOrderItem, MenuItem, Table
+from restaurant.outlets import get_default_outlet
+from ._bench import BenchmarkCommand, seed_floor
+
+
+SERVICE_HOURS = range(11, 24)
+ALPHA = 0.3
+
+
+def _synthetic_history(items, days, rng):
+    """Dense history: every item sells in every service hour of every day (menu item ids 1..items)"""
+    np = numpy()
+    grid_items, grid_days, grid_hours = np.meshgrid(
+        np.arange(1, items + 1), np.arange(1, days + 1), np.array(SERVICE_HOURS), indexing='ij'
+    )
+    # Busier weekends and evenings, plus noise
+    rate = 1.0 + (grid_hours >= 19) + 0.5 * ((grid_days % 7) < 2)
+    return (
+        grid_items.ravel(), grid_days.ravel(), grid_hours.ravel(),
+        rng.poisson(rate).astype(np.float32).ravel(),
+    )
+
+
+def _python_fit(item_ids, days_ago, hours, quantities, today, weeks):
+    """The same model, one (item, weekday, hour) series at a time in plain Python"""
+    series = defaultdict(lambda: [0.0] * weeks)
+    for item_id, ago, hour, quantity in zip(item_ids, days_ago, hours, quantities):
+        if 1 <= ago <= weeks * 7:
+            series[item_id, (today.weekday() - ago) % 7, hour][(ago - 1) // 7] += quantity
+    first_week = defaultdict(int)
+    for (item_id, _, _), values in series.items():
+        sold = [week for week, value in enumerate(values) if value]
+        if sold:
+            first_week[item_id] = max(first_week[item_id], sold[-1])
+    forecast = {}
+    for (item_id, weekday, hour), values in series.items():
+        weighted = total = 0.0
+        for week in range(first_week[item_id] + 1):
+            weight = ALPHA * (1 - ALPHA) ** week
+            weighted += weight * values[week]
+            total += weight
+        forecast[item_id, weekday, hour] = weighted / total
+    return forecast
+
+
+class Command(BenchmarkCommand):
+    """
+    Fit time of the vectorized prep forecast (restaurant/forecasting.py):
+    bucketing + EWMA fit on a dense synthetic history of --items items over
+    --days days, against the same model in plain Python; then a full
+    refresh_forecasts() run (database load, fit, store) on --db-lines
+    archived order lines.
+
+    Usage:
+        python manage.py bench_forecast
+        python manage.py bench_forecast --items 500 --days 730 --db-lines 1000000
+    """
+    help = 'Benchmark demand forecast fitting (NumPy against plain Python) and the refresh job'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=500)
+        parser.add_argument('--days', type=int, default=730)
+        parser.add_argument('--db-lines', type=int, default=100000, help='Archived order lines for the refresh run')
+        parser.add_argument('--skip-python', action='store_true', help='Skip the plain Python baseline')
+
+    def _seed_lines(self, lines, days, user, batch_size=20000):
+        """Archived order lines spread over ``days`` days and the service hours (one order per day)"""
+        outlet = get_default_outlet()
+        table = Table.objects.create(outlet=outlet, table_number='F-001', seating_capacity=4)
+        menu = list(MenuItem.objects.values_list('id', flat=True))
+        now = timezone.now()
+        ArchivedOrder.objects.bulk_create([
+            ArchivedOrder(id=day, outlet=outlet, table=table, created_by=user,
+                          created_at=now - timedelta(days=day), updated_at=now - timedelta(days=day))
+            for day in range(1, days + 1)
+        ])
+        hours = list(SERVICE_HOURS)
+        for start in range(0, lines, batch_size):
+            batch = []
+            for line in range(start, min(lines, start + batch_size)):
+                day = 1 + line % days
+                created_at = (now - timedelta(days=day)).replace(hour=hours[line // days % len(hours)])
+                batch.append(ArchivedOrderItem(
+                    id=line + 1, order_id=day, menu_item_id=menu[line % len(menu)], quantity=1 + line % 3,
+                    price_at_order=100, subtotal=100 * (1 + line % 3), created_at=created_at,
+                ))
+            ArchivedOrderItem.objects.bulk_create(batch)
+
+    def run_benchmark(self, *args, **options):
+        try:
+            np = numpy()
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e))
+        items, days = options['items'], options['days']
+        weeks = days // 7
+        today = timezone.localdate()
+
+        rng = np.random.default_rng(50)
+        history = _synthetic_history(items, days, rng)
+        self.stdout.write(f'{items} items x {days} days: {len(history[0]):,} (item, day, hour) rows')
+
+        start = time.perf_counter()
+        item_ids, grid = bucket_history(*history, today, weeks)
+        bucketed = time.perf_counter()
+        forecast = fit(grid, ALPHA)
+        fitted = time.perf_counter()
+        numpy_s = fitted - start
+        self.stdout.write(
+            f'numpy   bucket {(bucketed - start) * 1000:>8.0f}ms  fit {(fitted - bucketed) * 1000:>6.0f}ms'
+            f'  total {numpy_s:>6.2f}s  ({grid.nbytes / 2 ** 20:.0f} MB array)'
+        )
+
+        if not options['skip_python']:
+            rows = [column.tolist() for column in history]
+            start = time.perf_counter()
+            expected = _python_fit(*rows, today, weeks)
+            python_s = time.perf_counter() - start
+            row = int(np.searchsorted(item_ids, 1))
+            same = all(
+                abs(forecast[row, weekday, hour] - value) < 1e-3
+                for (item_id, weekday, hour), value in expected.items() if item_id == 1
+            )
+            self.stdout.write(
+                f'python  total {python_s:>6.2f}s  speed-up {python_s / numpy_s:.0f}x'
+                f'  same forecast: {"yes" if same else "NO"}'
+            )
+
+        _, _, users = seed_floor(tables=0, menu_items=items)
+        self._seed_lines(options['db_lines'], days, users[1])
+        # The grouped load runs TruncDate / ExtractHour per line: native SQL on
+        # MySQL / PostgreSQL, Python functions on SQLite (much slower there)
+        start = time.perf_counter()
+        load_history(today, weeks * 7)
+        loaded = time.perf_counter()
+        forecast_items, stored = refresh_forecasts()
+        refreshed = time.perf_counter()
+        self.stdout.write(
+            f"refresh_forecasts on {options['db_lines']:,} order lines: load {loaded - start:.2f}s"
+            f" ({options['db_lines'] / (loaded - start):,.0f} lines/s), full refresh {refreshed - loaded:.2f}s"
+            f' ({forecast_items} items, {stored:,} slots stored)'
+        )
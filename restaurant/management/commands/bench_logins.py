@@ -0,0 +1,62 @@
+# restaurant/management/commands/bench_logins.py
+import time
+
+from rest_framework.test import APIClient
+
+from ._bench import BenchmarkCommand, seed_floor
+
+
+class Command(BenchmarkCommand):
+    """
+    Logins per second and CPU time per login: password login vs token
+    refresh vs device PIN login (a shift-start login storm)
+
+    Usage:
+        python manage.py bench_logins
+        python manage.py bench_logins --count 80
+    """
+    help = 'Benchmark password login, token refresh and PIN login'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=40, help='Logins per flow')
+
+    def _run(self, label, count, call):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        for i in range(count):
+            response = call(i)
+            if response.status_code != 200:
+                raise RuntimeError(f'{label}: {response.status_code} {response.data}')
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        self.stdout.write(
+            f'{label:<16} {count / wall:>10,.1f}/s {wall / count * 1000:>10.2f}ms {cpu / count * 1000:>10.2f}ms'
+        )
+
+    def run_benchmark(self, *args, **options):
+        count = options['count']
+        _, _, users = seed_floor(tables=1, menu_items=1)
+        waiter = users[3]
+        client = APIClient()
+
+        login = client.post('/api/accounts/login/', {'username': waiter.username, 'password': 'bench-pass-123'})
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {login.data['token']}")
+        device = client.post('/api/accounts/pin/setup/', {'pin': '4821', 'device_name': 'bench'}).data['data']
+        client.credentials()
+
+        self.stdout.write(f'{"flow":<16} {"rate":>12} {"wall/login":>12} {"cpu/login":>12}')
+        self._run('password login', count, lambda i: client.post(
+            '/api/accounts/login/', {'username': waiter.username, 'password': 'bench-pass-123'}
+        ))
+
+        refresh = [login.data['refresh']]
+
+        def refresh_once(i):
+            response = client.post('/api/accounts/token/refresh/', {'refresh': refresh[0]})
+            refresh[0] = response.data.get('refresh', refresh[0])
+            return response
+        self._run('token refresh', count, refresh_once)
+
+        self._run('PIN login', count, lambda i: client.post('/api/accounts/pin/login/', {
+            'username': waiter.username, 'device_id': device['device_id'],
+            'device_secret': device['device_secret'], 'pin': '4821',
+        }))
@@ -0,0 +1,76 @@
+# restaurant/management/commands/bench_menu_search.py
+import random
+import time
+from decimal import Decimal
+
+from rest_framework.test import APIClient
+
+from restaurant.menu_search import build_menu_index
+from restaurant.models import MenuItem
+from restaurant.outlets import get_default_outlet
+from ._bench import BenchmarkCommand, measure, seed_floor
+
+
+DISHES = [
+    'Paneer Tikka', 'Butter Chicken', 'Dal Makhani', 'Masala Dosa', 'Chole Bhature', 'Veg Biryani',
+    'Hakka Noodles', 'Manchurian', 'Margherita Pizza', 'Penne Arrabbiata', 'Caesar Salad',
+    'Crème Brûlée', 'Gulab Jamun', 'Mango Lassi', 'Cold Coffee', 'Tom Yum Soup', 'Pad Thai',
+    'Falafel Wrap', 'Chicken Shawarma', 'Fish Tacos', 'Aloo Gobi', 'Rogan Josh', 'Idli Sambar',
+]
+STYLES = ['Classic', 'Spicy', 'Tandoori', 'Smoked', 'Jain', 'Family', 'Mini', 'Special', 'Garlic', 'Cheesy']
+
+QUERIES = [
+    ('prefix', 'pan'), ('prefix', 'butter chi'), ('substring', 'tikk'), ('substring', 'biry'),
+    ('typo', 'panner'), ('typo', 'biriyani'), ('typo', 'shwarma'), ('short', 'da'),
+]
+
+
+class Command(BenchmarkCommand):
+    """
+    Latency of the in-memory menu search index at a large menu size
+
+    Usage:
+        python manage.py bench_menu_search
+        python manage.py bench_menu_search --items 10000 --repeat 200
+    """
+    help = 'Benchmark menu search (index only and through the API)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def run_benchmark(self, *args, **options):
+        _, _, users = seed_floor(tables=1, menu_items=0)
+        outlet = get_default_outlet()
+
+        rng = random.Random(42)
+        categories = [choice for choice, _ in MenuItem.CATEGORY_CHOICES]
+        MenuItem.objects.bulk_create([
+            MenuItem(
+                outlet=outlet,
+                name=f'{rng.choice(STYLES)} {rng.choice(DISHES)} {i}',
+                category=categories[i % len(categories)],
+                price=Decimal(100 + i % 300),
+                is_available=i % 10 != 0,
+            )
+            for i in range(options['items'])
+        ], batch_size=2000)
+
+        start = time.perf_counter()
+        index = build_menu_index()
+        self.stdout.write(
+            f'Built index over {len(index):,} items in {(time.perf_counter() - start) * 1000:.1f}ms'
+        )
+
+        waiter = APIClient()
+        waiter.force_authenticate(users[3])
+        repeat = options['repeat']
+
+        self.stdout.write(f'{"query":<22} {"results":>7} {"index":>10} {"api":>10}')
+        for kind, query in QUERIES:
+            results = index.search(query, available=True)
+            index_ms = measure(lambda: index.search(query, available=True), repeat)
+            api_ms = measure(lambda: waiter.get('/api/restaurant/menu/search/', {'q': query}), repeat // 10 or 1)
+            self.stdout.write(
+                f'{kind + " " + repr(query):<22} {len(results):>7} {index_ms:>8.3f}ms {api_ms:>8.2f}ms'
+            )
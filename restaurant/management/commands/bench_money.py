@@ -0,0 +1,89 @@
+# restaurant/management/commands/bench_money.py
+import random
+from decimal import Decimal
+
+from django.apps.registry import Apps
+from django.db import connection, models
+from django.db.models import Sum
+
+from restaurant.money import MoneyField, from_paise, sum_paise
+from ._bench import BenchmarkCommand, measure
+
+
+def _line_model(name, amount_field):
+    """Stand-alone order-line table (outside the app registry) with the given amount column"""
+    meta = type('Meta', (), {'apps': Apps(), 'app_label': 'restaurant', 'db_table': f'bench_money_{name.lower()}'})
+    return type(name, (models.Model,), {
+        '__module__': __name__,
+        'Meta': meta,
+        'bill_id': models.IntegerField(db_index=True),
+        'amount': amount_field,
+    })
+
+
+PAISE = models.ExpressionWrapper(models.F('amount'), output_field=models.BigIntegerField())
+
+DecimalLine = _line_model('DecimalLine', models.DecimalField(max_digits=10, decimal_places=2))
+PaiseLine = _line_model('PaiseLine', MoneyField())
+
+
+class Command(BenchmarkCommand):
+    """
+    Aggregation throughput of money columns: DECIMAL(10, 2) rupees (before)
+    against BIGINT paise (restaurant/money.py, after). Both tables hold the
+    same order lines; each aggregation runs on both, and the decimal result
+    is checked against the exact integer one (SQLite keeps DECIMAL as a
+    float, so its sums can be off by a few paise).
+
+    Usage:
+        python manage.py bench_money
+        python manage.py bench_money --rows 1000000 --bills 20000
+    """
+    help = 'Benchmark SUM / GROUP BY on decimal rupees against integer paise'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000, help='Order lines per table')
+        parser.add_argument('--bills', type=int, default=5000, help='Distinct bills to group by')
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def _seed(self, rows, bills, batch_size=10000):
+        rng = random.Random(45)
+        for start in range(0, rows, batch_size):
+            count = min(batch_size, rows - start)
+            lines = [(rng.randrange(bills), rng.randrange(1000, 100000)) for _ in range(count)]
+            DecimalLine.objects.bulk_create(
+                [DecimalLine(bill_id=bill_id, amount=Decimal(paise).scaleb(-2)) for bill_id, paise in lines]
+            )
+            PaiseLine.objects.bulk_create(
+                [PaiseLine(bill_id=bill_id, amount=from_paise(paise)) for bill_id, paise in lines]
+            )
+
+    def run_benchmark(self, *args, **options):
+        with connection.schema_editor() as editor:
+            editor.create_model(DecimalLine)
+            editor.create_model(PaiseLine)
+        self.stdout.write(f"Seeding {options['rows']:,} order lines over {options['bills']:,} bills...")
+        self._seed(options['rows'], options['bills'])
+
+        cases = [
+            ('SUM of every line',
+             lambda: DecimalLine.objects.aggregate(total=Sum('amount'))['total'],
+             lambda: from_paise(sum_paise(PaiseLine.objects.all(), 'amount'))),
+            ('SUM per bill (GROUP BY)',
+             lambda: dict(DecimalLine.objects.values_list('bill_id').annotate(total=Sum('amount')).order_by()),
+             lambda: dict(PaiseLine.objects.values_list('bill_id').annotate(total=Sum('amount')).order_by())),
+            ('fetch and sum in Python',
+             lambda: sum(DecimalLine.objects.values_list('amount', flat=True), Decimal('0.00')),
+             # Raw paise, no Decimal per row
+             lambda: from_paise(sum(PaiseLine.objects.values_list(PAISE, flat=True)))),
+        ]
+
+        self.stdout.write(f'{"":<26} {"decimal":>10} {"paise":>10} {"speed-up":>9} {"rows/s (paise)":>15}  decimal exact')
+        for label, before, after in cases:
+            exact = 'yes' if before() == after() else 'NO'
+            before_ms = measure(before, repeat=options['repeat'], warmup=1)
+            after_ms = measure(after, repeat=options['repeat'], warmup=1)
+            self.stdout.write(
+                f'{label:<26} {before_ms:>8.1f}ms {after_ms:>8.1f}ms {before_ms / after_ms:>8.2f}x'
+                f" {options['rows'] / after_ms * 1000:>15,.0f}  {exact}"
+            )
@@ -0,0 +1,98 @@
+# restaurant/management/commands/bench_payloads.py
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from restaurant.compression import brotli
+from restaurant.models import Order, OrderItem, Bill
+from ._bench import BenchmarkCommand, measure, seed_floor
+
+
+class Command(BenchmarkCommand):
+    """
+    Payload size and latency of the largest list endpoints: full response vs
+    sparse fieldsets, uncompressed vs gzip / brotli
+
+    Usage:
+        python manage.py bench_payloads
+        python manage.py bench_payloads --orders 500 --items-per-order 8 --users 300
+    """
+    help = 'Benchmark sparse fieldsets and response compression on list endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=200, help='Orders on the measured table')
+        parser.add_argument('--items-per-order', type=int, default=6)
+        parser.add_argument('--bills', type=int, default=300, help='Pending bills')
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def _seed(self, tables, menu_items, users, options):
+        waiter, cashier = users[3], users[4]
+        table = tables[0]
+        for i in range(options['orders']):
+            order = Order.objects.create(table=table, created_by=waiter, status='Served')
+            OrderItem.objects.bulk_create([
+                OrderItem(
+                    order=order, menu_item=menu_item, quantity=1 + j % 3,
+                    price_at_order=menu_item.price, subtotal=menu_item.price * (1 + j % 3),
+                )
+                for j, menu_item in enumerate(menu_items[i % 10:i % 10 + options['items_per_order']])
+            ])
+            order.calculate_total()
+
+        Bill.objects.bulk_create([
+            Bill(
+                outlet_id=tables[i % len(tables)].outlet_id, table=tables[i % len(tables)],
+                generated_by=cashier, status='Pending Payment', subtotal=Decimal('400.00'),
+                tax_amount=Decimal('20.00'), total_amount=Decimal('420.00'),
+            )
+            for i in range(options['bills'])
+        ])
+
+        for i in range(options['users']):
+            user = User.objects.create_user(username=f'bench_staff_{i:04d}', email=f'staff{i}@example.com')
+            user.profile.role_id = 3
+            user.profile.save()
+        return table
+
+    def _row(self, client, label, url, encoding, repeat):
+        headers = {'HTTP_ACCEPT_ENCODING': encoding} if encoding else {}
+        response = client.get(url, **headers)
+        ms = measure(lambda: client.get(url, **headers), repeat)
+        self.stdout.write(
+            f'  {label:<34} {encoding or "identity":<9} {len(response.content):>10,} bytes  {ms:8.2f}ms'
+        )
+
+    def run_benchmark(self, *args, **options):
+        tables, menu_items, users = seed_floor(tables=20, menu_items=30)
+        table = self._seed(tables, menu_items, users, options)
+        repeat = options['repeat']
+
+        clients = {}
+        for role_id in (2, 4):
+            clients[role_id] = APIClient()
+            clients[role_id].force_authenticate(users[role_id])
+
+        encodings = [None, 'gzip'] + (['br'] if brotli is not None else [])
+        cases = [
+            (clients[2], f'table orders ({options["orders"]} orders)', f'/api/restaurant/orders/table/{table.id}/', [
+                ('full (before)', ''),
+                ('?fields=id,status', '?fields=id,status'),
+                ('?fields=id,status&include=items', '?fields=id,status&include=items'),
+            ]),
+            (clients[4], f'pending bills ({options["bills"]} bills)', '/api/restaurant/bills/pending/', [
+                ('full (before)', ''),
+                ('?fields=id,table,total_amount', '?fields=id,table,total_amount'),
+            ]),
+            (clients[2], 'users', '/api/accounts/users/', [
+                ('full (before)', ''),
+                ('?fields=id,username,role_id', '?fields=id,username,role_id'),
+            ]),
+        ]
+
+        for client, title, url, variants in cases:
+            self.stdout.write(title)
+            for label, query in variants:
+                for encoding in encodings:
+                    self._row(client, label, url + query, encoding, repeat)
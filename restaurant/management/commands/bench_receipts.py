@@ -0,0 +1,77 @@
+# restaurant/management/commands/bench_receipts.py
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from restaurant.receipts import RECEIPT_OUTPUTS, get_render_pool, render_receipt
+
+
+def sample_receipt(items=8):
+    return {
+        'outlet': 'Main Outlet',
+        'address': '12 MG Road, Bengaluru',
+        'bill_id': 104233,
+        'table': 'T-07',
+        'items': [
+            {'name': f'Menu Item {i:02d} (Chef Special)', 'quantity': 1 + i % 3,
+             'price': '180.00', 'subtotal': f'{180 * (1 + i % 3)}.00'}
+            for i in range(items)
+        ],
+        'subtotal': '2880.00',
+        'tax_percentage': '5.00',
+        'tax_amount': '144.00',
+        'total_amount': '3024.00',
+        'status': 'Paid',
+        'generated_at': '19-10-2026 20:15',
+        'paid_at': '19-10-2026 20:41',
+    }
+
+
+def render_batch(data, output, count):
+    """Pool task: render the same receipt ``count`` times (amortizes inter-process overhead)"""
+    for _ in range(count):
+        render_receipt(data, output)
+    return count
+
+
+class Command(BaseCommand):
+    """
+    Receipts rendered per second: on one core, and through the render pool
+
+    Usage:
+        python manage.py bench_receipts
+        python manage.py bench_receipts --items 20 --count 20000
+    """
+    help = 'Benchmark receipt rendering throughput (text, ESC/POS, PDF)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=8, help='Line items per receipt')
+        parser.add_argument('--count', type=int, default=5000, help='Receipts per measurement')
+        parser.add_argument('--batch', type=int, default=250, help='Receipts per pool task')
+
+    def handle(self, *args, **options):
+        data = sample_receipt(options['items'])
+        count = options['count']
+        pool = get_render_pool()
+        workers = pool._max_workers
+        # Start the worker processes before timing
+        list(pool.map(render_batch, [data] * workers, ['text'] * workers, [1] * workers))
+
+        self.stdout.write(f'{options["items"]} items per receipt, {workers} pool workers, {os.cpu_count()} CPUs')
+        self.stdout.write(f'{"output":<8} {"size":>8} {"1 core/s":>12} {"pool/s":>12} {"pool/s/core":>12}')
+        for output in RECEIPT_OUTPUTS:
+            size = len(render_receipt(data, output))
+
+            start = time.perf_counter()
+            render_batch(data, output, count)
+            single = count / (time.perf_counter() - start)
+
+            batches = [options['batch']] * max(1, count // options['batch'])
+            start = time.perf_counter()
+            done = sum(pool.map(render_batch, [data] * len(batches), [output] * len(batches), batches))
+            pooled = done / (time.perf_counter() - start)
+
+            self.stdout.write(
+                f'{output:<8} {size:>7,}B {single:>12,.0f} {pooled:>12,.0f} {pooled / workers:>12,.0f}'
+            )
@@ -0,0 +1,138 @@
+# restaurant/management/commands/bench_reservations.py
+import random
+import time
+from datetime import timedelta
+
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from restaurant.models import Table, Reservation
+from restaurant.outlets import get_default_outlet
+from restaurant.reservations import book, build_reservation_index, day_bounds
+from ._bench import BenchmarkCommand, seed_floor
+
+
+CAPACITIES = [2, 2, 2, 4, 4, 4, 4, 6, 6, 8, 10, 12]
+PARTY_SIZES = [1, 2, 2, 2, 3, 4, 4, 4, 5, 6, 7, 8, 10]
+DURATIONS = [30, 45, 45, 60, 60, 90]
+
+
+def _requests(day, count, rng):
+    """Random (party size, start, end) between 06:00 and 23:45 of ``day``, on 15-minute slots"""
+    opening = day_bounds(day)[0] + timedelta(hours=6)
+    requests = []
+    for _ in range(count):
+        start = opening + timedelta(minutes=15 * rng.randrange(72))
+        requests.append((rng.choice(PARTY_SIZES), start, start + timedelta(minutes=rng.choice(DURATIONS))))
+    return requests
+
+
+def scan_best_fit(party_size, start, end):
+    """Baseline without the index: one query over every table and its reservations"""
+    return (
+        Table.objects.filter(seating_capacity__gte=party_size)
+        .exclude(status='Closed')
+        .exclude(Exists(Reservation.objects.filter(
+            table=OuterRef('pk'), status__in=Reservation.ACTIVE_STATUSES,
+            starts_at__lt=end, ends_at__gt=start,
+        )))
+        .order_by('seating_capacity', 'table_number')
+        .values_list('id', flat=True)
+        .first()
+    )
+
+
+class Command(BenchmarkCommand):
+    """
+    Allocation throughput of the best-fit reservation allocator
+    (restaurant/reservations.py): a day with --tables tables and
+    --reservations bookings, then random requests answered from the
+    in-memory interval index and, for comparison, by one database query
+    per request. Both must pick the same table.
+
+    Usage:
+        python manage.py bench_reservations
+        python manage.py bench_reservations --tables 300 --reservations 5000 --requests 20000
+    """
+    help = 'Benchmark best-fit table allocation (interval index against a database scan)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tables', type=int, default=300)
+        parser.add_argument('--reservations', type=int, default=5000, help='Bookings on the benchmark day')
+        parser.add_argument('--requests', type=int, default=10000, help='Allocation requests to time')
+        parser.add_argument('--bookings', type=int, default=500, help='End-to-end bookings to time')
+
+    def _seed_day(self, day, target, rng, user):
+        """Fill the day through the allocator itself until ``target`` bookings fit"""
+        index = build_reservation_index(day)
+        reservations = []
+        for attempt, (party_size, start, end) in enumerate(_requests(day, target * 10, rng)):
+            if len(reservations) == target:
+                break
+            table_id = index.best_fit(party_size, start, end)
+            if table_id is not None:
+                index.add(-attempt, table_id, start, end)
+                reservations.append(Reservation(
+                    outlet_id=get_default_outlet().id, table_id=table_id, guest_name=f'Guest {attempt}',
+                    party_size=party_size, starts_at=start, ends_at=end, created_by=user,
+                ))
+        Reservation.objects.bulk_create(reservations, batch_size=2000)
+        return len(reservations)
+
+    def run_benchmark(self, *args, **options):
+        outlet = get_default_outlet()
+        _, _, users = seed_floor(tables=0, menu_items=0)
+        Table.objects.bulk_create([
+            Table(outlet=outlet, table_number=f'R-{i:03d}', seating_capacity=CAPACITIES[i % len(CAPACITIES)])
+            for i in range(options['tables'])
+        ])
+
+        rng = random.Random(48)
+        day = timezone.localdate() + timedelta(days=1)
+        booked = self._seed_day(day, options['reservations'], rng, users[3])
+        self.stdout.write(f"{options['tables']} tables, {booked:,} reservations on {day}")
+
+        start = time.perf_counter()
+        index = build_reservation_index(day)
+        self.stdout.write(
+            f'Built index over {len(index):,} windows in {(time.perf_counter() - start) * 1000:.1f}ms'
+        )
+
+        requests = _requests(day, options['requests'], rng)
+        start = time.perf_counter()
+        picks = [index.best_fit(*request) for request in requests]
+        index_s = time.perf_counter() - start
+
+        sample = requests[:max(1, min(len(requests), 500))]
+        start = time.perf_counter()
+        scanned = [scan_best_fit(*request) for request in sample]
+        scan_s = time.perf_counter() - start
+        agree = 'yes' if scanned == picks[:len(sample)] else 'NO'
+
+        found = sum(pick is not None for pick in picks)
+        self.stdout.write(f'{"":<22} {"requests":>9} {"per request":>12} {"requests/s":>12}')
+        for label, count, seconds in [('interval index', len(requests), index_s),
+                                      ('database scan', len(sample), scan_s)]:
+            self.stdout.write(
+                f'{label:<22} {count:>9,} {seconds / count * 1e6:>10.1f}us {count / seconds:>12,.0f}'
+            )
+        self.stdout.write(
+            f'{found / len(picks):.0%} of requests found a table; index and scan agree: {agree}'
+        )
+
+        # End to end: index proposes, book() confirms under the table lock and inserts
+        next_day = day + timedelta(days=1)
+        bookings = _requests(next_day, options['bookings'], rng)
+        made = 0
+        start = time.perf_counter()
+        for party_size, window_start, window_end in bookings:
+            try:
+                book(party_size, window_start, window_end, guest_name='Bench', user=users[3])
+                made += 1
+            except ValueError:
+                pass
+        seconds = time.perf_counter() - start
+        self.stdout.write(
+            f'book() end to end: {made:,}/{len(bookings):,} booked, '
+            f'{seconds / len(bookings) * 1000:.2f}ms per request, {len(bookings) / seconds:,.0f}/s'
+        )
@@ -0,0 +1,137 @@
+# restaurant/management/commands/bench_startup.py
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.db import connections
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ._bench import BenchmarkCommand, seed_floor
+
+
+# A fresh worker: boot backend.wsgi and fork as a gunicorn --preload master
+# does, then in the child wait as a worker would for traffic and serve the
+# first screens of a waiter's tablet once each, then again
+WORKER = '''
+import json, os, sys, time
+from wsgiref.util import setup_testing_defaults
+from django.conf import settings
+
+for alias, name in json.loads(os.environ['BENCH_DATABASE_NAMES']).items():
+    settings.DATABASES[alias]['NAME'] = name
+
+from backend.wsgi import application
+pid = os.fork()
+if pid:
+    sys.exit(os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1]))
+ready = time.time()
+time.sleep(float(os.environ['BENCH_IDLE_SECONDS']))
+
+def call(path):
+    environ = {{}}
+    setup_testing_defaults(environ)
+    path, _, query = path.partition('?')
+    environ.update(PATH_INFO=path, QUERY_STRING=query, HTTP_HOST={host!r},
+                   HTTP_AUTHORIZATION='Bearer ' + os.environ['BENCH_TOKEN'])
+    statuses = []
+    started = time.perf_counter()
+    b''.join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+    return (time.perf_counter() - started) * 1000, statuses[0]
+
+paths = json.loads(os.environ['BENCH_PATHS'])
+first = [call(path) for path in paths]
+first_done = time.time()
+second = [call(path) for path in paths]
+print('BENCH', json.dumps({{'ready': ready, 'first_done': first_done, 'first': first, 'second': second}}))
+'''
+
+PATHS = [
+    '/api/restaurant/tables/',
+    '/api/restaurant/menu/',
+    '/api/restaurant/menu/search/?q=item',
+]
+
+
+class Command(BenchmarkCommand):
+    """
+    Worker cold start: boot time, and the first requests of a fresh worker
+    with and without the background prewarm (restaurant/startup.py).
+    Each run starts a new Python process that boots backend.wsgi and forks
+    a worker (as gunicorn --preload does), which idles for --idle seconds
+    (a new worker waiting for traffic) and serves the tables, menu and menu
+    search screens, first cold then warm.
+
+    Usage:
+        python manage.py bench_startup
+        python manage.py bench_startup --runs 10 --idle 0.2 --menu-items 2000
+    """
+    help = 'Benchmark worker boot and time-to-first-response, with and without prewarm'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Workers started per mode')
+        parser.add_argument('--idle', type=float, default=0.5,
+                            help='Seconds between boot and the first request')
+        parser.add_argument('--menu-items', type=int, default=500)
+        parser.add_argument('--host', default='localhost', help='Host header (must be in ALLOWED_HOSTS)')
+
+    def handle(self, *args, **options):
+        # Workers run in their own processes: an in-memory SQLite test database
+        # would not be shared with them, so use a file
+        for alias in connections:
+            settings_dict = connections[alias].settings_dict
+            if settings_dict['ENGINE'].endswith('sqlite3') and not settings_dict['TEST'].get('NAME'):
+                settings_dict['TEST']['NAME'] = os.path.join(tempfile.gettempdir(), f'bench_startup_{alias}.sqlite3')
+        super().handle(*args, **options)
+
+    def _start_worker(self, prewarm, token, options):
+        env = dict(os.environ)
+        env.update(
+            RESTAURANT_PREWARM='1' if prewarm else '0',
+            BENCH_DATABASE_NAMES=json.dumps({alias: str(connections[alias].settings_dict['NAME']) for alias in connections}),
+            BENCH_IDLE_SECONDS=str(options['idle']),
+            BENCH_TOKEN=token,
+            BENCH_PATHS=json.dumps(PATHS),
+        )
+        launched = time.time()
+        result = subprocess.run(
+            [sys.executable, '-c', WORKER.format(host=options['host'])],
+            capture_output=True, text=True, env=env,
+        )
+        if result.returncode != 0 or 'BENCH' not in result.stdout:
+            raise RuntimeError(f'Worker failed:\n{result.stderr[-2000:]}')
+        run = json.loads(result.stdout.split('BENCH', 1)[1])
+        for latency, status in run['first'] + run['second']:
+            if not status.startswith('200'):
+                raise RuntimeError(f'Worker request returned {status}')
+        run['boot_ms'] = (run['ready'] - launched) * 1000
+        return run
+
+    def run_benchmark(self, *args, **options):
+        _, _, users = seed_floor(tables=40, menu_items=options['menu_items'])
+        token = str(AccessToken.for_user(users[3]))
+        # Workers see only committed data
+        for alias in connections:
+            connections[alias].close()
+
+        self.stdout.write(
+            f"{options['runs']} workers per mode, first request {options['idle']}s after boot "
+            f'(median ms)'
+        )
+        header = f'{"":<12} {"boot":>8}' + ''.join(f' {path.split("/api/restaurant/")[1]:>16}' for path in PATHS)
+        self.stdout.write(header + f' {"first screens":>14}')
+
+        for label, prewarm in [('cold', False), ('prewarmed', True)]:
+            runs = [self._start_worker(prewarm, token, options) for _ in range(options['runs'])]
+            boot = statistics.median(run['boot_ms'] for run in runs)
+            first = [statistics.median(run['first'][i][0] for run in runs) for i in range(len(PATHS))]
+            second = [statistics.median(run['second'][i][0] for run in runs) for i in range(len(PATHS))]
+            self.stdout.write(
+                f'{label:<12} {boot:>8.1f}' + ''.join(f' {ms:>16.1f}' for ms in first) + f' {sum(first):>14.1f}'
+            )
+            self.stdout.write(
+                f'{"  warm":<12} {"":>8}' + ''.join(f' {ms:>16.1f}' for ms in second) + f' {sum(second):>14.1f}'
+            )
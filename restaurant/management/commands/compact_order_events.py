@@ -0,0 +1,43 @@
+# restaurant/management/commands/compact_order_events.py
+from django.core.management.base import BaseCommand, CommandError
+
+from restaurant.events import DEFAULT_BATCH_SIZE, compact_events, purge_events
+from restaurant.models import Outlet
+from restaurant.outlets import outlet_context
+
+
+class Command(BaseCommand):
+    """
+    Retention for the order event journal: collapse the events of old paid
+    bills into one snapshot each, then delete events past retention.
+    Events a consumer has not read yet are never touched.
+
+    Usage:
+        python manage.py compact_order_events
+        python manage.py compact_order_events --compact-after 7 --retention 180
+    """
+    help = 'Compact and purge old order events'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--compact-after', type=int, default=None,
+                            help='Days (default: settings.ORDER_EVENT_COMPACT_AFTER_DAYS)')
+        parser.add_argument('--retention', type=int, default=None,
+                            help='Days (default: settings.ORDER_EVENT_RETENTION_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--outlet', help='Outlet code (default: every outlet)')
+
+    def handle(self, *args, **options):
+        outlets = Outlet.objects.all()
+        if options['outlet']:
+            outlets = outlets.filter(code=options['outlet'])
+            if not outlets.exists():
+                raise CommandError(f"Outlet {options['outlet']} not found")
+
+        for outlet in outlets:
+            with outlet_context(outlet):
+                bills, removed = compact_events(options['compact_after'], batch_size=options['batch_size'])
+                purged = purge_events(options['retention'])
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {outlet.code}: compacted {bills} bills ({removed} events removed), '
+                f'purged {purged} events'
+            ))
@@ -0,0 +1,71 @@
+# restaurant/management/commands/export_data.py
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from restaurant.exports import (
+    EXPORTS, EXPORT_FORMATS, DEFAULT_CHUNK_SIZE, stream_export, parse_export_bound,
+)
+from restaurant.models import Outlet
+from restaurant.outlets import bind_outlet
+
+
+class Command(BaseCommand):
+    """
+    Stream bills / orders / order items to a file or stdout
+
+    Usage:
+        python manage.py export_data bills --from 2025-01-01 --to 2025-01-31
+        python manage.py export_data order_items --format ndjson --gzip -o items.ndjson.gz
+        python manage.py export_data bills --outlet downtown
+    """
+    help = 'Export bills, orders or order items as CSV / NDJSON with constant memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('export_name', choices=list(EXPORTS))
+        parser.add_argument('--format', dest='export_format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--from', dest='date_from', help='Start date or datetime (inclusive)')
+        parser.add_argument('--to', dest='date_to', help='End date or datetime (inclusive)')
+        parser.add_argument('--status', help='Filter by status (order status for order_items)')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output on the fly')
+        parser.add_argument('--outlet', help='Outlet code (default: every outlet in the default database)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('-o', '--output', help='Output file (default: stdout)')
+
+    def handle(self, *args, **options):
+        try:
+            date_from = parse_export_bound(options['date_from'])
+            date_to = parse_export_bound(options['date_to'], end_of_day=True)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        compress = options['gzip']
+        chunks = stream_export(
+            options['export_name'],
+            export_format=options['export_format'],
+            date_from=date_from,
+            date_to=date_to,
+            status=options['status'],
+            compress=compress,
+            chunk_size=options['chunk_size'],
+        )
+
+        if options['outlet']:
+            outlet = Outlet.objects.filter(code=options['outlet']).first()
+            if outlet is None:
+                raise CommandError(f"Outlet {options['outlet']} not found")
+            chunks = bind_outlet(outlet, chunks)
+
+        output = options['output']
+        if output:
+            with open(output, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk if compress else chunk.encode('utf-8'))
+            self.stderr.write(self.style.SUCCESS(f'✅ Export written to {output}'))
+        elif compress:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,22 @@
+# restaurant/management/commands/profile_token.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from restaurant.profiling import profile_token
+
+
+class Command(BaseCommand):
+    """
+    Prints a signed X-Profile-Token header value. Requests carrying it may ask
+    for a profile (?profile=sampling) whatever the user's role, e.g. to
+    profile a cashier tablet. Valid for settings.PROFILE_TOKEN_MAX_AGE_SECONDS.
+
+    Usage:
+        python manage.py profile_token
+    """
+    help = 'Print a signed token that allows profiling a request'
+
+    def handle(self, *args, **options):
+        self.stdout.write(profile_token())
+        max_age = getattr(settings, 'PROFILE_TOKEN_MAX_AGE_SECONDS', 3600)
+        self.stderr.write(f'Send as the X-Profile-Token header; valid for {max_age}s')
@@ -0,0 +1,44 @@
+# restaurant/management/commands/project_order_events.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from restaurant.events import DEFAULT_BATCH_SIZE, project_events
+from restaurant.models import Outlet
+from restaurant.outlets import outlet_context
+
+
+class Command(BaseCommand):
+    """
+    Apply new order events to the OrderTimeline table, from its checkpoint
+
+    Usage:
+        python manage.py project_order_events                 # catch up once
+        python manage.py project_order_events --follow        # keep tailing
+        python manage.py project_order_events --outlet downtown
+    """
+    help = 'Update OrderTimeline from the order event journal'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--outlet', help='Outlet code (default: every outlet)')
+        parser.add_argument('--follow', action='store_true', help='Keep polling for new events')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds between polls with --follow')
+
+    def handle(self, *args, **options):
+        outlets = Outlet.objects.all()
+        if options['outlet']:
+            outlets = outlets.filter(code=options['outlet'])
+            if not outlets.exists():
+                raise CommandError(f"Outlet {options['outlet']} not found")
+        outlets = list(outlets)
+
+        while True:
+            for outlet in outlets:
+                with outlet_context(outlet):
+                    applied = project_events(outlet.id, batch_size=options['batch_size'])
+                if applied or not options['follow']:
+                    self.stdout.write(self.style.SUCCESS(f'✅ {outlet.code}: applied {applied} events'))
+            if not options['follow']:
+                break
+            time.sleep(options['interval'])
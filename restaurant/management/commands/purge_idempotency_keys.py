@@ -0,0 +1,18 @@
+# restaurant/management/commands/purge_idempotency_keys.py
+from django.core.management.base import BaseCommand
+
+from restaurant.idempotency import purge_expired_keys
+
+
+class Command(BaseCommand):
+    """
+    Delete expired Idempotency-Key records (run from cron)
+
+    Usage:
+        python manage.py purge_idempotency_keys
+    """
+    help = 'Delete expired idempotency keys'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_keys()
+        self.stdout.write(self.style.SUCCESS(f'✅ Deleted {deleted} expired idempotency keys'))
@@ -0,0 +1,42 @@
+# restaurant/management/commands/refresh_forecasts.py
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from restaurant.forecasting import refresh_forecasts
+from restaurant.models import Outlet
+from restaurant.outlets import outlet_context
+
+
+class Command(BaseCommand):
+    """
+    Refit the kitchen prep forecasts from order history (needs numpy).
+    Run it from cron, e.g. nightly after close.
+
+    Usage:
+        python manage.py refresh_forecasts
+        python manage.py refresh_forecasts --outlet downtown
+    """
+    help = 'Refit per-item demand forecasts (DemandForecast) from order history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--outlet', help='Outlet code (default: every outlet)')
+
+    def handle(self, *args, **options):
+        outlets = Outlet.objects.all()
+        if options['outlet']:
+            outlets = outlets.filter(code=options['outlet'])
+            if not outlets.exists():
+                raise CommandError(f"Outlet {options['outlet']} not found")
+
+        for outlet in outlets:
+            start = time.perf_counter()
+            with outlet_context(outlet):
+                try:
+                    items, rows = refresh_forecasts()
+                except ImproperlyConfigured as e:
+                    raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {outlet.code}: {items} items, {rows} forecast slots in {time.perf_counter() - start:.1f}s'
+            ))
@@ -0,0 +1,46 @@
+# restaurant/management/commands/replay_order_events.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from restaurant.events import DEFAULT_BATCH_SIZE, replay_events
+from restaurant.models import Outlet
+from restaurant.outlets import outlet_context
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the OrderTimeline table from the order event journal
+
+    Usage:
+        python manage.py replay_order_events
+        python manage.py replay_order_events --outlet downtown --batch-size 5000
+    """
+    help = 'Rebuild OrderTimeline by replaying the order event journal'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--outlet', help='Outlet code (default: every outlet)')
+
+    def handle(self, *args, **options):
+        outlets = Outlet.objects.all()
+        if options['outlet']:
+            outlets = outlets.filter(code=options['outlet'])
+            if not outlets.exists():
+                raise CommandError(f"Outlet {options['outlet']} not found")
+
+        def progress(events, orders):
+            self.stdout.write(f'  {events} events, {orders} orders written')
+
+        for outlet in outlets:
+            start = time.perf_counter()
+            with outlet_context(outlet):
+                events, orders = replay_events(
+                    outlet.id,
+                    batch_size=options['batch_size'],
+                    progress=progress if options['verbosity'] > 1 else None,
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ {outlet.code}: replayed {events} events into {orders} orders '
+                f'in {time.perf_counter() - start:.1f}s'
+            ))
@@ -0,0 +1,55 @@
+# restaurant/management/commands/simulate_replication.py
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from restaurant.replicas import replicas_for
+
+
+class Command(BaseCommand):
+    """
+    Local replica simulation for SQLite: copy the primary database file to
+    its replica(s) every --lag seconds, so replicas trail the primary the way
+    a real replica would under replication lag.
+
+    Usage:
+        python manage.py simulate_replication --lag 3
+        python manage.py simulate_replication --once
+    """
+    help = 'Copy a SQLite primary database to its replicas on a delay'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Primary alias (default: default)')
+        parser.add_argument('--lag', type=float, default=2.0, help='Seconds between copies')
+        parser.add_argument('--once', action='store_true', help='Copy once and exit')
+
+    def handle(self, *args, **options):
+        primary = options['database']
+        replicas = replicas_for(primary)
+        if not replicas:
+            raise CommandError(f'No replicas configured for {primary} in REPLICA_DATABASES')
+
+        for alias in [primary] + replicas:
+            if settings.DATABASES[alias]['ENGINE'] != 'django.db.backends.sqlite3':
+                raise CommandError(f'{alias} is not a SQLite database')
+
+        while True:
+            for alias in replicas:
+                self._copy(settings.DATABASES[primary]['NAME'], settings.DATABASES[alias]['NAME'])
+            self.stdout.write(f'🔁 Replicated {primary} -> {", ".join(replicas)}')
+
+            if options['once']:
+                break
+            time.sleep(options['lag'])
+
+    def _copy(self, source_path, target_path):
+        source = sqlite3.connect(str(source_path))
+        target = sqlite3.connect(str(target_path))
+        try:
+            # Online backup: consistent snapshot even while the primary is written to
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
@@ -0,0 +1,289 @@
+# restaurant/menu_search.py
+"""
+In-memory menu search for waiter tablets.
+
+Each worker keeps one index per outlet, built from the menu in a single
+query. Names are normalized (lowercase, accents stripped) and indexed by:
+
+  * a sorted list of name words  -> prefix matches ("pan" -> "Paneer Tikka")
+  * 1-, 2- and 3-grams of words  -> substring matches ("tikk")
+  * padded trigram overlap       -> typo-tolerant matches ("panner", "tika")
+
+All three work on the distinct words of the menu, then map words to items.
+
+MenuItem signals drop an outlet's index when its menu changes; the next
+search rebuilds it. Indexes are also rebuilt after MENU_SEARCH_MAX_AGE_SECONDS
+so changes made by other worker processes show up.
+"""
+import heapq
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from django.conf import settings
+
+from .models import MenuItem
+from .outlets import get_current_outlet
+
+
+MATCH_PREFIX = 'prefix'
+MATCH_SUBSTRING = 'substring'
+MATCH_FUZZY = 'fuzzy'
+
+_RANKS = {MATCH_PREFIX: 0, MATCH_SUBSTRING: 1, MATCH_FUZZY: 2}
+
+
+def normalize(text):
+    """Lowercase, strip accents, collapse everything but letters and digits to single spaces"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return ' '.join(''.join(ch if ch.isalnum() else ' ' for ch in text).split())
+
+
+def _grams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _max_typos(query):
+    return 1 if len(query) <= 5 else 2
+
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent
+    transpositions), giving up once it exceeds ``limit`` (returns limit + 1)
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+class MenuSearchIndex:
+    """
+    Immutable search index over a snapshot of menu items.
+    Matching works on the vocabulary of distinct name words, which stays
+    small even for very large menus; words then map to item ids.
+    """
+
+    def __init__(self, items):
+        self.items = {}                    # id -> item dict (+ 'norm')
+        self.word_items = defaultdict(set)  # word -> ids of items whose name has it
+
+        for item in items:
+            norm = normalize(item['name'])
+            self.items[item['id']] = {**item, 'norm': norm}
+            for word in norm.split():
+                self.word_items[word].add(item['id'])
+
+        self.words = sorted(self.word_items)  # prefix lookups
+        self.grams = defaultdict(set)         # 1/2/3-grams of words -> words (substrings)
+        self.trigrams = defaultdict(set)      # trigrams of ' word ' -> words (typos)
+        for word in self.words:
+            for n in (1, 2, 3):
+                for gram in _grams(word, n):
+                    self.grams[gram].add(word)
+            for gram in _grams(f' {word} ', 3):
+                self.trigrams[gram].add(word)
+
+    def __len__(self):
+        return len(self.items)
+
+    # ---------- word matchers ----------
+
+    def _words_with_prefix(self, part):
+        position = bisect_left(self.words, part)
+        while position < len(self.words) and self.words[position].startswith(part):
+            yield self.words[position]
+            position += 1
+
+    def _words_containing(self, part):
+        if len(part) <= 3:
+            return self.grams.get(part, set())
+
+        postings = sorted((self.grams.get(gram, set()) for gram in _grams(part, 3)), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return {word for word in candidates if part in word}
+
+    def _words_within_typos(self, part):
+        """{word: typos} for words (or word beginnings) a few edits away from ``part``"""
+        limit = _max_typos(part)
+        part_grams = _grams(f' {part} ', 3)
+        # One edit can break at most three trigrams
+        needed = max(1, len(part_grams) - 3 * limit)
+
+        shared = Counter()
+        for gram in part_grams:
+            shared.update(self.trigrams.get(gram, ()))
+
+        matches = {}
+        for word, count in shared.items():
+            if count < needed:
+                continue
+            distance = min(
+                edit_distance(part, word, limit), edit_distance(part, word[:len(part)], limit)
+            )
+            if distance <= limit:
+                matches[word] = distance
+        return matches
+
+    def _ids(self, words):
+        ids = set()
+        for word in words:
+            ids |= self.word_items[word]
+        return ids
+
+    # ---------- search ----------
+
+    def _exact_matches(self, query, parts):
+        """{id: match} for names containing the query (prefix of a word or anywhere)"""
+        if len(parts) == 1:
+            found = dict.fromkeys(self._ids(self._words_with_prefix(query)), MATCH_PREFIX)
+            for item_id in self._ids(self._words_containing(query)):
+                found.setdefault(item_id, MATCH_SUBSTRING)
+            return found
+
+        # Several words: every word must occur, then check the phrase itself
+        candidates = None
+        for part in parts:
+            ids = self._ids(self._words_containing(part))
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return {}
+
+        found = {}
+        for item_id in candidates:
+            norm = self.items[item_id]['norm']
+            position = norm.find(query)
+            if position == 0 or (position > 0 and norm[position - 1] == ' '):
+                found[item_id] = MATCH_PREFIX
+            elif position > 0:
+                found[item_id] = MATCH_SUBSTRING
+        return found
+
+    def _fuzzy_matches(self, parts):
+        """{id: total typos} for names where every query word matches a word within a few typos"""
+        candidates = None
+        for part in parts:
+            if len(part) < 3:
+                typos = dict.fromkeys(self._words_with_prefix(part), 0)
+            else:
+                typos = self._words_within_typos(part)
+
+            best = {}
+            for word, distance in typos.items():
+                for item_id in self.word_items[word]:
+                    if distance < best.get(item_id, distance + 1):
+                        best[item_id] = distance
+
+            if candidates is None:
+                candidates = best
+            else:
+                candidates = {
+                    item_id: distance + best[item_id]
+                    for item_id, distance in candidates.items() if item_id in best
+                }
+            if not candidates:
+                return {}
+        return candidates
+
+    def search(self, query, category=None, available=None, limit=20):
+        """
+        Items matching ``query``, best first: word prefix, then substring,
+        then typo matches (fewest typos first). Each result carries 'match'.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        parts = query.split()
+
+        def keep(item_id):
+            item = self.items[item_id]
+            if category is not None and item['category'] != category:
+                return False
+            if available is not None and item['is_available'] != available:
+                return False
+            return True
+
+        found = {
+            item_id: (match, 0)
+            for item_id, match in self._exact_matches(query, parts).items()
+            if keep(item_id)
+        }
+        if len(found) < limit and len(query) >= 3:
+            for item_id, distance in self._fuzzy_matches(parts).items():
+                if item_id not in found and keep(item_id):
+                    found[item_id] = (MATCH_FUZZY, distance)
+
+        best = heapq.nsmallest(
+            limit, found.items(),
+            key=lambda entry: (_RANKS[entry[1][0]], entry[1][1], self.items[entry[0]]['norm'])
+        )
+        results = []
+        for item_id, (match, _) in best:
+            item = self.items[item_id]
+            results.append({
+                'id': item_id,
+                'name': item['name'],
+                'category': item['category'],
+                'price': str(item['price']),
+                'is_available': item['is_available'],
+                'match': match,
+            })
+        return results
+
+
+# ---------- per-outlet cache ----------
+
+_indexes = {}   # outlet_id -> (built_at, MenuSearchIndex)
+_indexes_lock = threading.Lock()
+
+
+def build_menu_index():
+    """Index of the current outlet's menu (one query)"""
+    return MenuSearchIndex(
+        MenuItem.objects.values('id', 'name', 'category', 'price', 'is_available')
+    )
+
+
+def get_menu_index():
+    """The current outlet's index, rebuilt if invalidated or older than MENU_SEARCH_MAX_AGE_SECONDS"""
+    outlet = get_current_outlet()
+    outlet_id = outlet.id if outlet is not None else None
+    max_age = getattr(settings, 'MENU_SEARCH_MAX_AGE_SECONDS', 60)
+
+    entry = _indexes.get(outlet_id)
+    if entry is not None and time.monotonic() - entry[0] < max_age:
+        return entry[1]
+
+    with _indexes_lock:
+        entry = _indexes.get(outlet_id)
+        if entry is None or time.monotonic() - entry[0] >= max_age:
+            entry = (time.monotonic(), build_menu_index())
+            _indexes[outlet_id] = entry
+    return entry[1]
+
+
+def invalidate_menu_index(outlet_id):
+    """Menu of an outlet changed: rebuild its index on the next search"""
+    _indexes.pop(outlet_id, None)
+    # Searches made outside any outlet index everything
+    _indexes.pop(None, None)
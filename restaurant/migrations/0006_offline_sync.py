@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-19 11:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0005_idempotency_keys'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedorder',
+            name='client_uuid',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='client_uuid',
+            field=models.UUIDField(blank=True, null=True, unique=True),
+        ),
+        migrations.CreateModel(
+            name='SyncOperation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_uuid', models.UUIDField(unique=True)),
+                ('operation', models.CharField(choices=[('create_order', 'Create Order'), ('update_order_status', 'Update Order Status')], max_length=30)),
+                ('client_timestamp', models.DateTimeField(blank=True, null=True)),
+                ('result', models.TextField()),
+                ('applied_at', models.DateTimeField(auto_now_add=True)),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='restaurant.order')),
+                ('user', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sync_operations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'sync_operations',
+            },
+        ),
+    ]
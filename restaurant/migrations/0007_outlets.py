@@ -0,0 +1,136 @@
+# Generated by Django 6.0 on 2026-10-19 11:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+OUTLET_MODELS = ['table', 'menuitem', 'order', 'bill', 'archivedbill', 'archivedorder']
+
+
+def assign_default_outlet(apps, schema_editor):
+    """Existing single-restaurant data becomes the default outlet's data"""
+    if schema_editor.connection.alias != 'default':
+        # Outlet databases start empty; outlets themselves live in 'default'
+        return
+
+    Outlet = apps.get_model('restaurant', 'Outlet')
+    outlet, _ = Outlet.objects.get_or_create(
+        code=getattr(settings, 'DEFAULT_OUTLET_CODE', 'main'),
+        defaults={'name': 'Main Outlet'}
+    )
+    for model_name in OUTLET_MODELS:
+        apps.get_model('restaurant', model_name).objects.filter(
+            outlet__isnull=True
+        ).update(outlet_id=outlet.id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0006_offline_sync'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Outlet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('code', models.SlugField(max_length=30, unique=True)),
+                ('address', models.CharField(blank=True, max_length=255)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'outlets',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='bill',
+            name='generated_by',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bills_generated', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='created_by',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='orders_created', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='syncoperation',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sync_operations', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='table',
+            name='table_number',
+            field=models.CharField(max_length=10),
+        ),
+        migrations.AddField(
+            model_name='archivedbill',
+            name='outlet',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet'),
+        ),
+        migrations.AddField(
+            model_name='archivedorder',
+            name='outlet',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet'),
+        ),
+        migrations.AddField(
+            model_name='bill',
+            name='outlet',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet'),
+        ),
+        migrations.AddField(
+            model_name='menuitem',
+            name='outlet',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='outlet',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet'),
+        ),
+        migrations.AddField(
+            model_name='table',
+            name='outlet',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet'),
+        ),
+        migrations.RunPython(assign_default_outlet, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='archivedbill',
+            name='outlet',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet'),
+        ),
+        migrations.AlterField(
+            model_name='archivedorder',
+            name='outlet',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet'),
+        ),
+        migrations.AlterField(
+            model_name='bill',
+            name='outlet',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet'),
+        ),
+        migrations.AlterField(
+            model_name='menuitem',
+            name='outlet',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='outlet',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet'),
+        ),
+        migrations.AlterField(
+            model_name='table',
+            name='outlet',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet'),
+        ),
+        migrations.AddConstraint(
+            model_name='table',
+            constraint=models.UniqueConstraint(fields=('outlet', 'table_number'), name='tables_outlet_number_uniq'),
+        ),
+    ]
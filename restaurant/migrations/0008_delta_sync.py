@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-19 12:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0007_outlets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletionLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_name', models.CharField(choices=[('table', 'Table'), ('menuitem', 'Menu Item')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'deletion_log',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(fields=['outlet', 'updated_at'], name='menu_items_outlet_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='table',
+            index=models.Index(fields=['outlet', 'updated_at'], name='tables_outlet_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='deletionlog',
+            name='outlet',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet'),
+        ),
+        migrations.AddIndex(
+            model_name='deletionlog',
+            index=models.Index(fields=['outlet', 'model_name', 'deleted_at'], name='deletion_log_since_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-19 12:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0008_delta_sync'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['outlet', 'status'], name='orders_outlet_status_idx'),
+        ),
+    ]
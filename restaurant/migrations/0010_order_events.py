@@ -0,0 +1,68 @@
+# Generated by Django 6.0 on 2026-10-19 15:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0009_orders_status_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderTimeline',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.BigIntegerField(unique=True)),
+                ('table_id', models.BigIntegerField(null=True)),
+                ('status', models.CharField(blank=True, max_length=20)),
+                ('item_count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('bill_id', models.BigIntegerField(null=True)),
+                ('placed_at', models.DateTimeField(null=True)),
+                ('in_kitchen_at', models.DateTimeField(null=True)),
+                ('served_at', models.DateTimeField(null=True)),
+                ('billed_at', models.DateTimeField(null=True)),
+                ('paid_at', models.DateTimeField(null=True)),
+                ('last_sequence', models.BigIntegerField(default=0)),
+                ('outlet', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet')),
+            ],
+            options={
+                'db_table': 'order_timeline',
+            },
+        ),
+        migrations.CreateModel(
+            name='EventCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('consumer', models.CharField(max_length=50)),
+                ('sequence', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('outlet', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet')),
+            ],
+            options={
+                'db_table': 'event_checkpoints',
+                'unique_together': {('outlet', 'consumer')},
+            },
+        ),
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('event_type', models.CharField(choices=[('order_created', 'Order Created'), ('order_status', 'Order Status Changed'), ('bill_generated', 'Bill Generated'), ('bill_paid', 'Bill Paid'), ('bill_snapshot', 'Bill Snapshot')], max_length=20)),
+                ('order_id', models.BigIntegerField(blank=True, null=True)),
+                ('bill_id', models.BigIntegerField(blank=True, null=True)),
+                ('user_id', models.IntegerField(blank=True, null=True)),
+                ('payload', models.TextField()),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('outlet', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet')),
+            ],
+            options={
+                'db_table': 'order_events',
+                'indexes': [models.Index(fields=['outlet', 'id'], name='order_events_outlet_seq_idx')],
+            },
+        ),
+    ]
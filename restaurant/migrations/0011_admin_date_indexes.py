@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 15:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0010_order_events'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bill',
+            index=models.Index(fields=['outlet', 'generated_at'], name='bills_outlet_generated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['outlet', 'created_at'], name='orders_outlet_created_idx'),
+        ),
+    ]
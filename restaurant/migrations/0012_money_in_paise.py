@@ -0,0 +1,76 @@
+# Generated by Django 6.0 on 2026-10-19 16:30
+
+import django.core.validators
+from django.db import migrations, models
+
+import restaurant.money
+
+
+# (model, table, column, MoneyField kwargs): DECIMAL(10, 2) rupees -> BIGINT paise
+MONEY_COLUMNS = [
+    ('menuitem', 'menu_items', 'price', {'validators': [django.core.validators.MinValueValidator(0)]}),
+    ('order', 'orders', 'total_amount', {'default': 0}),
+    ('orderitem', 'order_items', 'price_at_order', {}),
+    ('orderitem', 'order_items', 'subtotal', {}),
+    ('bill', 'bills', 'subtotal', {'default': 0}),
+    ('bill', 'bills', 'tax_amount', {'default': 0}),
+    ('bill', 'bills', 'total_amount', {'default': 0}),
+    ('archivedbill', 'bills_archive', 'subtotal', {'default': 0}),
+    ('archivedbill', 'bills_archive', 'tax_amount', {'default': 0}),
+    ('archivedbill', 'bills_archive', 'total_amount', {'default': 0}),
+    ('archivedorder', 'orders_archive', 'total_amount', {'default': 0}),
+    ('archivedorderitem', 'order_items_archive', 'price_at_order', {}),
+    ('archivedorderitem', 'order_items_archive', 'subtotal', {}),
+    ('ordertimeline', 'order_timeline', 'total_amount', {'default': 0}),
+]
+
+
+def to_paise(model_name, table, column, field_kwargs):
+    """Add <column>_paise, copy the rounded amounts over, then replace the old column with it"""
+    paise = f'{column}_paise'
+    operations = []
+    if 'default' not in field_kwargs:
+        # Unapplying re-adds the old column to tables that have rows: it needs a default
+        operations.append(migrations.AlterField(
+            model_name=model_name,
+            name=column,
+            field=models.DecimalField(max_digits=10, decimal_places=2, default=0, **field_kwargs),
+        ))
+    return operations + [
+        migrations.AddField(
+            model_name=model_name,
+            name=paise,
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunSQL(
+            f'UPDATE {table} SET {paise} = ROUND({column} * 100)',
+            f'UPDATE {table} SET {column} = {paise} / 100.0',
+        ),
+        migrations.RemoveField(
+            model_name=model_name,
+            name=column,
+        ),
+        migrations.RenameField(
+            model_name=model_name,
+            old_name=paise,
+            new_name=column,
+        ),
+        migrations.AlterField(
+            model_name=model_name,
+            name=column,
+            field=restaurant.money.MoneyField(**field_kwargs),
+        ),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0011_admin_date_indexes'),
+    ]
+
+    operations = [
+        operation
+        for model_name, table, column, field_kwargs in MONEY_COLUMNS
+        for operation in to_paise(model_name, table, column, field_kwargs)
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0013_order_amended_event'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='orderevent',
+            name='event_type',
+            field=models.CharField(choices=[('order_created', 'Order Created'), ('order_status', 'Order Status Changed'), ('order_amended', 'Order Amended'), ('order_moved', 'Order Moved'), ('bill_generated', 'Bill Generated'), ('bill_paid', 'Bill Paid'), ('bill_snapshot', 'Bill Snapshot')], max_length=20),
+        ),
+    ]
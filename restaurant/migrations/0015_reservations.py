@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-19 18:10
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0014_order_moved_event'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Reservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('guest_name', models.CharField(max_length=100)),
+                ('phone', models.CharField(blank=True, max_length=15)),
+                ('party_size', models.IntegerField(validators=[django.core.validators.MinValueValidator(1)])),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('status', models.CharField(choices=[('Booked', 'Booked'), ('Seated', 'Seated'), ('Cancelled', 'Cancelled'), ('No Show', 'No Show')], default='Booked', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reservations_created', to=settings.AUTH_USER_MODEL)),
+                ('outlet', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='restaurant.table')),
+            ],
+            options={
+                'db_table': 'reservations',
+                'ordering': ['starts_at'],
+                'indexes': [models.Index(fields=['outlet', 'starts_at'], name='reservations_outlet_start_idx'), models.Index(fields=['table', 'starts_at'], name='reservations_table_start_idx')],
+            },
+        ),
+    ]
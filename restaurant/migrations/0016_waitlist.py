@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-19 18:40
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0015_reservations'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('guest_name', models.CharField(max_length=100)),
+                ('phone', models.CharField(blank=True, max_length=15)),
+                ('party_size', models.IntegerField(validators=[django.core.validators.MinValueValidator(1)])),
+                ('status', models.CharField(choices=[('Waiting', 'Waiting'), ('Seated', 'Seated'), ('Left', 'Left')], default='Waiting', max_length=20)),
+                ('quoted_minutes', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('seated_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='waitlist_entries_created', to=settings.AUTH_USER_MODEL)),
+                ('outlet', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet')),
+                ('table', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='waitlist_entries', to='restaurant.table')),
+            ],
+            options={
+                'db_table': 'waitlist',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['outlet', 'status', 'created_at'], name='waitlist_outlet_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-19 19:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0016_waitlist'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DemandForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField()),
+                ('hour', models.PositiveSmallIntegerField()),
+                ('quantity', models.FloatField()),
+                ('refreshed_at', models.DateTimeField()),
+                ('menu_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='forecasts', to='restaurant.menuitem')),
+                ('outlet', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.outlet')),
+            ],
+            options={
+                'db_table': 'demand_forecasts',
+                'indexes': [models.Index(fields=['outlet', 'weekday', 'hour'], name='forecasts_outlet_slot_idx')],
+                'constraints': [models.UniqueConstraint(fields=('outlet', 'menu_item', 'weekday', 'hour'), name='forecasts_outlet_item_slot_uniq')],
+            },
+        ),
+    ]
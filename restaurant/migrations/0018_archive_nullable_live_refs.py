@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-19 20:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('restaurant', '0017_demand_forecasts'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archivedbill',
+            name='table',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.table'),
+        ),
+        migrations.AlterField(
+            model_name='archivedorder',
+            name='table',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.table'),
+        ),
+        migrations.AlterField(
+            model_name='archivedorderitem',
+            name='menu_item',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='restaurant.menuitem'),
+        ),
+    ]
@@ -1,11 +1,63 @@
 # restaurant/models.py
+from datetime import datetime, timedelta
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
+from django.utils import timezone
 from decimal import Decimal
+from .outlets import OutletQuerySet, OutletScopedManager, get_current_outlet, get_default_outlet
+from .money import MoneyField, from_paise, line_subtotal, sum_paise, tax_paise
+
+
+class Outlet(models.Model):
+    """
+    A restaurant outlet. Tables, menu, orders and bills belong to one outlet
+    and may live on that outlet's own database (settings.OUTLET_DATABASES)
+    """
+    name = models.CharField(max_length=100)
+    code = models.SlugField(max_length=30, unique=True)
+    address = models.CharField(max_length=255, blank=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'outlets'
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} ({self.code})"
+
+
+class OutletScopedModel(models.Model):
+    """
+    Base for per-outlet data: querysets are filtered to the current outlet and
+    new rows default to it. The outlet is referenced by id only (no DB
+    constraint) because the row may live on a different database.
+    """
+    OUTLET_LOOKUP = 'outlet'
+
+    outlet = models.ForeignKey(
+        Outlet, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+'
+    )
+
+    objects = OutletScopedManager()
+
+    class Meta:
+        abstract = True
+
+    def resolve_outlet_id(self):
+        outlet = get_current_outlet() or get_default_outlet()
+        return outlet.id
+
+    def save(self, *args, **kwargs):
+        if self.outlet_id is None:
+            self.outlet_id = self.resolve_outlet_id()
+        super().save(*args, **kwargs)
 
 
-class Table(models.Model):
+class Table(OutletScopedModel):
     """
     Represents a restaurant table
     Requirement: Table Management (Section 1)
@@ -17,7 +69,7 @@ class Table(models.Model):
         ('Closed', 'Closed'),
     ]
     
-    table_number = models.CharField(max_length=10, unique=True)
+    table_number = models.CharField(max_length=10)
     seating_capacity = models.IntegerField(validators=[MinValueValidator(1)])
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Available')
     created_at = models.DateTimeField(auto_now_add=True)
@@ -26,12 +78,19 @@ class Table(models.Model):
     class Meta:
         db_table = 'tables'
         ordering = ['table_number']
+        constraints = [
+            models.UniqueConstraint(fields=['outlet', 'table_number'], name='tables_outlet_number_uniq'),
+        ]
+        indexes = [
+            # Delta sync: ?since=<cursor>
+            models.Index(fields=['outlet', 'updated_at'], name='tables_outlet_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.table_number} - {self.status}"
 
 
-class MenuItem(models.Model):
+class MenuItem(OutletScopedModel):
     """
     Represents menu items available for ordering
     Requirement: Menu & Orders (Section 2)
@@ -45,7 +104,7 @@ class MenuItem(models.Model):
     
     name = models.CharField(max_length=100)
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
-    price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
+    price = MoneyField(validators=[MinValueValidator(0)])
     is_available = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -53,12 +112,67 @@ class MenuItem(models.Model):
     class Meta:
         db_table = 'menu_items'
         ordering = ['category', 'name']
+        indexes = [
+            # Delta sync: ?since=<cursor>
+            models.Index(fields=['outlet', 'updated_at'], name='menu_items_outlet_updated_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - ₹{self.price}"
 
 
-class Order(models.Model):
+class ProbedDatesQuerySet(OutletQuerySet):
+    """
+    Orders / bills: datetimes() for the admin date hierarchy without SELECT
+    DISTINCT over every row: each year / month / day between the first and
+    last row is probed with an indexed EXISTS (a drilldown shows at most 31
+    periods)
+    """
+    MAX_PROBES = 366
+
+    @staticmethod
+    def _truncate(moment, kind):
+        return datetime(moment.year, 1 if kind == 'year' else moment.month, moment.day if kind == 'day' else 1)
+
+    @staticmethod
+    def _next_period(start, kind):
+        if kind == 'year':
+            return start.replace(year=start.year + 1)
+        if kind == 'month':
+            return start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+        return start + timedelta(days=1)
+
+    def datetimes(self, field_name, kind, order='ASC', tzinfo=None, **kwargs):
+        if kind not in ('year', 'month', 'day') or tzinfo is not None or kwargs:
+            return super().datetimes(field_name, kind, order, tzinfo, **kwargs)
+
+        values = self.order_by().exclude(**{f'{field_name}__isnull': True}).values_list(field_name, flat=True)
+        first = values.order_by(field_name).first()
+        last = values.order_by(f'-{field_name}').first()
+        if first is None:
+            return []
+        if settings.USE_TZ:
+            first, last = timezone.localtime(first), timezone.localtime(last)
+
+        starts = []
+        start = self._truncate(first, kind)
+        while start <= last.replace(tzinfo=None):
+            starts.append(start)
+            start = self._next_period(start, kind)
+        if len(starts) > self.MAX_PROBES:
+            return super().datetimes(field_name, kind, order, tzinfo)
+
+        periods = []
+        for start in starts:
+            end = self._next_period(start, kind)
+            if settings.USE_TZ:
+                start, end = timezone.make_aware(start), timezone.make_aware(end)
+            if self.filter(**{f'{field_name}__gte': start, f'{field_name}__lt': end}).exists():
+                periods.append(start)
+        return periods if order == 'ASC' else periods[::-1]
+
+
+class Order(OutletScopedModel):
     """
     Represents an order placed at a table
     Requirement: Menu & Orders (Section 2)
@@ -78,22 +192,37 @@ class Order(models.Model):
         related_name='orders'
     )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Placed')
-    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='orders_created')
-    total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, db_constraint=False, related_name='orders_created'
+    )
+    total_amount = MoneyField(default=0)
     is_billed = models.BooleanField(default=False) 
+    # Set when the order was created offline and pushed through the sync endpoint
+    client_uuid = models.UUIDField(null=True, blank=True, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = OutletScopedManager.from_queryset(ProbedDatesQuerySet)()
+    
     class Meta:
         db_table = 'orders'
         ordering = ['-created_at']
+        indexes = [
+            # Kitchen prep queue: open (Placed / In Kitchen) orders
+            models.Index(fields=['outlet', 'status'], name='orders_outlet_status_idx'),
+            # Admin changelist: newest first, date hierarchy
+            models.Index(fields=['outlet', 'created_at'], name='orders_outlet_created_idx'),
+        ]
     
     def __str__(self):
         return f"Order #{self.id} - {self.table.table_number}"
     
+    def resolve_outlet_id(self):
+        return self.table.outlet_id
+    
     def calculate_total(self):
         """Calculate total amount from order items"""
-        total = sum(item.subtotal for item in self.order_items.all())
+        total = from_paise(sum_paise(self.order_items.all(), 'subtotal'))
         self.total_amount = total
         self.save()
         return total
@@ -104,13 +233,17 @@ class OrderItem(models.Model):
     Represents individual items in an order
     Requirement: Menu & Orders (Section 2) - Allow quantity change
     """
+    OUTLET_LOOKUP = 'order__outlet'
+    
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='order_items')
     menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE)
     quantity = models.IntegerField(validators=[MinValueValidator(1)])
-    price_at_order = models.DecimalField(max_digits=10, decimal_places=2)
-    subtotal = models.DecimalField(max_digits=10, decimal_places=2)
+    price_at_order = MoneyField()
+    subtotal = MoneyField()
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = OutletScopedManager()
+    
     class Meta:
         db_table = 'order_items'
     
@@ -121,11 +254,11 @@ class OrderItem(models.Model):
         """Auto-calculate subtotal before saving"""
         if not self.price_at_order:
             self.price_at_order = self.menu_item.price
-        self.subtotal = self.price_at_order * self.quantity
+        self.subtotal = line_subtotal(self.price_at_order, self.quantity)
         super().save(*args, **kwargs)
 
 
-class Bill(models.Model):
+class Bill(OutletScopedModel):
     """
     Represents a bill generated for a table
     Requirement: Billing (Section 3)
@@ -137,51 +270,423 @@ class Bill(models.Model):
     ]
     
     table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='bills')
-    subtotal = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    subtotal = MoneyField(default=0)
     tax_percentage = models.DecimalField(max_digits=5, decimal_places=2, default=Decimal('5.00'))  # ✅ FIXED - Use Decimal
-    tax_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
-    total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    tax_amount = MoneyField(default=0)
+    total_amount = MoneyField(default=0)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending Payment')
     generated_at = models.DateTimeField(auto_now_add=True)
     paid_at = models.DateTimeField(null=True, blank=True)
-    generated_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='bills_generated')
+    generated_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, db_constraint=False, related_name='bills_generated'
+    )
+    
+    objects = OutletScopedManager.from_queryset(ProbedDatesQuerySet)()
     
     class Meta:
         db_table = 'bills'
         ordering = ['-generated_at']
+        indexes = [
+            # Used by the archive job to find old paid bills
+            models.Index(fields=['status', 'paid_at'], name='bills_status_paid_at_idx'),
+            # Admin changelist: newest first, date hierarchy
+            models.Index(fields=['outlet', 'generated_at'], name='bills_outlet_generated_idx'),
+        ]
     
     def __str__(self):
         return f"Bill #{self.id} - {self.table.table_number} - ₹{self.total_amount}"
     
+    def resolve_outlet_id(self):
+        return self.table.outlet_id
+    
     def calculate_bill(self):
         """
         ✅ FIXED - Calculate bill from unbilled served orders only
+        The ids of the orders it billed are left in self.billed_order_ids
         """
-        # Get only UNBILLED orders that are served
-        orders = self.table.orders.filter(status='Served', is_billed=False)
+        # Get only UNBILLED orders that are served, locked until the bill commits:
+        # order amendments (restaurant/amendments.py) wait, then see is_billed
+        # (call inside a transaction)
+        order_ids = list(
+            self.table.orders.select_for_update()
+            .filter(status='Served', is_billed=False)
+            .order_by('id').values_list('id', flat=True)
+        )
+        self.billed_order_ids = order_ids
         
-        if not orders.exists():
+        if not order_ids:
             # No unbilled served orders
             return Decimal('0.00')
         
-        # Calculate subtotal from all order items in unbilled orders
-        self.subtotal = Decimal('0.00')
-        for order in orders:
-            for order_item in order.order_items.all():
-                self.subtotal += order_item.subtotal
-        
-        # ✅ FIXED - Ensure both are Decimal for calculation
-        self.tax_amount = (self.subtotal * self.tax_percentage) / Decimal('100.00')
+        # Subtotal of all order items in unbilled orders (one integer SUM query),
+        # tax rounded once on the whole bill (restaurant/money.py)
+        subtotal = sum_paise(OrderItem.objects.filter(order_id__in=order_ids), 'subtotal')
+        tax = tax_paise(subtotal, self.tax_percentage)
         
-        # Calculate total
-        self.total_amount = self.subtotal + self.tax_amount
+        self.subtotal = from_paise(subtotal)
+        self.tax_amount = from_paise(tax)
+        self.total_amount = from_paise(subtotal + tax)
         
         self.save()
         
         # ✅ Mark orders as billed
-        orders.update(
+        # (update() skips auto_now, so bump updated_at for sync cursors)
+        Order.objects.filter(id__in=order_ids).update(
             is_billed=True,
-            bill=self
+            bill=self,
+            updated_at=timezone.now()
         )
         
-        return self.total_amount
\ No newline at end of file
+        return self.total_amount
+
+
+class Reservation(OutletScopedModel):
+    """
+    A table held for a party over a time window
+    (tables are assigned by the best-fit allocator, restaurant/reservations.py)
+    """
+    STATUS_CHOICES = [
+        ('Booked', 'Booked'),
+        ('Seated', 'Seated'),
+        ('Cancelled', 'Cancelled'),
+        ('No Show', 'No Show'),
+    ]
+    # Statuses that hold the table for the window
+    ACTIVE_STATUSES = ('Booked', 'Seated')
+
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='reservations')
+    guest_name = models.CharField(max_length=100)
+    phone = models.CharField(max_length=15, blank=True)
+    party_size = models.IntegerField(validators=[MinValueValidator(1)])
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Booked')
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, db_constraint=False, related_name='reservations_created'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'reservations'
+        ordering = ['starts_at']
+        indexes = [
+            # Day view and allocator index build: one outlet, one day
+            models.Index(fields=['outlet', 'starts_at'], name='reservations_outlet_start_idx'),
+            # Overlap check when a booking is confirmed
+            models.Index(fields=['table', 'starts_at'], name='reservations_table_start_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.guest_name} ({self.party_size}) - {self.table.table_number} @ {self.starts_at}"
+
+    def resolve_outlet_id(self):
+        return self.table.outlet_id
+
+
+class WaitlistEntry(OutletScopedModel):
+    """
+    A walk-in party waiting for a table, quoted a wait from turn-time
+    statistics (restaurant/turn_times.py)
+    """
+    STATUS_CHOICES = [
+        ('Waiting', 'Waiting'),
+        ('Seated', 'Seated'),
+        ('Left', 'Left'),
+    ]
+
+    guest_name = models.CharField(max_length=100)
+    phone = models.CharField(max_length=15, blank=True)
+    party_size = models.IntegerField(validators=[MinValueValidator(1)])
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Waiting')
+    # Wait quoted when the party joined, in minutes (None: no table seats them)
+    quoted_minutes = models.IntegerField(null=True, blank=True)
+    table = models.ForeignKey(
+        Table, on_delete=models.SET_NULL, null=True, blank=True, related_name='waitlist_entries'
+    )
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, db_constraint=False, related_name='waitlist_entries_created'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    seated_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'waitlist'
+        ordering = ['created_at']
+        indexes = [
+            # The live queue: waiting parties of one outlet, first come first served
+            models.Index(fields=['outlet', 'status', 'created_at'], name='waitlist_outlet_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.guest_name} ({self.party_size}) - {self.status}"
+
+
+class DemandForecast(OutletScopedModel):
+    """
+    Expected quantity of a menu item in one weekday / hour slot, fitted from
+    order history by the refresh_forecasts batch job (restaurant/forecasting.py)
+    """
+    menu_item = models.ForeignKey(MenuItem, on_delete=models.CASCADE, related_name='forecasts')
+    weekday = models.PositiveSmallIntegerField()  # 0 = Monday
+    hour = models.PositiveSmallIntegerField()     # local time
+    quantity = models.FloatField()
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'demand_forecasts'
+        constraints = [
+            models.UniqueConstraint(fields=['outlet', 'menu_item', 'weekday', 'hour'],
+                                    name='forecasts_outlet_item_slot_uniq'),
+        ]
+        indexes = [
+            # Prep endpoint: every item's forecast for the slots of the next service window
+            models.Index(fields=['outlet', 'weekday', 'hour'], name='forecasts_outlet_slot_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.menu_item_id} @ {self.weekday}/{self.hour:02d}h: {self.quantity:.1f}"
+
+    def resolve_outlet_id(self):
+        return self.menu_item.outlet_id
+
+# ==================== ARCHIVE (cold history) ====================
+# Same shape as Bill / Order / OrderItem, original ids preserved.
+# Foreign keys to the live tables are kept as plain columns (no DB constraint)
+# so archived rows never block deletes and never cascade. They are null=True
+# so lookups through them LEFT JOIN: an archived row whose table or menu item
+# was deleted later still shows up (with the related columns empty).
+
+class ArchivedBill(OutletScopedModel):
+    """
+    Paid bill moved out of the live `bills` table by the archive job
+    """
+    id = models.BigIntegerField(primary_key=True)
+    table = models.ForeignKey(
+        Table, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='+'
+    )
+    subtotal = MoneyField(default=0)
+    tax_percentage = models.DecimalField(max_digits=5, decimal_places=2, default=Decimal('5.00'))
+    tax_amount = MoneyField(default=0)
+    total_amount = MoneyField(default=0)
+    status = models.CharField(max_length=20, choices=Bill.STATUS_CHOICES, default='Paid')
+    generated_at = models.DateTimeField()
+    paid_at = models.DateTimeField(null=True, blank=True)
+    generated_by = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='+'
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'bills_archive'
+        ordering = ['-generated_at']
+
+    def __str__(self):
+        return f"Archived Bill #{self.id} - ₹{self.total_amount}"
+
+
+class ArchivedOrder(OutletScopedModel):
+    """
+    Order moved to the archive together with its bill
+    """
+    id = models.BigIntegerField(primary_key=True)
+    table = models.ForeignKey(
+        Table, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='+'
+    )
+    bill = models.ForeignKey(ArchivedBill, on_delete=models.CASCADE, null=True, related_name='orders')
+    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES, default='Served')
+    created_by = models.ForeignKey(
+        User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='+'
+    )
+    total_amount = MoneyField(default=0)
+    is_billed = models.BooleanField(default=True)
+    client_uuid = models.UUIDField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'orders_archive'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Archived Order #{self.id}"
+
+
+class ArchivedOrderItem(models.Model):
+    """
+    Order item moved to the archive together with its order
+    """
+    OUTLET_LOOKUP = 'order__outlet'
+
+    id = models.BigIntegerField(primary_key=True)
+    order = models.ForeignKey(ArchivedOrder, on_delete=models.CASCADE, related_name='order_items')
+    menu_item = models.ForeignKey(
+        MenuItem, on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name='+'
+    )
+    quantity = models.IntegerField()
+    price_at_order = MoneyField()
+    subtotal = MoneyField()
+    created_at = models.DateTimeField()
+
+    objects = OutletScopedManager()
+
+    class Meta:
+        db_table = 'order_items_archive'
+
+    def __str__(self):
+        return f"{self.menu_item_id} x {self.quantity}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    First response for an Idempotency-Key header, replayed on client retries.
+    A row with no response_status is a request still in flight.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = 'idempotency_keys'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='idempotency_user_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}:{self.key} - {self.response_status or 'in flight'}"
+
+
+class SyncOperation(models.Model):
+    """
+    Operation pushed by an offline tablet through the sync endpoint.
+    client_uuid is generated on the tablet; a replayed operation is answered
+    from `result` instead of being applied twice.
+    """
+    OPERATION_CHOICES = [
+        ('create_order', 'Create Order'),
+        ('update_order_status', 'Update Order Status'),
+    ]
+
+    client_uuid = models.UUIDField(unique=True)
+    user = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, db_constraint=False, related_name='sync_operations'
+    )
+    operation = models.CharField(max_length=30, choices=OPERATION_CHOICES)
+    order = models.ForeignKey(Order, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    client_timestamp = models.DateTimeField(null=True, blank=True)
+    result = models.TextField()
+    applied_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'sync_operations'
+
+    def __str__(self):
+        return f"{self.operation} {self.client_uuid}"
+
+
+class DeletionLog(OutletScopedModel):
+    """
+    Tombstone for a deleted table or menu item, so delta polls (?since=)
+    can tell clients to drop it. Old rows can be purged once no client
+    holds a cursor that old.
+    """
+    MODEL_CHOICES = [
+        ('table', 'Table'),
+        ('menuitem', 'Menu Item'),
+    ]
+
+    model_name = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'deletion_log'
+        indexes = [
+            models.Index(fields=['outlet', 'model_name', 'deleted_at'], name='deletion_log_since_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model_name} {self.object_id} deleted"
+
+
+# ==================== ORDER EVENTS (journal) ====================
+
+class OrderEvent(OutletScopedModel):
+    """
+    Append-only journal of order lifecycle changes, written in the same
+    transaction as the change. ``id`` is the sequence consumers tail from;
+    ``payload`` is compact JSON (see restaurant/events.py). Old events are
+    compacted / purged by compact_order_events.
+    """
+    EVENT_CHOICES = [
+        ('order_created', 'Order Created'),
+        ('order_status', 'Order Status Changed'),
+        ('order_amended', 'Order Amended'),
+        ('order_moved', 'Order Moved'),
+        ('bill_generated', 'Bill Generated'),
+        ('bill_paid', 'Bill Paid'),
+        ('bill_snapshot', 'Bill Snapshot'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    event_type = models.CharField(max_length=20, choices=EVENT_CHOICES)
+    # Plain ids: events outlive archived / deleted orders and bills
+    order_id = models.BigIntegerField(null=True, blank=True)
+    bill_id = models.BigIntegerField(null=True, blank=True)
+    user_id = models.IntegerField(null=True, blank=True)
+    payload = models.TextField()
+    recorded_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'order_events'
+        indexes = [
+            models.Index(fields=['outlet', 'id'], name='order_events_outlet_seq_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.event_type}"
+
+
+class EventCheckpoint(OutletScopedModel):
+    """Last event sequence a consumer of the journal has processed"""
+    consumer = models.CharField(max_length=50)
+    sequence = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'event_checkpoints'
+        unique_together = [('outlet', 'consumer')]
+
+    def __str__(self):
+        return f"{self.consumer} @ {self.sequence}"
+
+
+class OrderTimeline(OutletScopedModel):
+    """
+    One row per order with the time of every lifecycle step - derived from
+    the order event journal only (project_order_events keeps it current,
+    replay_order_events rebuilds it)
+    """
+    order_id = models.BigIntegerField(unique=True)
+    table_id = models.BigIntegerField(null=True)
+    status = models.CharField(max_length=20, blank=True)
+    item_count = models.IntegerField(default=0)
+    total_amount = MoneyField(default=0)
+    bill_id = models.BigIntegerField(null=True)
+    placed_at = models.DateTimeField(null=True)
+    in_kitchen_at = models.DateTimeField(null=True)
+    served_at = models.DateTimeField(null=True)
+    billed_at = models.DateTimeField(null=True)
+    paid_at = models.DateTimeField(null=True)
+    last_sequence = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'order_timeline'
+
+    def __str__(self):
+        return f"Order #{self.order_id} timeline"
@@ -0,0 +1,99 @@
+# restaurant/money.py
+"""
+Money: rupee amounts stored as whole paise.
+
+Every amount column (menu prices, order and bill totals, the archive and the
+order timeline) is a MoneyField: a BIGINT of paise in the database, a
+two-place Decimal ('180.00') in Python, so str(amount) in API responses,
+receipts, exports and event payloads reads exactly as before. Sums and
+group-bys run on integers in the database, and totals are computed in paise
+with Python ints.
+
+Rounding rules (both ROUND_HALF_UP, applied in exactly these two places):
+  - per line: the unit price is rounded to the paisa, then multiplied by the
+    quantity; a line subtotal is exact
+  - per bill: tax is computed once on the bill subtotal and rounded to the
+    paisa; total = subtotal + tax
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import F, Sum, Value
+
+
+PAISE_PER_RUPEE = 100
+_PAISA = Decimal('0.01')
+
+
+def to_paise(amount):
+    """Rupees (Decimal, str, int or float) -> whole paise, rounded half up"""
+    if isinstance(amount, int):
+        return amount * PAISE_PER_RUPEE
+    if isinstance(amount, float):
+        amount = repr(amount)
+    return int(Decimal(amount).quantize(_PAISA, rounding=ROUND_HALF_UP) * PAISE_PER_RUPEE)
+
+
+def from_paise(paise):
+    """Whole paise -> rupees as a two-place Decimal (18000 -> Decimal('180.00'))"""
+    return Decimal(int(paise)).scaleb(-2)
+
+
+def _divide_half_up(numerator, denominator):
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if remainder * 2 >= denominator:
+        quotient += 1
+    return quotient if numerator >= 0 else -quotient
+
+
+def line_subtotal(price, quantity):
+    """Per-line rule: unit price rounded to the paisa, times quantity (Decimal)"""
+    return from_paise(to_paise(price) * quantity)
+
+
+def tax_paise(subtotal_paise, percentage):
+    """Per-bill rule: tax on the whole subtotal, rounded half up to the paisa"""
+    # Percentages have two decimals (5.00, 12.50): work in hundredths of a percent
+    basis_points = to_paise(percentage)
+    return _divide_half_up(subtotal_paise * basis_points, 100 * 100)
+
+
+def sum_paise(queryset, field):
+    """SUM of a money column in the database, as whole paise (int)"""
+    total = queryset.aggregate(paise=Sum(field, output_field=models.BigIntegerField()))['paise']
+    return int(total or 0)
+
+
+def add_paise(field, paise):
+    """``field + paise`` for a delta UPDATE (SET total_amount = total_amount + 150)"""
+    return F(field) + Value(paise, output_field=models.BigIntegerField())
+
+
+class MoneyField(models.BigIntegerField):
+    """Rupee amount: Decimal('180.00') in Python, BIGINT paise in the database"""
+    description = 'Amount in rupees, stored in paise'
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else from_paise(value)
+
+    def to_python(self, value):
+        if value is None or value == '':
+            return None
+        try:
+            return from_paise(to_paise(value))
+        except (ArithmeticError, TypeError, ValueError):
+            raise ValidationError(f'“{value}” is not a valid amount.', code='invalid')
+
+    def get_prep_value(self, value):
+        value = models.Field.get_prep_value(self, value)
+        return None if value is None else to_paise(value)
+
+    def formfield(self, **kwargs):
+        # Skip IntegerField.formfield(): edited in rupees with two decimals
+        return models.Field.formfield(self, **{
+            'form_class': forms.DecimalField,
+            'decimal_places': 2,
+            **kwargs,
+        })
@@ -0,0 +1,224 @@
+# restaurant/outlets.py
+"""
+Multi-outlet support: the "current outlet", outlet-scoped managers and the
+database router that places each outlet's data on its own database.
+
+The current outlet comes from (in order):
+  1. an explicit ``outlet_context(outlet)`` block (jobs, commands, streams)
+  2. the request being served: the user's outlet, or the ``X-Outlet`` header
+     (outlet code) for Admins and users not tied to an outlet
+  3. the default outlet (settings.DEFAULT_OUTLET_CODE) for authenticated
+     requests that resolve to nothing else
+
+Outside a request and outside outlet_context() there is no current outlet:
+querysets are unscoped and the router defers to Django's defaults.
+
+settings.OUTLET_DATABASES maps outlet codes to database aliases, e.g.
+``{'downtown': 'outlet_downtown'}``. Unmapped outlets live in 'default'.
+Every database carries the full schema; only the partitioned tables below
+hold data outside 'default'.
+"""
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import models, transaction
+from django.http import JsonResponse
+
+
+OUTLET_HEADER = 'X-Outlet'
+
+# Restaurant models whose rows live in their outlet's database
+PARTITIONED_MODELS = {
+    'table', 'menuitem', 'order', 'orderitem', 'bill',
+    'archivedbill', 'archivedorder', 'archivedorderitem', 'syncoperation', 'deletionlog',
+    'orderevent', 'eventcheckpoint', 'ordertimeline', 'reservation', 'waitlistentry',
+    'demandforecast',
+}
+
+_current_outlet = contextvars.ContextVar('current_outlet', default=None)
+_current_request = contextvars.ContextVar('current_request', default=None)
+
+
+def default_outlet_code():
+    return getattr(settings, 'DEFAULT_OUTLET_CODE', 'main')
+
+
+def get_default_outlet():
+    from .models import Outlet
+    outlet, _ = Outlet.objects.get_or_create(
+        code=default_outlet_code(),
+        defaults={'name': 'Main Outlet'}
+    )
+    return outlet
+
+
+def _header_outlet(request):
+    """Active outlet named by the X-Outlet header (None if there is none), cached on the request"""
+    if not hasattr(request, '_header_outlet'):
+        from .models import Outlet
+        code = request.headers.get(OUTLET_HEADER)
+        request._header_outlet = Outlet.objects.filter(code=code, is_active=True).first() if code else None
+    return request._header_outlet
+
+
+def _outlet_for_request(request):
+    """Resolve (and cache on the request) the outlet an authenticated request works in"""
+    if hasattr(request, '_outlet'):
+        return request._outlet
+
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        # DRF authenticates inside the view; don't cache until it has
+        return None
+
+    from .models import Outlet
+    profile = getattr(user, 'profile', None)
+    outlet = profile.outlet if profile is not None else None
+
+    code = request.headers.get(OUTLET_HEADER)
+    if code and (outlet is None or profile.role_id == 1):
+        outlet = _header_outlet(request)
+        if outlet is None:
+            raise Outlet.DoesNotExist(f'Outlet {code} not found')
+
+    request._outlet = outlet or get_default_outlet()
+    return request._outlet
+
+
+def get_current_outlet():
+    outlet = _current_outlet.get()
+    if outlet is not None:
+        return outlet
+    request = _current_request.get()
+    if request is not None:
+        return _outlet_for_request(request)
+    return None
+
+
+@contextmanager
+def outlet_context(outlet):
+    """Run a block as ``outlet`` (scoping and routing), outside of a request"""
+    token = _current_outlet.set(outlet)
+    try:
+        yield outlet
+    finally:
+        _current_outlet.reset(token)
+
+
+def bind_outlet(outlet, iterator):
+    """
+    Iterate ``iterator`` with ``outlet`` current for every step.
+    Needed for streaming responses, which are consumed after the view (and
+    its request context) has returned.
+    """
+    iterator = iter(iterator)
+    while True:
+        with outlet_context(outlet):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def database_for_outlet(outlet):
+    return getattr(settings, 'OUTLET_DATABASES', {}).get(outlet.code, 'default')
+
+
+def current_database():
+    """Alias holding the current outlet's data ('default' when there is none)"""
+    outlet = get_current_outlet()
+    return database_for_outlet(outlet) if outlet is not None else 'default'
+
+
+def outlet_atomic():
+    """transaction.atomic() on the current outlet's database"""
+    return transaction.atomic(using=current_database())
+
+
+def is_partitioned(model):
+    return model._meta.app_label == 'restaurant' and model._meta.model_name in PARTITIONED_MODELS
+
+
+# ---------- scoped managers ----------
+
+class OutletQuerySet(models.QuerySet):
+    def for_outlet(self, outlet):
+        return self.filter(**{self.model.OUTLET_LOOKUP: outlet})
+
+
+class OutletScopedManager(models.Manager.from_queryset(OutletQuerySet)):
+    """
+    Default manager for outlet data: filtered to the current outlet when
+    there is one. Related-object access uses the plain base manager.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        outlet = get_current_outlet()
+        if outlet is not None:
+            queryset = queryset.filter(**{self.model.OUTLET_LOOKUP: outlet.id})
+        return queryset
+
+
+# ---------- request binding ----------
+
+class OutletMiddleware:
+    """
+    Makes the request visible to get_current_outlet() for the duration of the view.
+    An unknown or inactive X-Outlet code is answered with a 404 here: the user
+    is only authenticated inside the view, where the lookup would fail in the
+    middle of the first scoped query.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        code = request.headers.get(OUTLET_HEADER)
+        if code and _header_outlet(request) is None:
+            return JsonResponse({'success': False, 'message': f'Outlet {code} not found'}, status=404)
+
+        token = _current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _current_request.reset(token)
+
+
+# ---------- database router ----------
+
+class OutletRouter:
+    """
+    Sends partitioned restaurant models to the current outlet's database.
+    Objects already loaded stay on the database they came from, and lookups
+    from an outlet object to a shared model (User, Outlet) go to 'default'.
+    """
+
+    def _route(self, model, hints):
+        instance = hints.get('instance')
+
+        if not is_partitioned(model):
+            if instance is not None and is_partitioned(type(instance)):
+                return 'default'
+            return None
+
+        if instance is not None and is_partitioned(type(instance)) and instance._state.db:
+            return instance._state.db
+
+        outlet = get_current_outlet()
+        if outlet is None:
+            return None
+        return database_for_outlet(outlet)
+
+    def db_for_read(self, model, **hints):
+        return self._route(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._route(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Outlet rows reference users and outlets in 'default' by id only
+        # (no DB constraint), which is exactly what makes the split possible
+        return True
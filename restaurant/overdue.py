@@ -0,0 +1,283 @@
+# restaurant/overdue.py
+"""
+Push-based overdue bill alerts.
+
+Each worker process keeps a min-heap of (deadline, bill_id) for bills in
+"Pending Payment". A daemon thread sleeps until the earliest deadline, moves
+expired bills into the overdue set and pushes an event to every subscribed
+server-sent-events stream. Bill signals feed the heap (generate_bill) and
+clear it (mark_bill_paid), so the overdue set is always current and
+get_overdue_bills no longer scans the bills table.
+
+The scheduler is started lazily on first use and rebuilds itself from the
+database then, and again every OVERDUE_RESYNC_SECONDS, which also picks up
+bills generated by other worker processes.
+"""
+import heapq
+import logging
+import queue
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .models import Bill, Outlet
+from .outlets import outlet_context
+
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _bill_info(bill_id, outlet_id, table_number, total_amount, generated_at):
+    return {
+        'id': bill_id,
+        'outlet_id': outlet_id,
+        'table': table_number,
+        'total_amount': str(total_amount),
+        'generated_at': generated_at,
+    }
+
+
+def serialize_overdue(info, now=None):
+    """Public shape of an overdue bill (same fields get_overdue_bills always returned)"""
+    now = now or timezone.now()
+    return {
+        'id': info['id'],
+        'table': info['table'],
+        'total_amount': info['total_amount'],
+        'minutes_pending': int((now - info['generated_at']).total_seconds() / 60),
+        'generated_at': info['generated_at'],
+    }
+
+
+class OverdueBillScheduler:
+    """In-process timer scheduler for pending bill deadlines"""
+
+    def __init__(self, threshold_minutes, resync_seconds):
+        self.threshold = timedelta(minutes=threshold_minutes)
+        self.resync_seconds = resync_seconds
+        self._cond = threading.Condition()
+        # Bills are keyed by (outlet_id, bill_id): outlets on separate
+        # databases have overlapping bill ids
+        self._heap = []          # (deadline, key); stale entries are skipped lazily
+        self._pending = {}       # key -> info, deadline not reached yet
+        self._overdue = {}       # key -> info, in the order they became overdue
+        self._subscribers = {}   # queue -> outlet_id it listens to
+        self._thread = None
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        self.rebuild()
+        self._thread = threading.Thread(target=self._run, name='overdue-bills', daemon=True)
+        self._thread.start()
+
+    def rebuild(self):
+        """Reload pending bills of every outlet from the database, publishing any difference"""
+        bills = []
+        for outlet in Outlet.objects.all():
+            with outlet_context(outlet):
+                rows = Bill.objects.filter(status='Pending Payment').values_list(
+                    'id', 'outlet_id', 'table__table_number', 'total_amount', 'generated_at'
+                )
+                bills.extend(_bill_info(*row) for row in rows)
+        now = timezone.now()
+
+        with self._cond:
+            previous_overdue = self._overdue
+            self._heap, self._pending, self._overdue = [], {}, {}
+
+            for info in sorted(bills, key=lambda info: info['generated_at']):
+                key = (info['outlet_id'], info['id'])
+                info['deadline'] = info['generated_at'] + self.threshold
+                if info['deadline'] <= now:
+                    self._overdue[key] = info
+                else:
+                    self._pending[key] = info
+                    self._heap.append((info['deadline'], key))
+            heapq.heapify(self._heap)
+
+            for key, info in self._overdue.items():
+                if key not in previous_overdue:
+                    self._publish('overdue', info)
+            for key, info in previous_overdue.items():
+                if key not in self._overdue:
+                    self._publish('cleared', info)
+
+            self._cond.notify()
+
+    # ---------- feed ----------
+
+    def track(self, bill_id, outlet_id, table_number, total_amount, generated_at):
+        """Start the clock for a pending bill (repeat calls just refresh its details)"""
+        key = (outlet_id, bill_id)
+        with self._cond:
+            known = self._pending.get(key) or self._overdue.get(key)
+            if known is not None:
+                known['table'] = table_number
+                known['total_amount'] = str(total_amount)
+                return
+
+            info = _bill_info(bill_id, outlet_id, table_number, total_amount, generated_at)
+            info['deadline'] = generated_at + self.threshold
+            if info['deadline'] <= timezone.now():
+                self._overdue[key] = info
+                self._publish('overdue', info)
+            else:
+                self._pending[key] = info
+                heapq.heappush(self._heap, (info['deadline'], key))
+                self._cond.notify()
+
+    def untrack(self, bill_id, outlet_id):
+        """Bill paid or deleted: forget it (its heap entry is dropped when it surfaces)"""
+        key = (outlet_id, bill_id)
+        with self._cond:
+            self._pending.pop(key, None)
+            info = self._overdue.pop(key, None)
+            if info is not None:
+                self._publish('cleared', info)
+
+    # ---------- read ----------
+
+    def overdue_bills(self, outlet_id=None):
+        """Current overdue bills, optionally for one outlet"""
+        with self._cond:
+            bills = [
+                info for info in self._overdue.values()
+                if outlet_id is None or info['outlet_id'] == outlet_id
+            ]
+        now = timezone.now()
+        return [serialize_overdue(info, now) for info in bills]
+
+    def subscribe(self, outlet_id=None):
+        subscriber = queue.Queue(maxsize=100)
+        with self._cond:
+            self._subscribers[subscriber] = outlet_id
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._cond:
+            self._subscribers.pop(subscriber, None)
+
+    # ---------- internals (call with the lock held) ----------
+
+    def _publish(self, event, info):
+        message = {'event': event, 'bill': serialize_overdue(info)}
+        for subscriber, outlet_id in self._subscribers.items():
+            if outlet_id is not None and outlet_id != info['outlet_id']:
+                continue
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                # Slow consumer: drop rather than block the scheduler
+                pass
+
+    def _expire_due(self, now):
+        while self._heap and self._heap[0][0] <= now:
+            deadline, key = heapq.heappop(self._heap)
+            info = self._pending.get(key)
+            if info is None or info['deadline'] != deadline:
+                continue
+            del self._pending[key]
+            self._overdue[key] = info
+            self._publish('overdue', info)
+
+    def _run(self):
+        next_resync = time.monotonic() + self.resync_seconds
+
+        while True:
+            with self._cond:
+                self._expire_due(timezone.now())
+
+                timeout = max(next_resync - time.monotonic(), 0)
+                if self._heap:
+                    until_deadline = (self._heap[0][0] - timezone.now()).total_seconds()
+                    timeout = min(timeout, max(until_deadline, 0))
+                self._cond.wait(timeout=timeout)
+
+            if time.monotonic() >= next_resync:
+                next_resync = time.monotonic() + self.resync_seconds
+                try:
+                    self.rebuild()
+                except Exception:
+                    logger.exception('Overdue bill resync failed')
+                finally:
+                    close_old_connections()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """The process-wide scheduler, started (and rebuilt from the DB) on first use"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                scheduler = OverdueBillScheduler(
+                    threshold_minutes=_setting('OVERDUE_BILL_MINUTES', 30),
+                    resync_seconds=_setting('OVERDUE_RESYNC_SECONDS', 60),
+                )
+                scheduler.start()
+                _scheduler = scheduler
+    return _scheduler
+
+
+def notify_bill_saved(bill):
+    """Signal hook: keep a running scheduler in step with a saved bill"""
+    if _scheduler is None:
+        # Not started in this process yet; it will load the bill when it starts
+        return
+    if bill.status == 'Pending Payment':
+        _scheduler.track(
+            bill.id, bill.outlet_id, bill.table.table_number, bill.total_amount, bill.generated_at
+        )
+    else:
+        _scheduler.untrack(bill.id, bill.outlet_id)
+
+
+def notify_bill_deleted(bill_id, outlet_id):
+    if _scheduler is not None:
+        _scheduler.untrack(bill_id, outlet_id)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets DRF content negotiation accept `Accept: text/event-stream`"""
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Error responses (403 etc.) still carry a normal JSON body
+        if isinstance(data, (str, bytes)):
+            return data
+        return JSONRenderer().render(data)
+
+
+def event_stream(scheduler, encoder, outlet_id=None):
+    """
+    Server-sent events: the current overdue set first, then one event per
+    change, with a keep-alive comment whenever nothing happens for a while.
+    """
+    heartbeat = _setting('OVERDUE_SSE_HEARTBEAT_SECONDS', 15)
+    subscriber = scheduler.subscribe(outlet_id)
+    try:
+        yield f"event: snapshot\ndata: {encoder.encode(scheduler.overdue_bills(outlet_id))}\n\n"
+        while True:
+            try:
+                message = subscriber.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {message['event']}\ndata: {encoder.encode(message['bill'])}\n\n"
+    finally:
+        scheduler.unsubscribe(subscriber)
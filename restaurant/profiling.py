@@ -0,0 +1,364 @@
+# restaurant/profiling.py
+"""
+On-demand profiling of single production requests.
+
+A request asks to be profiled with ``?profile=<mode>`` or an
+``X-Profile: <mode>`` header, where mode is ``sampling`` (a thread samples
+the request's stack every PROFILE_SAMPLE_INTERVAL_MS; low overhead) or
+``deterministic`` (every call and return is timed; exact but slower). It is
+only honoured for Admin / Manager users, or with an ``X-Profile-Token``
+header signed by this server (``python manage.py profile_token``) so a
+cashier tablet can be profiled too.
+
+The view runs under the profiler with every SQL statement timed. The result
+(URL name, stacks, queries, timings) is written to PROFILE_DIR, which keeps
+the newest PROFILE_RING_SIZE profiles. Download them from
+/api/restaurant/profiles/ as collapsed stacks (flamegraph.pl, speedscope)
+or speedscope JSON.
+
+Requests that do not ask for a profile only pay for one dict lookup.
+"""
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.utils import timezone
+
+
+PROFILE_MODES = ('sampling', 'deterministic')
+PROFILE_FORMATS = ('json', 'collapsed', 'speedscope')
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+TOKEN_HEADER = 'HTTP_X_PROFILE_TOKEN'
+TOKEN_SALT = 'restaurant.profiling'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def profile_dir():
+    return str(_setting('PROFILE_DIR', settings.BASE_DIR / 'profiles'))
+
+
+# ---------- profilers ----------
+# Both produce {stack: seconds}, a stack being a tuple of (file, line, function)
+# from the outermost frame in. Frames above the view (Django, middleware) are cut.
+
+def _frame_key(frame):
+    code = frame.f_code
+    return (code.co_filename, code.co_firstlineno, code.co_name)
+
+
+def _stack(frame, stop):
+    stack = []
+    while frame is not None and frame is not stop:
+        stack.append(_frame_key(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+class SamplingProfiler:
+    """Samples the calling thread's stack from a background thread"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = {}
+        self._stopped = threading.Event()
+
+    def _run(self, thread_id, stop):
+        last = time.perf_counter()
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            now = time.perf_counter()
+            if frame is not None:
+                stack = _stack(frame, stop)
+                if stack:
+                    self.stacks[stack] = self.stacks.get(stack, 0.0) + (now - last)
+            last = now
+
+    def __enter__(self):
+        caller = sys._getframe(1)
+        self._thread = threading.Thread(
+            target=self._run, args=(threading.get_ident(), caller), daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+
+class TracingProfiler:
+    """Times every Python call and return in the calling thread (sys.setprofile)"""
+
+    def __init__(self):
+        self.stacks = {}
+
+    def _trace(self, frame, event, arg):
+        now = time.perf_counter()
+        if self._current is not None:
+            self.stacks[self._current] = self.stacks.get(self._current, 0.0) + (now - self._last)
+        if event in ('call', 'return'):
+            current = _stack(frame, self._stop)
+            # On return, time from here on belongs to the caller
+            self._current = current[:-1] if event == 'return' else current
+            self._current = self._current or None
+        self._last = time.perf_counter()
+
+    def __enter__(self):
+        self._stop = sys._getframe(1)
+        self._current = None
+        self._last = time.perf_counter()
+        sys.setprofile(self._trace)
+        return self
+
+    def __exit__(self, *exc_info):
+        sys.setprofile(None)
+
+
+def make_profiler(mode):
+    if mode == 'deterministic':
+        return TracingProfiler()
+    return SamplingProfiler(_setting('PROFILE_SAMPLE_INTERVAL_MS', 1) / 1000)
+
+
+class QueryRecorder:
+    """Times every SQL statement on every database alias"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'alias': context['connection'].alias,
+                'sql': sql,
+                'ms': round((time.perf_counter() - started) * 1000, 3),
+            })
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(connections[alias].execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+
+# ---------- ring of stored profiles ----------
+
+def _profile_path(profile_id):
+    # Ids are generated here; anything else (a path) is rejected
+    if not profile_id or not all(ch.isalnum() or ch == '-' for ch in profile_id):
+        raise FileNotFoundError(profile_id)
+    return os.path.join(profile_dir(), f'{profile_id}.json')
+
+
+def _stored_ids():
+    """Profile ids, oldest first (ids start with a nanosecond timestamp)"""
+    try:
+        names = os.listdir(profile_dir())
+    except FileNotFoundError:
+        return []
+    return sorted(name[:-5] for name in names if name.endswith('.json'))
+
+
+def store_profile(profile):
+    """Write a profile and drop the oldest ones past PROFILE_RING_SIZE; returns its id"""
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    profile_id = f'{time.time_ns():020d}-{uuid.uuid4().hex[:8]}'
+    profile = {'id': profile_id, **profile}
+
+    path = _profile_path(profile_id)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w') as profile_file:
+        json.dump(profile, profile_file, separators=(',', ':'), default=str)
+    os.replace(temporary, path)
+
+    stored = _stored_ids()
+    for old_id in stored[:max(len(stored) - _setting('PROFILE_RING_SIZE', 50), 0)]:
+        try:
+            os.remove(_profile_path(old_id))
+        except FileNotFoundError:
+            pass  # removed by another worker
+    return profile_id
+
+
+def load_profile(profile_id):
+    """Raises FileNotFoundError for an unknown (or already rotated out) id"""
+    with open(_profile_path(profile_id)) as profile_file:
+        return json.load(profile_file)
+
+
+def list_profiles():
+    """Summaries, newest first"""
+    summaries = []
+    for profile_id in reversed(_stored_ids()):
+        try:
+            profile = load_profile(profile_id)
+        except (FileNotFoundError, ValueError):
+            continue
+        summaries.append({key: value for key, value in profile.items() if key not in ('stacks', 'queries')})
+    return summaries
+
+
+# ---------- export formats ----------
+
+def _frame_name(frame):
+    filename, line, function = frame
+    base = str(settings.BASE_DIR) + os.sep
+    if filename.startswith(base):
+        filename = filename[len(base):]
+    else:
+        # Libraries: path inside site-packages (django/db/models/query.py)
+        filename = filename.split(f'site-packages{os.sep}')[-1]
+    return f'{function} ({filename}:{line})'
+
+
+def to_collapsed(profile):
+    """Brendan Gregg's collapsed stacks, one 'a;b;c weight' line per stack, weights in microseconds"""
+    lines = []
+    for entry in profile['stacks']:
+        names = ';'.join(_frame_name(frame).replace(';', ':') for frame in entry['stack'])
+        lines.append(f"{names} {max(round(entry['seconds'] * 1e6), 1)}")
+    return '\n'.join(lines) + '\n'
+
+
+def to_speedscope(profile):
+    """speedscope.app file (a 'sampled' profile weighted in microseconds)"""
+    frames, index = [], {}
+    samples, weights = [], []
+    for entry in profile['stacks']:
+        sample = []
+        for frame in entry['stack']:
+            key = tuple(frame)
+            if key not in index:
+                index[key] = len(frames)
+                frames.append({'name': frame[2], 'file': frame[0], 'line': frame[1]})
+            sample.append(index[key])
+        samples.append(sample)
+        weights.append(round(entry['seconds'] * 1e6))
+
+    name = f"{profile['method']} {profile['path']} ({profile['mode']})"
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': name,
+        'exporter': 'restaurant-pos',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'microseconds',
+            'startValue': 0,
+            'endValue': sum(weights),
+            'samples': samples,
+            'weights': weights,
+        }],
+    }
+
+
+# ---------- who may profile ----------
+
+def profile_token():
+    """Signed value for the X-Profile-Token header (valid PROFILE_TOKEN_MAX_AGE_SECONDS)"""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign('profile')
+
+
+def _has_valid_token(request):
+    token = request.META.get(TOKEN_HEADER)
+    if not token:
+        return False
+    try:
+        signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            token, max_age=_setting('PROFILE_TOKEN_MAX_AGE_SECONDS', 3600)
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def _profiling_user(request):
+    """The Admin / Manager making the request, or None"""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        # API clients authenticate with a JWT inside the view (DRF), so check it here
+        from rest_framework.exceptions import AuthenticationFailed
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+        try:
+            authenticated = JWTAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return None
+        user = authenticated[0] if authenticated else None
+    if user is None:
+        return None
+    profile = getattr(user, 'profile', None)
+    return user if profile is not None and profile.role_id in [1, 2] else None
+
+
+class ProfilingMiddleware:
+    """
+    Runs the view under a profiler when the request asks for it and is
+    allowed to. Keep it last in MIDDLEWARE: it calls the view itself.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        mode = request.META.get(PROFILE_HEADER) or request.GET.get('profile')
+        if not mode:
+            return None
+        if mode not in PROFILE_MODES:
+            mode = _setting('PROFILE_DEFAULT_MODE', 'sampling')
+
+        signed = _has_valid_token(request)
+        user = None if signed else _profiling_user(request)
+        if not signed and user is None:
+            return None  # not allowed: served as a normal request
+
+        started_at = timezone.now()
+        started = time.perf_counter()
+        with QueryRecorder() as recorder, make_profiler(mode) as profiler:
+            response = view_func(request, *view_args, **view_kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                # DRF / template responses render lazily; include rendering
+                response = response.render()
+        duration = time.perf_counter() - started
+
+        match = request.resolver_match
+        profile_id = store_profile({
+            'url_name': match.view_name if match else None,
+            'method': request.method,
+            'path': request.path,
+            'mode': mode,
+            'status': response.status_code,
+            'user': user.username if user else None,
+            'started_at': started_at.isoformat(),
+            'duration_ms': round(duration * 1000, 3),
+            'query_count': len(recorder.queries),
+            'query_ms': round(sum(query['ms'] for query in recorder.queries), 3),
+            'stacks': [
+                {'stack': stack, 'seconds': seconds}
+                for stack, seconds in sorted(profiler.stacks.items(), key=lambda item: -item[1])
+            ],
+            'queries': recorder.queries,
+        })
+        response['X-Profile-Id'] = profile_id
+        return response
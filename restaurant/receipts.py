@@ -0,0 +1,272 @@
+# restaurant/receipts.py
+"""
+Receipt rendering: plain text, ESC/POS (thermal printers) and PDF.
+
+A bill is first turned into plain receipt data (strings and numbers only),
+then rendered by pure functions in a process pool, so the CPU work never
+runs on a request worker. Layouts are compiled once per paper width into
+format strings. Rendered receipts of paid bills - which never change - are
+cached.
+
+The renderers only use the standard library, so pool processes do not need
+Django set up.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+RECEIPT_OUTPUTS = ['text', 'escpos', 'pdf']
+RECEIPT_WIDTHS = [32, 42, 48]      # characters per line: 58mm and 80mm paper
+DEFAULT_RECEIPT_WIDTH = 42
+
+CONTENT_TYPES = {
+    'text': 'text/plain; charset=utf-8',
+    'escpos': 'application/octet-stream',
+    'pdf': 'application/pdf',
+}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# ---------- data ----------
+
+def receipt_data(bill):
+    """Everything a receipt shows, as plain picklable values (live or archived bill)"""
+    from django.utils import timezone
+    from .archive import menu_item_label, table_label
+    from .models import Outlet
+
+    outlet = Outlet.objects.filter(id=bill.outlet_id).first()
+    items = []
+    for order in bill.orders.prefetch_related('order_items__menu_item').order_by('id'):
+        for item in order.order_items.all():
+            items.append({
+                'name': menu_item_label(item),
+                'quantity': item.quantity,
+                'price': str(item.price_at_order),
+                'subtotal': str(item.subtotal),
+            })
+
+    return {
+        'outlet': outlet.name if outlet else '',
+        'address': outlet.address if outlet else '',
+        'bill_id': bill.id,
+        'table': table_label(bill),
+        'items': items,
+        'subtotal': str(bill.subtotal),
+        'tax_percentage': str(bill.tax_percentage),
+        'tax_amount': str(bill.tax_amount),
+        'total_amount': str(bill.total_amount),
+        'status': bill.status,
+        'generated_at': timezone.localtime(bill.generated_at).strftime('%d-%m-%Y %H:%M'),
+        'paid_at': timezone.localtime(bill.paid_at).strftime('%d-%m-%Y %H:%M') if bill.paid_at else None,
+    }
+
+
+# ---------- layout ----------
+
+class ReceiptLayout:
+    """Format strings for one paper width, compiled once (see layout())"""
+
+    def __init__(self, width):
+        self.width = width
+        name_width = width - 15
+        self.rule = '-' * width
+        self.header = f'{{:<{name_width}}}{{:>4}}{{:>11}}'.format('Item', 'Qty', 'Amount')
+        self.item_line = f'{{name:<{name_width}.{name_width}}}{{quantity:>4}}{{amount:>11}}'
+        self.unit_line = '  @ {price}'
+        self.pair_line = f'{{left:<{width - 14}.{width - 14}}}{{right:>14}}'
+        # Double-width text on thermal printers fits half as many characters
+        self.large_pair_line = f'{{left:<{width // 2 - 10}}}{{right:>10}}'
+
+    def lines(self, data):
+        """[(style, text)] with style one of normal / center / bold / large"""
+        lines = [('large', data['outlet'].upper()[:self.width // 2])]
+        if data['address']:
+            lines.append(('center', data['address'][:self.width]))
+        lines += [
+            ('normal', self.pair_line.format(left=f"Bill #{data['bill_id']}", right=f"Table {data['table']}")),
+            ('normal', data['generated_at']),
+            ('normal', self.rule),
+            ('bold', self.header),
+        ]
+        for item in data['items']:
+            lines.append(('normal', self.item_line.format(
+                name=item['name'], quantity=item['quantity'], amount=item['subtotal']
+            )))
+            if item['quantity'] > 1:
+                lines.append(('normal', self.unit_line.format(price=item['price'])))
+        lines += [
+            ('normal', self.rule),
+            ('normal', self.pair_line.format(left='Subtotal', right=data['subtotal'])),
+            ('normal', self.pair_line.format(left=f"Tax ({data['tax_percentage']}%)", right=data['tax_amount'])),
+            ('large', self.large_pair_line.format(left='TOTAL', right=data['total_amount'])),
+            ('normal', self.rule),
+        ]
+        if data['paid_at']:
+            lines.append(('center', f"PAID {data['paid_at']}"))
+        else:
+            lines.append(('center', data['status'].upper()))
+        lines.append(('center', 'Thank you!'))
+        return lines
+
+
+@lru_cache(maxsize=None)
+def layout(width):
+    return ReceiptLayout(width)
+
+
+# ---------- renderers (pure, run in the pool) ----------
+
+def render_text(data, width=DEFAULT_RECEIPT_WIDTH):
+    out = []
+    for style, text in layout(width).lines(data):
+        out.append(text.center(width).rstrip() if style in ('center', 'large') else text)
+    return ('\n'.join(out) + '\n').encode('utf-8')
+
+
+ESC_INIT = b'\x1b@'
+ESC_ALIGN_LEFT = b'\x1ba\x00'
+ESC_ALIGN_CENTER = b'\x1ba\x01'
+ESC_BOLD_ON = b'\x1bE\x01'
+ESC_BOLD_OFF = b'\x1bE\x00'
+ESC_DOUBLE_SIZE = b'\x1d!\x11'
+ESC_NORMAL_SIZE = b'\x1d!\x00'
+ESC_FEED_AND_CUT = b'\x1bd\x04\x1dVB\x00'
+
+_ESCPOS_STYLES = {
+    'normal': (ESC_ALIGN_LEFT, b''),
+    'center': (ESC_ALIGN_CENTER, ESC_ALIGN_LEFT),
+    'bold': (ESC_BOLD_ON, ESC_BOLD_OFF),
+    'large': (ESC_ALIGN_CENTER + ESC_DOUBLE_SIZE, ESC_NORMAL_SIZE + ESC_ALIGN_LEFT),
+}
+
+
+def _cp437(text):
+    # The cp437 codec is slow; almost every line is plain ASCII
+    if text.isascii():
+        return text.encode('ascii')
+    return text.encode('cp437', errors='replace')
+
+
+def render_escpos(data, width=DEFAULT_RECEIPT_WIDTH):
+    """ESC/POS byte stream (code page 437) ending with a feed and partial cut"""
+    out = [ESC_INIT]
+    for style, text in layout(width).lines(data):
+        before, after = _ESCPOS_STYLES[style]
+        out.append(before + _cp437(text) + b'\n' + after)
+    out.append(ESC_FEED_AND_CUT)
+    return b''.join(out)
+
+
+_PDF_FONT_SIZE = 9
+_PDF_LEADING = 11
+_PDF_MARGIN = 14
+
+
+def _pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def render_pdf(data, width=DEFAULT_RECEIPT_WIDTH):
+    """Single-page PDF sized to the receipt, in Courier (no external dependencies)"""
+    lines = layout(width).lines(data)
+    page_width = int(width * _PDF_FONT_SIZE * 0.6) + 2 * _PDF_MARGIN
+    page_height = len(lines) * _PDF_LEADING + 2 * _PDF_MARGIN
+
+    content = [f'BT {_PDF_LEADING} TL {_PDF_MARGIN} {page_height - _PDF_MARGIN - _PDF_FONT_SIZE} Td']
+    for style, text in lines:
+        if style in ('center', 'large'):
+            text = text.center(width).rstrip()
+        font = '/F2' if style in ('bold', 'large') else '/F1'
+        content.append(f'{font} {_PDF_FONT_SIZE} Tf ({_pdf_escape(text)}) Tj T*')
+    content.append('ET')
+    stream = '\n'.join(content).encode('cp1252', errors='replace')
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        (f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_width} {page_height}] '
+         f'/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>').encode(),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier-Bold /Encoding /WinAnsiEncoding >>',
+        b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream',
+    ]
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+RENDERERS = {
+    'text': render_text,
+    'escpos': render_escpos,
+    'pdf': render_pdf,
+}
+
+
+def render_receipt(data, output='text', width=DEFAULT_RECEIPT_WIDTH):
+    return RENDERERS[output](data, width)
+
+
+# ---------- pool & cache ----------
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool():
+    """Process pool for rendering, created on first use (spawned: no forked DB connections)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=_setting('RECEIPT_RENDER_WORKERS', None),
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+    return _pool
+
+
+def render_bill_receipt(bill, output='text', width=DEFAULT_RECEIPT_WIDTH):
+    """
+    Rendered receipt bytes for a bill, from the cache for paid bills,
+    otherwise rendered in the pool. Raises TimeoutError if rendering takes
+    longer than RECEIPT_RENDER_TIMEOUT_SECONDS.
+    """
+    global _pool
+    paid = bill.status == 'Paid'
+    key = f'receipt:{bill.outlet_id}:{bill.id}:{output}:{width}'
+    if paid:
+        rendered = cache.get(key)
+        if rendered is not None:
+            return rendered
+
+    data = receipt_data(bill)
+    try:
+        rendered = get_render_pool().submit(render_receipt, data, output, width).result(
+            timeout=_setting('RECEIPT_RENDER_TIMEOUT_SECONDS', 10)
+        )
+    except BrokenProcessPool:
+        # A worker died: start a fresh pool next time
+        _pool = None
+        raise
+
+    if paid:
+        cache.set(key, rendered, timeout=_setting('RECEIPT_CACHE_SECONDS', 7 * 24 * 3600))
+    return rendered
@@ -0,0 +1,151 @@
+# restaurant/replicas.py
+"""
+Read replicas with read-your-writes stickiness.
+
+settings.REPLICA_DATABASES maps a primary alias to its replica aliases, e.g.
+``{'default': ['replica']}``. Only safe requests (GET / HEAD / OPTIONS) read
+from a replica; writes, transactions, commands and background jobs always
+use the primary.
+
+A client that just wrote is pinned to the primary for REPLICA_PIN_SECONDS so
+it sees its own changes (a waiter's new order) despite replication lag. The
+pin is kept two ways: a cookie (any client that keeps cookies) and a cache
+entry per user (token clients). Use a shared cache (Redis / Memcached) in
+CACHES when running several workers, otherwise the per-user pin only holds
+within one process.
+"""
+import contextvars
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .outlets import OutletRouter
+
+
+PIN_COOKIE = 'pin_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_replica_request = contextvars.ContextVar('replica_request', default=None)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def replicas_for(alias):
+    return _setting('REPLICA_DATABASES', {}).get(alias, [])
+
+
+def primary_for(alias):
+    """Primary alias behind ``alias`` (``alias`` itself if it is not a replica)"""
+    for primary, replicas in _setting('REPLICA_DATABASES', {}).items():
+        if alias in replicas:
+            return primary
+    return alias
+
+
+def is_replica(alias):
+    return primary_for(alias) != alias
+
+
+def _pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def _is_pinned(request):
+    if request.COOKIES.get(PIN_COOKIE):
+        try:
+            if float(request.COOKIES[PIN_COOKIE]) > time.time():
+                return True
+        except ValueError:
+            pass
+
+    # DRF authenticates inside the view, so the user may only be known by now
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return bool(cache.get(_pin_key(user.id)))
+    return False
+
+
+def reads_from_replica():
+    """True while serving a safe, unpinned request"""
+    request = _replica_request.get()
+    if request is None:
+        return False
+    if not hasattr(request, '_replica_ok'):
+        pinned = _is_pinned(request)
+        user = getattr(request, 'user', None)
+        if not pinned and (user is None or not user.is_authenticated):
+            # Not authenticated yet: decide again once DRF has set the user
+            return True
+        request._replica_ok = not pinned
+    return request._replica_ok
+
+
+class ReplicaMiddleware:
+    """
+    Marks safe requests as replica-eligible and pins clients to the
+    primary after a successful write.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _replica_request.set(request if request.method in SAFE_METHODS else None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica_request.reset(token)
+
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_seconds = _setting('REPLICA_PIN_SECONDS', 5)
+            response.set_cookie(
+                PIN_COOKIE, str(time.time() + pin_seconds),
+                max_age=pin_seconds, httponly=True, samesite='Lax'
+            )
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                cache.set(_pin_key(user.id), True, timeout=pin_seconds)
+
+        return response
+
+
+class ReplicaRouter(OutletRouter):
+    """
+    OutletRouter (which picks the outlet's primary database) plus replica
+    selection for reads during safe requests.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = super().db_for_read(model, **hints)
+        if alias is None:
+            instance = hints.get('instance')
+            alias = instance._state.db if instance is not None and instance._state.db else 'default'
+
+        if is_replica(alias):
+            # Follow-up lookups stay on the replica the object was loaded from
+            return alias
+        replicas = replicas_for(alias)
+        if not replicas or not reads_from_replica():
+            return alias
+        if connections[alias].in_atomic_block:
+            return alias
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        alias = super().db_for_write(model, **hints)
+        if alias is None:
+            instance = hints.get('instance')
+            alias = instance._state.db if instance is not None and instance._state.db else 'default'
+        # Objects read from a replica are saved to its primary
+        return primary_for(alias)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes through replication
+        if is_replica(db):
+            return False
+        return None
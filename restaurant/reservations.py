@@ -0,0 +1,367 @@
+# restaurant/reservations.py
+"""
+Reservations and best-fit table assignment.
+
+Each worker keeps one index per (outlet, local day), built in two queries:
+every table (capacity, live status) and the active reservations that touch
+any window starting that day, i.e. up to RESERVATION_MAX_MINUTES past
+midnight, so a late booking sees the next morning's reservations.
+For each table it holds the booked windows as sorted parallel lists of
+start and end times; windows on one table never overlap, so both lists are
+sorted and "is this table free from A to B" is one bisect. Tables are
+ordered by (seating capacity, table number), so the first free table at or
+above the party size is the best fit: the smallest table that seats them.
+
+A slot starting within RESERVATION_LIVE_MINUTES also needs the table to be
+free right now (status Available); a Closed table is never offered.
+
+Reservation and Table signals keep cached indexes in step after commit (so
+do sync.py and transfers.py, whose bulk status updates send no signals), and
+every index is rebuilt after RESERVATION_INDEX_MAX_AGE_SECONDS so bookings
+made by other worker processes show up. The index only proposes a table:
+book() confirms it under the table's row lock with one indexed overlap
+query, so a stale index can cost a retry but never a double booking.
+"""
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, time as day_time
+from itertools import islice
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Table, Reservation
+from .outlets import get_current_outlet, outlet_atomic
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def parse_day(value):
+    """?date=YYYY-MM-DD (default: today, local time), or ValueError"""
+    if not value:
+        return timezone.localdate()
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(f'Invalid date: {value}')
+    return day
+
+
+def parse_window(starts_at, duration_minutes=None):
+    """(start, end) aware datetimes from an ISO start time and a duration in minutes, or ValueError"""
+    start = parse_datetime(str(starts_at or ''))
+    if start is None:
+        raise ValueError('starts_at must be an ISO date-time')
+    if timezone.is_naive(start):
+        start = timezone.make_aware(start)
+    try:
+        minutes = int(duration_minutes or _setting('RESERVATION_DEFAULT_MINUTES', 90))
+    except (TypeError, ValueError):
+        minutes = 0
+    if minutes < 1:
+        raise ValueError('Duration must be at least 1 minute')
+    if minutes > max_minutes():
+        raise ValueError(f'Duration must be at most {max_minutes()} minutes')
+    return start, start + timedelta(minutes=minutes)
+
+
+def parse_party_size(value):
+    try:
+        party_size = int(value)
+    except (TypeError, ValueError):
+        party_size = 0
+    if party_size < 1:
+        raise ValueError('Party size must be at least 1')
+    return party_size
+
+
+def max_minutes():
+    """Longest reservation window; it bounds how far past midnight a day's index reaches"""
+    return _setting('RESERVATION_MAX_MINUTES', 360)
+
+
+def day_bounds(day):
+    """Aware [start, end) of a local day"""
+    start = timezone.make_aware(datetime.combine(day, day_time.min))
+    return start, start + timedelta(days=1)
+
+
+def index_bounds(day):
+    """Aware [start, end) a day's index covers: every window starting that day"""
+    start, end = day_bounds(day)
+    return start, end + timedelta(minutes=max_minutes())
+
+
+def is_live(start, now=None):
+    """A slot this close to now needs a table that is free right now"""
+    now = now or timezone.now()
+    return start <= now + timedelta(minutes=_setting('RESERVATION_LIVE_MINUTES', 30))
+
+
+class ReservationIndex:
+    """Booked windows of every table of one outlet, for the windows starting on one local day"""
+
+    def __init__(self, day, tables, reservations):
+        self.day = day
+        self.start, self.end = (moment.timestamp() for moment in index_bounds(day))
+        self.tables = {}   # id -> {'table_number', 'capacity', 'status'}
+        self.starts = {}   # table id -> sorted window starts (epoch seconds)
+        self.ends = {}     # table id -> window ends, same order
+        self.windows = {}  # reservation id -> (table id, start, end)
+
+        for table in tables:
+            self.tables[table['id']] = {
+                'table_number': table['table_number'],
+                'capacity': table['seating_capacity'],
+                'status': table['status'],
+            }
+            self.starts[table['id']], self.ends[table['id']] = [], []
+        # Best fit first: smallest capacity, then table number
+        self.order = sorted(self.tables, key=lambda table_id: (
+            self.tables[table_id]['capacity'], self.tables[table_id]['table_number']
+        ))
+        self.capacities = [self.tables[table_id]['capacity'] for table_id in self.order]
+
+        for reservation in sorted(reservations, key=lambda row: row['starts_at']):
+            self.add(reservation['id'], reservation['table_id'], reservation['starts_at'], reservation['ends_at'])
+
+    def __len__(self):
+        return len(self.windows)
+
+    def covers(self, start, end):
+        """Does the window [start, end) touch the span this index covers?"""
+        return start.timestamp() < self.end and end.timestamp() > self.start
+
+    # ---------- windows ----------
+
+    def add(self, reservation_id, table_id, start, end):
+        if table_id not in self.starts:
+            return
+        self.remove(reservation_id)
+        start, end = start.timestamp(), end.timestamp()
+        position = bisect_left(self.starts[table_id], start)
+        self.starts[table_id].insert(position, start)
+        self.ends[table_id].insert(position, end)
+        self.windows[reservation_id] = (table_id, start, end)
+
+    def remove(self, reservation_id):
+        window = self.windows.pop(reservation_id, None)
+        if window is None:
+            return
+        table_id, start, end = window
+        starts, ends = self.starts[table_id], self.ends[table_id]
+        position = bisect_left(starts, start)
+        while starts[position] != start or ends[position] != end:
+            position += 1
+        del starts[position], ends[position]
+
+    def is_free(self, table_id, start, end):
+        """No booked window on the table overlaps [start, end) (epoch seconds)"""
+        # First window ending after the start; it clashes if it begins before the end
+        position = bisect_right(self.ends[table_id], start)
+        starts = self.starts[table_id]
+        return position == len(starts) or starts[position] >= end
+
+    # ---------- tables ----------
+
+    def set_status(self, table_id, status):
+        self.tables[table_id]['status'] = status
+
+    def candidates(self, party_size, start, end, live=False):
+        """Ids of tables that seat the party and are free over the window, best fit first"""
+        start, end = start.timestamp(), end.timestamp()
+        tables, starts, ends = self.tables, self.starts, self.ends
+        for table_id in islice(self.order, bisect_left(self.capacities, party_size), None):
+            status = tables[table_id]['status']
+            if status == 'Closed' or (live and status != 'Available'):
+                continue
+            # is_free(), inlined: this loop is the allocator's hot path
+            table_ends = ends[table_id]
+            position = bisect_right(table_ends, start)
+            if position == len(table_ends) or starts[table_id][position] >= end:
+                yield table_id
+
+    def best_fit(self, party_size, start, end, live=False):
+        """Smallest free table for the party over the window, or None"""
+        return next(self.candidates(party_size, start, end, live), None)
+
+    def table_info(self, table_id):
+        table = self.tables[table_id]
+        return {
+            'id': table_id,
+            'table_number': table['table_number'],
+            'seating_capacity': table['capacity'],
+            'status': table['status'],
+        }
+
+
+# ---------- per-outlet cache ----------
+
+_indexes = {}   # (outlet_id, day) -> (built_at, ReservationIndex)
+_indexes_lock = threading.Lock()
+
+
+def build_reservation_index(day):
+    """Index of the current outlet's tables and the active reservations it covers (two queries)"""
+    start, end = index_bounds(day)
+    return ReservationIndex(
+        day,
+        Table.objects.values('id', 'table_number', 'seating_capacity', 'status'),
+        Reservation.objects.filter(
+            status__in=Reservation.ACTIVE_STATUSES, starts_at__lt=end, ends_at__gt=start,
+        ).values('id', 'table_id', 'starts_at', 'ends_at').order_by(),
+    )
+
+
+def get_reservation_index(day=None, rebuild=False):
+    """The current outlet's index for ``day`` (default today), rebuilt if stale or asked to"""
+    outlet = get_current_outlet()
+    key = (outlet.id if outlet is not None else None, day or timezone.localdate())
+    max_age = _setting('RESERVATION_INDEX_MAX_AGE_SECONDS', 30)
+
+    entry = _indexes.get(key)
+    if not rebuild and entry is not None and time.monotonic() - entry[0] < max_age:
+        return entry[1]
+
+    with _indexes_lock:
+        entry = _indexes.get(key)
+        if rebuild or entry is None or time.monotonic() - entry[0] >= max_age:
+            entry = (time.monotonic(), build_reservation_index(key[1]))
+            today = timezone.localdate()
+            for old in [cached for cached in _indexes if cached[1] < today]:
+                del _indexes[old]
+            _indexes[key] = entry
+    return entry[1]
+
+
+def _cached(outlet_id):
+    """Cached indexes holding ``outlet_id`` (including outlet-less ones, which hold every outlet)"""
+    return [entry[1] for key, entry in list(_indexes.items()) if key[0] in (outlet_id, None)]
+
+
+def invalidate_reservation_index(outlet_id):
+    """Drop every cached index of an outlet; the next allocation rebuilds"""
+    for key in [key for key in list(_indexes) if key[0] in (outlet_id, None)]:
+        _indexes.pop(key, None)
+
+
+def notify_reservation_saved(reservation_id, outlet_id, table_id, starts_at, ends_at, status):
+    """Signal hook: add or drop the reservation's window in cached indexes"""
+    for index in _cached(outlet_id):
+        if status in Reservation.ACTIVE_STATUSES and index.covers(starts_at, ends_at):
+            index.add(reservation_id, table_id, starts_at, ends_at)
+        else:
+            index.remove(reservation_id)
+
+
+def notify_reservation_deleted(reservation_id, outlet_id):
+    for index in _cached(outlet_id):
+        index.remove(reservation_id)
+
+
+def notify_table_saved(table_id, outlet_id, seating_capacity, status):
+    """Signal hook: a status change is applied in place; a new or resized table needs a rebuild"""
+    for index in _cached(outlet_id):
+        table = index.tables.get(table_id)
+        if table is None or table['capacity'] != seating_capacity:
+            invalidate_reservation_index(outlet_id)
+            return
+        index.set_status(table_id, status)
+
+
+# ---------- booking ----------
+
+def _confirm(table_id, party_size, start, end, live, fields):
+    """
+    Book the table if it is still free: row lock on the table, then one
+    overlap query on its reservations. Returns the Reservation or None.
+    """
+    with outlet_atomic():
+        table = Table.objects.select_for_update().filter(id=table_id).first()
+        if table is None or table.seating_capacity < party_size:
+            return None
+        if table.status == 'Closed' or (live and table.status != 'Available'):
+            return None
+        clash = Reservation.objects.filter(
+            table_id=table_id, status__in=Reservation.ACTIVE_STATUSES, starts_at__lt=end, ends_at__gt=start,
+        ).exists()
+        if clash:
+            return None
+        return Reservation.objects.create(
+            table=table, party_size=party_size, starts_at=start, ends_at=end, **fields
+        )
+
+
+def book(party_size, start, end, guest_name, phone='', table_id=None, user=None):
+    """
+    Reserve the best-fit table (or ``table_id``) for the party over [start, end).
+    Raises ValueError when the window is invalid or no table is free,
+    Table.DoesNotExist for an unknown ``table_id``.
+    """
+    party_size = parse_party_size(party_size)
+    if not guest_name:
+        raise ValueError('Guest name required')
+    if end <= start:
+        raise ValueError('Reservation must end after it starts')
+    if end - start > timedelta(minutes=max_minutes()):
+        raise ValueError(f'Reservation can last at most {max_minutes()} minutes')
+    if end <= timezone.now():
+        raise ValueError('Reservation window is in the past')
+    live = is_live(start)
+    day = timezone.localdate(start)
+    fields = {'guest_name': guest_name, 'phone': phone or '', 'created_by': user}
+    if table_id is not None:
+        try:
+            table_id = int(table_id)
+        except (TypeError, ValueError):
+            raise Table.DoesNotExist('Table not found')
+
+    # A rejected proposal means the cached index missed a booking made by
+    # another worker: try the remaining candidates, then once more on a
+    # fresh index (skipping tables already rejected)
+    rejected = set()
+    for rebuild in (False, True):
+        index = get_reservation_index(day, rebuild=rebuild)
+        if table_id is not None:
+            if table_id not in index.tables:
+                raise Table.DoesNotExist('Table not found')
+            proposals = [table_id]
+        else:
+            proposals = index.candidates(party_size, start, end, live)
+        stale = False
+        for proposed in proposals:
+            if proposed in rejected:
+                continue
+            reservation = _confirm(proposed, party_size, start, end, live, fields)
+            if reservation is not None:
+                return reservation
+            rejected.add(proposed)
+            stale = True
+        if not stale:
+            break
+
+    if table_id is not None:
+        raise ValueError('Table is not free for that time')
+    raise ValueError(f'No table available for {party_size} guests at {timezone.localtime(start):%H:%M}')
+
+
+def set_status(reservation_id, status):
+    """
+    Move a reservation to Seated / Cancelled / No Show. Seating a party
+    occupies its table. Raises Reservation.DoesNotExist / ValueError.
+    """
+    if status not in dict(Reservation.STATUS_CHOICES) or status == 'Booked':
+        raise ValueError('Status must be Seated, Cancelled or No Show')
+    with outlet_atomic():
+        reservation = Reservation.objects.select_for_update().select_related('table').get(id=reservation_id)
+        if reservation.status != 'Booked':
+            raise ValueError(f'Reservation is already {reservation.status}')
+        reservation.status = status
+        reservation.save()
+        if status == 'Seated' and reservation.table.status == 'Available':
+            reservation.table.status = 'Occupied'
+            reservation.table.save()
+    return reservation
@@ -1,8 +1,13 @@
 # restaurant/signals.py
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
-from .models import Order, Bill
+from .models import Order, Bill, MenuItem, Table, Reservation
+from .menu_search import invalidate_menu_index
+from .reservations import (
+    invalidate_reservation_index, notify_reservation_saved, notify_reservation_deleted, notify_table_saved,
+)
 
 
 @receiver(post_save, sender=Order)
@@ -34,3 +39,55 @@ def update_table_status_on_payment(sender, instance, **kwargs):
             table.save()
             print(f"✅ Table {table.table_number} auto-changed to Available after payment")
 
+
+@receiver(post_save, sender=Bill)
+def update_overdue_scheduler_on_bill_save(sender, instance, using, **kwargs):
+    """
+    generate_bill starts the overdue clock, mark_bill_paid stops it.
+    Applied after commit so a rolled-back bill never raises an alert.
+    """
+    # Imported here: the scheduler pulls in DRF's renderers, not needed to boot a worker
+    from .overdue import notify_bill_saved
+    transaction.on_commit(lambda: notify_bill_saved(instance), using=using)
+
+
+@receiver(post_delete, sender=Bill)
+def update_overdue_scheduler_on_bill_delete(sender, instance, using, **kwargs):
+    """Bill removed (e.g. nothing to bill, or archived): stop tracking it"""
+    from .overdue import notify_bill_deleted
+    bill_id, outlet_id = instance.id, instance.outlet_id
+    transaction.on_commit(lambda: notify_bill_deleted(bill_id, outlet_id), using=using)
+
+
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+def invalidate_menu_search_on_change(sender, instance, using, **kwargs):
+    """Menu changed: the outlet's search index is rebuilt on the next search"""
+    outlet_id = instance.outlet_id
+    transaction.on_commit(lambda: invalidate_menu_index(outlet_id), using=using)
+
+
+@receiver(post_save, sender=Reservation)
+def update_reservation_index_on_save(sender, instance, using, **kwargs):
+    """Booked window added to (or, once cancelled / no-show, dropped from) cached allocator indexes"""
+    args = (instance.id, instance.outlet_id, instance.table_id, instance.starts_at, instance.ends_at, instance.status)
+    transaction.on_commit(lambda: notify_reservation_saved(*args), using=using)
+
+
+@receiver(post_delete, sender=Reservation)
+def update_reservation_index_on_delete(sender, instance, using, **kwargs):
+    reservation_id, outlet_id = instance.id, instance.outlet_id
+    transaction.on_commit(lambda: notify_reservation_deleted(reservation_id, outlet_id), using=using)
+
+
+@receiver(post_save, sender=Table)
+def update_reservation_index_on_table_save(sender, instance, using, **kwargs):
+    """Live table status feeds the allocator; new or resized tables rebuild its index"""
+    args = (instance.id, instance.outlet_id, instance.seating_capacity, instance.status)
+    transaction.on_commit(lambda: notify_table_saved(*args), using=using)
+
+
+@receiver(post_delete, sender=Table)
+def invalidate_reservation_index_on_table_delete(sender, instance, using, **kwargs):
+    outlet_id = instance.outlet_id
+    transaction.on_commit(lambda: invalidate_reservation_index(outlet_id), using=using)
@@ -0,0 +1,133 @@
+# restaurant/startup.py
+"""
+Worker start-up: prewarm a server worker before (or while) it serves traffic.
+
+A new gunicorn / uvicorn worker otherwise pays on its first requests for
+importing every view module, compiling the URL resolver, cold database
+caches and building the menu search index. When PREWARM_ON_STARTUP is set
+and the process is a server (backend/wsgi.py and backend/asgi.py set
+RESTAURANT_PREWARM=1), RestaurantConfig.ready() calls schedule_prewarm(),
+which runs prewarm() in a background thread of each worker:
+
+- right after the worker is forked from a process that already loaded the
+  app (gunicorn --preload), so it is usually done before the first request
+- otherwise (the worker loaded the app itself) when its first request comes
+  in; that request is not delayed, the ones behind it are served warm
+
+Nothing runs in a --preload master itself: its threads do not survive the
+fork, and a scheduler started there would look running to every worker.
+
+What stays warm is process-wide: imports, the URL resolver, the menu search
+indexes, the turn-time statistics behind waitlist quotes, the overdue-bill
+scheduler, and the database server's own caches. Database connections are
+per thread and per process, so none are opened ahead for request threads;
+the ones this thread used are closed when it finishes.
+"""
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+PREWARM_ENV = 'RESTAURANT_PREWARM'
+
+
+def should_prewarm():
+    return getattr(settings, 'PREWARM_ON_STARTUP', True) and os.environ.get(PREWARM_ENV) == '1'
+
+
+def warm_urls():
+    """Import every view module (and what they import) and compile the resolver"""
+    from django.urls import get_resolver
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+
+    get_resolver().url_patterns
+    JWTAuthentication()
+
+
+def warm_outlets():
+    """Menu search index, turn-time statistics, menu and table snapshot of each active outlet"""
+    from .menu_search import get_menu_index
+    from .models import Outlet, MenuItem, Table
+    from .outlets import get_default_outlet, outlet_context
+    from .turn_times import get_turn_time_stats
+
+    outlets = {get_default_outlet(), *Outlet.objects.filter(is_active=True)}
+    for outlet in outlets:
+        with outlet_context(outlet):
+            get_menu_index()
+            get_turn_time_stats()
+            list(MenuItem.objects.values_list('id', 'price', 'is_available'))
+            list(Table.objects.values_list('id', 'status'))
+
+
+def warm_scheduler():
+    from .overdue import get_scheduler
+
+    get_scheduler()
+
+
+PREWARM_STEPS = [
+    ('urls', warm_urls),
+    ('outlets', warm_outlets),
+    ('overdue', warm_scheduler),
+]
+
+
+def prewarm():
+    """Run every step; a failing step is logged and skipped. Returns {step: ms}"""
+    timings = {}
+    try:
+        for name, step in PREWARM_STEPS:
+            started = time.perf_counter()
+            try:
+                step()
+            except Exception:
+                logger.exception('Prewarm step %s failed', name)
+                continue
+            timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    finally:
+        # This thread's connections would otherwise stay open until it exits
+        connections.close_all()
+    logger.info('Worker %s prewarmed: %s', os.getpid(), timings)
+    return timings
+
+
+# Set once this process started its prewarm thread; inherited by processes it
+# forks later (receipt / staff import pools), which must not prewarm again
+_prewarm_started = False
+_prewarm_lock = threading.Lock()
+
+
+def prewarm_in_background():
+    global _prewarm_started
+    _prewarm_started = True
+    thread = threading.Thread(target=prewarm, name='restaurant-prewarm', daemon=True)
+    thread.start()
+    return thread
+
+
+def _after_fork():
+    # Only this thread exists in the new child
+    if not _prewarm_started:
+        prewarm_in_background()
+
+
+def _on_request_started(sender, **kwargs):
+    if _prewarm_started:
+        return
+    with _prewarm_lock:
+        if not _prewarm_started:
+            prewarm_in_background()
+
+
+def schedule_prewarm():
+    """Prewarm each worker forked from this process, or this process on its first request"""
+    os.register_at_fork(after_in_child=_after_fork)
+    request_started.connect(_on_request_started, dispatch_uid='restaurant-prewarm')
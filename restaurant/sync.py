@@ -0,0 +1,438 @@
+# restaurant/sync.py
+"""
+Batch sync for offline waiter tablets.
+
+A tablet that was offline pushes its queued operations in one request.
+Every operation carries a client-generated UUID and timestamp; the whole
+batch is applied in one transaction with bulk inserts, and operations that
+were already applied (same UUID) are answered from the stored result.
+The response also carries everything that changed on the server since the
+tablet's last cursor, so it catches up in the same round trip.
+"""
+import json
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Table, MenuItem, Order, OrderItem, SyncOperation, DeletionLog
+from .money import from_paise, line_subtotal, to_paise
+from .outlets import current_database, outlet_atomic
+from .events import order_created_event, order_status_event, record_events
+from .reservations import invalidate_reservation_index
+
+
+OPERATION_TYPES = ['create_order', 'update_order_status']
+ORDER_STATUSES = [choice for choice, _ in Order.STATUS_CHOICES]
+
+# Rows are returned from (cursor - overlap) so a transaction that committed
+# just after the previous cursor was issued is not missed. Clients dedupe by id.
+CURSOR_OVERLAP = timedelta(seconds=2)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+# ---------- cursors ----------
+
+def encode_cursor(moment):
+    """Opaque change cursor: microseconds since the epoch, as a string"""
+    delta = moment - _EPOCH
+    return str((delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds)
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor(). Raises ValueError on a malformed cursor."""
+    try:
+        return _EPOCH + timedelta(microseconds=int(cursor))
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError('Invalid cursor')
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# ---------- results ----------
+
+def _applied(client_uuid, **data):
+    return {'client_uuid': client_uuid, 'status': 'applied', **data}
+
+
+def _rejected(client_uuid, message, code=400):
+    return {'client_uuid': client_uuid, 'status': 'rejected', 'code': code, 'message': message}
+
+
+def _parse_operations(operations, results):
+    """
+    Validate the envelope of every operation.
+    Returns the valid ones as dicts with index / client_uuid / type / timestamp / payload.
+    """
+    parsed = []
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            results[index] = _rejected(None, 'Operation must be an object')
+            continue
+
+        raw_uuid = operation.get('client_uuid')
+        try:
+            client_uuid = str(uuid.UUID(str(raw_uuid)))
+        except ValueError:
+            results[index] = _rejected(raw_uuid, 'Invalid client_uuid')
+            continue
+
+        operation_type = operation.get('type')
+        if operation_type not in OPERATION_TYPES:
+            results[index] = _rejected(client_uuid, 'Unknown operation type')
+            continue
+
+        client_timestamp = None
+        if operation.get('client_timestamp'):
+            client_timestamp = parse_datetime(str(operation['client_timestamp']))
+            if client_timestamp is None:
+                results[index] = _rejected(client_uuid, 'Invalid client_timestamp')
+                continue
+            if timezone.is_naive(client_timestamp):
+                client_timestamp = timezone.make_aware(client_timestamp)
+
+        payload = operation.get('payload')
+        if not isinstance(payload, dict):
+            results[index] = _rejected(client_uuid, 'payload must be an object')
+            continue
+
+        parsed.append({
+            'index': index,
+            'client_uuid': client_uuid,
+            'type': operation_type,
+            'client_timestamp': client_timestamp,
+            'payload': payload,
+        })
+
+    return parsed
+
+
+# ---------- apply ----------
+
+def _apply_creates(user, creates, results):
+    """Bulk-create orders and their items. Returns {client_uuid: order_id} for created orders."""
+    table_ids = {_as_int(op['payload'].get('table_id')) for op in creates}
+    menu_ids = {
+        _as_int(item.get('menu_item_id'))
+        for op in creates
+        for item in op['payload'].get('items') or []
+        if isinstance(item, dict)
+    }
+    tables = Table.objects.in_bulk([table_id for table_id in table_ids if table_id])
+    menu_items = MenuItem.objects.in_bulk([menu_id for menu_id in menu_ids if menu_id])
+
+    new_orders = {}  # client_uuid -> unsaved Order
+    new_items = {}   # client_uuid -> [OrderItem without order]
+    for op in creates:
+        payload = op['payload']
+        table = tables.get(_as_int(payload.get('table_id')))
+        items = payload.get('items') or []
+
+        if table is None:
+            results[op['index']] = _rejected(op['client_uuid'], 'Table not found', 404)
+            continue
+        if not items:
+            results[op['index']] = _rejected(op['client_uuid'], 'Table and items required')
+            continue
+
+        order_items = []
+        error = None
+        for item in items:
+            menu_item = menu_items.get(_as_int(item.get('menu_item_id'))) if isinstance(item, dict) else None
+            if menu_item is None:
+                error = _rejected(op['client_uuid'], 'Menu item not found', 404)
+                break
+            try:
+                quantity = int(item.get('quantity'))
+            except (TypeError, ValueError):
+                quantity = 0
+            if quantity < 1:
+                error = _rejected(op['client_uuid'], 'Quantity must be at least 1')
+                break
+            # bulk_create skips OrderItem.save(), so price the line here
+            order_items.append(OrderItem(
+                menu_item=menu_item,
+                quantity=quantity,
+                price_at_order=menu_item.price,
+                subtotal=line_subtotal(menu_item.price, quantity),
+            ))
+
+        if error:
+            results[op['index']] = error
+            continue
+
+        new_orders[op['client_uuid']] = Order(
+            outlet_id=table.outlet_id,
+            table=table,
+            created_by=user,
+            status='Placed',
+            client_uuid=op['client_uuid'],
+            total_amount=from_paise(sum(to_paise(line.subtotal) for line in order_items)),
+        )
+        new_items[op['client_uuid']] = order_items
+
+    if not new_orders:
+        return {}
+
+    Order.objects.bulk_create(new_orders.values())
+    # bulk_create() does not return ids on every backend: read them back by client_uuid
+    order_ids = {
+        str(client_uuid): order_id
+        for client_uuid, order_id in Order.objects.filter(
+            client_uuid__in=list(new_items)
+        ).values_list('client_uuid', 'id')
+    }
+
+    lines = []
+    events = []
+    for client_uuid, order_items in new_items.items():
+        order = new_orders[client_uuid]
+        order.id = order_ids[client_uuid]
+        for line in order_items:
+            line.order_id = order.id
+            lines.append(line)
+        events.append(order_created_event(order, order_items, user))
+    OrderItem.objects.bulk_create(lines)
+    record_events(events)
+
+    # Same rule as the post_save signal: Available -> Occupied
+    occupied = Table.objects.filter(
+        id__in={order.table_id for order in new_orders.values()}, status='Available'
+    ).update(status='Occupied', updated_at=timezone.now())
+    if occupied:
+        # update() sends no Table signals: drop the allocator's cached indexes instead
+        outlet_ids = {order.outlet_id for order in new_orders.values()}
+        transaction.on_commit(
+            lambda: [invalidate_reservation_index(outlet_id) for outlet_id in outlet_ids],
+            using=current_database(),
+        )
+
+    for op in creates:
+        if op['client_uuid'] in order_ids:
+            results[op['index']] = _applied(
+                op['client_uuid'],
+                order_id=order_ids[op['client_uuid']],
+                total_amount=str(new_orders[op['client_uuid']].total_amount),
+            )
+
+    return order_ids
+
+
+def _apply_status_updates(user, updates, created_ids, results):
+    """Apply status changes; the latest client_timestamp per order wins. One UPDATE per status."""
+    # Orders may be referenced by server id or by the client_uuid they were created with
+    client_refs = {
+        str(op['payload']['order_client_uuid'])
+        for op in updates
+        if op['payload'].get('order_client_uuid') and not op['payload'].get('order_id')
+    }
+    by_client_uuid = dict(created_ids)
+    missing = client_refs - set(by_client_uuid)
+    if missing:
+        by_client_uuid.update(
+            (str(client_uuid), order_id)
+            for client_uuid, order_id in Order.objects.filter(
+                client_uuid__in=list(missing)
+            ).values_list('client_uuid', 'id')
+        )
+
+    resolved = []
+    for op in updates:
+        payload = op['payload']
+        order_id = _as_int(payload.get('order_id')) or by_client_uuid.get(
+            str(payload.get('order_client_uuid'))
+        )
+        if payload.get('status') not in ORDER_STATUSES:
+            results[op['index']] = _rejected(op['client_uuid'], 'Invalid status')
+            continue
+        resolved.append((op, order_id))
+
+    existing = {
+        order.id: order
+        for order in Order.objects.filter(
+            id__in=[order_id for _, order_id in resolved if order_id]
+        ).only('id', 'outlet_id')
+    }
+
+    final_status = {}
+    events = []
+    for op, order_id in resolved:
+        if order_id not in existing:
+            results[op['index']] = _rejected(op['client_uuid'], 'Order not found', 404)
+            continue
+        # Operations are processed in client_timestamp order
+        final_status[order_id] = op['payload']['status']
+        events.append(order_status_event(existing[order_id], op['payload']['status'], user))
+        results[op['index']] = _applied(
+            op['client_uuid'], order_id=order_id, order_status=op['payload']['status']
+        )
+
+    ids_by_status = defaultdict(list)
+    for order_id, status in final_status.items():
+        ids_by_status[status].append(order_id)
+    for status, order_ids in ids_by_status.items():
+        Order.objects.filter(id__in=order_ids).update(status=status, updated_at=timezone.now())
+    record_events(events)
+
+
+def _stored_results(client_uuids):
+    """{client_uuid: SyncOperation} of operations that were already applied"""
+    return {
+        str(record.client_uuid): record
+        for record in SyncOperation.objects.filter(client_uuid__in=client_uuids)
+    }
+
+
+def _apply_batch(user, parsed, results):
+    now = timezone.now()
+
+    with outlet_atomic():
+        already_applied = _stored_results([op['client_uuid'] for op in parsed])
+
+        pending = []
+        seen = set()
+        for op in parsed:
+            record = already_applied.get(op['client_uuid'])
+            if record is not None:
+                results[op['index']] = {**json.loads(record.result), 'status': 'duplicate'}
+            elif op['client_uuid'] in seen:
+                results[op['index']] = _rejected(op['client_uuid'], 'Duplicate client_uuid in batch', 409)
+            else:
+                seen.add(op['client_uuid'])
+                pending.append(op)
+
+        # Oldest client action first; operations without a timestamp keep request order
+        pending.sort(key=lambda op: op['client_timestamp'] or now)
+
+        creates = [op for op in pending if op['type'] == 'create_order']
+        updates = [op for op in pending if op['type'] == 'update_order_status']
+
+        created_ids = _apply_creates(user, creates, results)
+        _apply_status_updates(user, updates, created_ids, results)
+
+        SyncOperation.objects.bulk_create([
+            SyncOperation(
+                client_uuid=op['client_uuid'],
+                user=user,
+                operation=op['type'],
+                order_id=results[op['index']].get('order_id'),
+                client_timestamp=op['client_timestamp'],
+                result=json.dumps(results[op['index']]),
+            )
+            for op in pending
+            if results[op['index']]['status'] == 'applied'
+        ])
+
+
+def apply_sync_batch(user, operations):
+    """
+    Apply a batch of client operations in one transaction.
+    Returns one result dict per operation, in request order.
+    """
+    results = [None] * len(operations)
+    parsed = _parse_operations(operations, results)
+    rejected = list(results)
+
+    try:
+        _apply_batch(user, parsed, results)
+    except IntegrityError:
+        # A concurrent request with some of the same client_uuids (a tablet
+        # retrying a sync that timed out) stored them after our read and the
+        # unique index made our transaction roll back. Its rows are committed
+        # now: run the batch again, those operations come back as duplicates.
+        results = list(rejected)
+        _apply_batch(user, parsed, results)
+
+    return results
+
+
+# ---------- catch-up ----------
+
+def serialize_order(order):
+    return {
+        'id': order.id,
+        'client_uuid': str(order.client_uuid) if order.client_uuid else None,
+        'table_id': order.table_id,
+        'table': order.table.table_number,
+        'status': order.status,
+        'is_billed': order.is_billed,
+        'total_amount': str(order.total_amount),
+        'items': [
+            {
+                'menu_item_id': item.menu_item_id,
+                'menu_item': item.menu_item.name,
+                'quantity': item.quantity,
+                'price': str(item.price_at_order),
+                'subtotal': str(item.subtotal),
+            }
+            for item in order.order_items.all()
+        ],
+        'created_at': order.created_at,
+        'updated_at': order.updated_at,
+    }
+
+
+def collect_changes(since=None):
+    """
+    Orders and tables changed since ``since`` (a datetime), or the current
+    working set (unbilled orders, all tables) when there is no cursor yet.
+    Returns (changes, new_cursor).
+    """
+    new_cursor = encode_cursor(timezone.now())
+
+    orders = Order.objects.select_related('table').prefetch_related('order_items__menu_item')
+    tables = Table.objects.all()
+    if since is None:
+        orders = orders.filter(is_billed=False)
+    else:
+        orders = orders.filter(updated_at__gte=since - CURSOR_OVERLAP)
+        tables = tables.filter(updated_at__gte=since - CURSOR_OVERLAP)
+
+    changes = {
+        'orders': [serialize_order(order) for order in orders],
+        'tables': [
+            {
+                'id': table.id,
+                'table_number': table.table_number,
+                'seating_capacity': table.seating_capacity,
+                'status': table.status,
+            }
+            for table in tables
+        ],
+    }
+    return changes, new_cursor
+
+
+# ---------- delta polling ----------
+
+def record_deletion(instance):
+    """Tombstone for a table / menu item that is being deleted (call in the same transaction)"""
+    DeletionLog.objects.create(
+        outlet_id=instance.outlet_id,
+        model_name=instance._meta.model_name,
+        object_id=instance.pk,
+    )
+
+
+def changes_since(queryset, since):
+    """
+    Rows of ``queryset`` changed since ``since`` (a decoded cursor), and the
+    ids of rows of the same model deleted since then.
+    Returns (changed_queryset, deleted_ids).
+    """
+    window = since - CURSOR_OVERLAP
+    deleted_ids = list(
+        DeletionLog.objects.filter(
+            model_name=queryset.model._meta.model_name, deleted_at__gte=window
+        ).values_list('object_id', flat=True)
+    )
+    return queryset.filter(updated_at__gte=window), deleted_ids
@@ -1,3 +1,1113 @@
-from django.test import TestCase
+# restaurant/tests.py
+"""
+SQL snapshot tests: every API route, small and large data.
 
-# Create your tests here.
+Each route in restaurant/urls.py and accounts/urls.py is called against a
+small fixture, then again after the fixture has grown several times over.
+The normalized SQL of every call is recorded and
+
+  - a route whose query count grows with the data fails (an N+1 loop), and
+  - a route whose statements differ from restaurant/sql_snapshots/<vendor>.json
+    fails (a new or dropped query, or a changed query shape).
+
+After an intentional change, rewrite the snapshots and commit the diff:
+
+    UPDATE_SQL_SNAPSHOTS=1 python manage.py test restaurant
+"""
+import csv
+import gzip
+import json
+import os
+import re
+import shutil
+import tempfile
+import uuid
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+from importlib.util import find_spec
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.db import connection, models, reset_queries, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from accounts import urls as account_urls
+from accounts.models import DevicePin
+from accounts.pins import make_pin_hash
+from . import urls as restaurant_urls
+from .amendments import add_items, change_quantity, void_item
+from .archive import archive_paid_bills
+from .compression import compress
+from .events import order_created_event, record_events
+from .exports import stream_export
+from .forecasting import refresh_forecasts, service_window
+from .idempotency import _fingerprint, idempotent
+from .menu_search import invalidate_menu_index
+from .money import from_paise, line_subtotal, tax_paise, to_paise
+from .models import (
+    Table, MenuItem, Order, OrderItem, Bill, ArchivedOrderItem, IdempotencyKey, Reservation, WaitlistEntry,
+    DemandForecast, OrderEvent,
+)
+from .outlets import get_default_outlet
+from .overdue import get_scheduler
+from .profiling import store_profile
+from . import startup
+from .reservations import (
+    book, build_reservation_index, day_bounds, get_reservation_index, invalidate_reservation_index,
+    max_minutes, parse_window,
+)
+from .sync import _stored_results, apply_sync_batch, encode_cursor
+from .transfers import transfer_orders
+from .turn_times import invalidate_turn_time_stats
+
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(__file__), 'sql_snapshots')
+UPDATE_ENV = 'UPDATE_SQL_SNAPSHOTS'
+
+# Extra batches seeded for the large run (the small run has one)
+LARGE_SCALE = 4
+
+PIN = '4821'
+DEVICE_SECRET = 'snapshot-device-secret'
+DEVICE_ID = uuid.UUID('00000000-0000-4000-8000-000000000042')
+
+
+# ---------- SQL normalization ----------
+
+_NORMALIZERS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),                      # string / date literals
+    (re.compile(r'[`"]'), ''),                                 # identifier quoting
+    (re.compile(r'\bs\d+_x\d+\b'), 's?_x?'),                   # savepoint names
+    (re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b'), '?'),         # numbers
+    (re.compile(r'\bIN \((?:\?, )*\?\)'), 'IN (...)'),         # IN lists of any length
+    (re.compile(r'(\((?:\?|NULL)(?:, (?:\?|NULL))*\))(?:, \1)+'), r'\1, ...'),  # multi-row VALUES
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def normalize_sql(sql):
+    """Statement shape with literals, list lengths and savepoint names removed"""
+    for pattern, replacement in _NORMALIZERS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+# ---------- routes ----------
+
+def route(role, method, kwargs=None, data=None, query=None, stream=None):
+    """
+    How to call one URL name. ``kwargs``, ``data`` and ``query`` may be callables taking
+    the fixture targets; ``role`` None calls anonymously; ``stream='first'``
+    reads only the first chunk of an endless streaming response.
+    """
+    return {'role': role, 'method': method, 'kwargs': kwargs, 'data': data,
+            'query': query, 'stream': stream}
+
+
+ROUTES = {
+    # ===== restaurant =====
+    'get_outlets': route('admin', 'get'),
+    'create_outlet': route('admin', 'post', data={'name': 'Snapshot Outlet', 'code': 'snapshot'}),
+    'get_all_tables': route('manager', 'get'),
+    'create_table': route('manager', 'post', data={'table_number': 'SNAP-1', 'seating_capacity': 4}),
+    'update_table': route('manager', 'put', kwargs=lambda f: {'table_id': f.free_table.id},
+                          data={'seating_capacity': 6}),
+    'delete_table': route('manager', 'delete', kwargs=lambda f: {'table_id': f.free_table.id}),
+    'transfer_table': route('waiter', 'post', data=lambda f: {
+        'source_table_id': f.occupied_tables[0].id, 'target_table_id': f.free_table.id,
+    }),
+    'merge_tables': route('manager', 'post', data=lambda f: {
+        'source_table_ids': [table.id for table in f.occupied_tables], 'target_table_id': f.ready_table.id,
+    }),
+    'get_reservations': route('waiter', 'get', query=lambda f: {'date': f.reservation.starts_at.date().isoformat()}),
+    'get_reservation_availability': route('waiter', 'get', query=lambda f: {
+        'party_size': 3, 'starts_at': (f.reservation.starts_at - timedelta(hours=4)).isoformat(),
+    }),
+    'create_reservation': route('waiter', 'post', data=lambda f: {
+        'guest_name': 'Snapshot Guest', 'party_size': 3,
+        'starts_at': (f.reservation.starts_at - timedelta(hours=4)).isoformat(),
+    }),
+    'update_reservation_status': route('waiter', 'put', kwargs=lambda f: {'reservation_id': f.reservation.id},
+                                       data={'status': 'Seated'}),
+    'get_waitlist': route('waiter', 'get'),
+    'get_waitlist_quote': route('waiter', 'get', query={'party_size': 2}),
+    'add_to_waitlist': route('waiter', 'post', data={'guest_name': 'Snapshot Walk-in', 'party_size': 2}),
+    'update_waitlist_status': route('waiter', 'put', kwargs=lambda f: {'entry_id': f.waiting_party.id},
+                                    data=lambda f: {'status': 'Seated', 'table_id': f.free_table.id}),
+    'get_turn_times': route('manager', 'get'),
+    'get_menu_items': route('waiter', 'get'),
+    'search_menu_items': route('waiter', 'get', query={'q': 'dish'}),
+    'create_menu_item': route('manager', 'post',
+                              data={'name': 'Snapshot Soup', 'category': 'Starter', 'price': '99.00'}),
+    'update_menu_item': route('manager', 'put', kwargs=lambda f: {'item_id': f.menu_item.id},
+                              data={'price': '120.00'}),
+    'delete_menu_item': route('manager', 'delete', kwargs=lambda f: {'item_id': f.menu_item.id}),
+    'create_order': route('waiter', 'post', data=lambda f: {
+        'table_id': f.free_table.id,
+        'items': [{'menu_item_id': item.id, 'quantity': 2} for item in f.menu[:3]],
+    }),
+    'update_order_status': route('waiter', 'put', kwargs=lambda f: {'order_id': f.kitchen_order.id},
+                                 data={'status': 'Served'}),
+    'add_order_items': route('waiter', 'post', kwargs=lambda f: {'order_id': f.open_order.id}, data=lambda f: {
+        'items': [{'menu_item_id': item.id, 'quantity': 1} for item in f.menu[:2]],
+    }),
+    'change_order_item_quantity': route('waiter', 'put', kwargs=lambda f: {
+        'order_id': f.open_order.id, 'item_id': f.open_line.id,
+    }, data={'quantity': 5}),
+    'void_order_item': route('manager', 'delete', kwargs=lambda f: {
+        'order_id': f.open_order.id, 'item_id': f.open_line.id,
+    }),
+    'get_table_orders': route('waiter', 'get', kwargs=lambda f: {'table_id': f.ready_table.id},
+                              query={'include': 'items'}),
+    'get_kitchen_queue': route('waiter', 'get'),
+    'get_prep_forecast': route('manager', 'get'),
+    'generate_bill': route('cashier', 'post', data=lambda f: {'table_id': f.ready_table.id}),
+    'mark_bill_paid': route('cashier', 'put', kwargs=lambda f: {'bill_id': f.pending_bill.id}),
+    'get_pending_bills': route('cashier', 'get'),
+    'get_tables_ready_for_bill': route('cashier', 'get'),
+    'get_bill_details': route('cashier', 'get', kwargs=lambda f: {'bill_id': f.pending_bill.id}),
+    'get_bill_receipt': route('cashier', 'get', kwargs=lambda f: {'bill_id': f.pending_bill.id}),
+    'get_cashier_stats': route('cashier', 'get'),
+    'get_overdue_bills': route('manager', 'get'),
+    'stream_overdue_bills': route('manager', 'get', stream='first'),
+    'get_order_events': route('manager', 'get', query={'after': 0}),
+    'sync_batch': route('waiter', 'post', data=lambda f: {'operations': [
+        {'client_uuid': str(uuid.uuid4()), 'type': 'create_order',
+         'payload': {'table_id': f.free_table.id, 'items': [{'menu_item_id': f.menu[0].id, 'quantity': 1}]}},
+        {'client_uuid': str(uuid.uuid4()), 'type': 'update_order_status',
+         'payload': {'order_id': f.kitchen_order.id, 'status': 'Served'}},
+    ]}),
+    'export_data': route('manager', 'get', kwargs={'export_name': 'bills'}),
+    'get_profiles': route('manager', 'get'),
+    'download_profile': route('manager', 'get', kwargs=lambda f: {'profile_id': f.profile_id},
+                              query={'output': 'speedscope'}),
+
+    # ===== accounts =====
+    'login': route(None, 'post', data=lambda f: {'username': f.staff.waiter.username, 'password': 'pw12345!x'}),
+    'token_refresh': route(None, 'post', data=lambda f: {'refresh': str(RefreshToken.for_user(f.staff.waiter))}),
+    'setup_pin': route('waiter', 'post', data={'pin': '7315', 'device_name': 'Snapshot tablet'}),
+    'pin_login': route(None, 'post', data=lambda f: {
+        'username': f.staff.waiter.username, 'device_id': str(DEVICE_ID),
+        'device_secret': DEVICE_SECRET, 'pin': PIN,
+    }),
+    'create_user': route('admin', 'post', data={
+        'username': 'snapshot_user', 'email': 'snapshot@example.com',
+        'password': 'pw12345!x', 'role_id': 3,
+    }),
+    'import_staff': route('admin', 'post', data={'users': [{
+        'username': 'snapshot_import', 'email': 'import@example.com',
+        'password': 'pw12345!x', 'role_id': 4,
+    }]}),
+    'get_users': route('admin', 'get'),
+    'delete_user': route('admin', 'delete', kwargs=lambda f: {'user_id': f.spare_user.id}),
+}
+
+
+def _url_names(urlconf):
+    return {pattern.name for pattern in urlconf.urlpatterns if pattern.name}
+
+
+# ---------- fixture ----------
+
+def _create_staff(username, role_id):
+    user = User.objects.create_user(username=username, password='pw12345!x')
+    user.profile.role_id = role_id
+    user.profile.save()
+    return user
+
+
+def seed_restaurant(scale, tag, staff):
+    """
+    One batch of data sized by ``scale``; returns the objects routes act on,
+    whose own size grows with ``scale`` too (orders on the table, bill lines).
+    """
+    categories = [category for category, _ in MenuItem.CATEGORY_CHOICES]
+    menu = [
+        MenuItem.objects.create(
+            name=f'{tag} Dish {number}', category=categories[number % len(categories)],
+            price=Decimal('100.00') + number,
+        )
+        for number in range(6 * scale)
+    ]
+    tables = iter(range(1, 1000))
+    orders = []
+
+    def table(status='Available'):
+        return Table.objects.create(table_number=f'{tag}-{next(tables)}', seating_capacity=4, status=status)
+
+    def order(on_table, status, lines=3):
+        placed = Order.objects.create(table=on_table, created_by=staff.waiter, status=status)
+        for number in range(lines):
+            item = menu[(len(orders) + number) % len(menu)]
+            OrderItem.objects.create(order=placed, menu_item=item, quantity=1 + number % 2,
+                                     price_at_order=item.price)
+        placed.calculate_total()
+        orders.append(placed)
+        return placed
+
+    def bill(status):
+        on_table = table()
+        for _ in range(2 * scale):
+            order(on_table, 'Served')
+        generated = Bill.objects.create(table=on_table, generated_by=staff.cashier, status='Pending Payment')
+        generated.calculate_bill()
+        if status == 'Paid':
+            generated.status, generated.paid_at = 'Paid', timezone.now()
+            generated.save()
+        return generated
+
+    ready_tables = []
+    for _ in range(2 * scale):
+        ready = table()
+        for _ in range(scale + 1):
+            order(ready, 'Served')
+        ready.status = 'Bill Requested'
+        ready.save()
+        ready_tables.append(ready)
+
+    kitchen_orders = []
+    for _ in range(2 * scale):
+        occupied = table()
+        for _ in range(scale):
+            order(occupied, 'Served')
+        kitchen_orders.append(order(occupied, 'In Kitchen'))
+        order(occupied, 'Placed')
+
+    # Unbilled order whose line count grows with scale (amendments)
+    open_order = order(table(), 'Served', lines=3 * scale)
+    open_line = open_order.order_items.order_by('id').first()
+
+    pending_bills = [bill('Pending Payment') for _ in range(scale + 1)]
+    for _ in range(2 * scale):
+        bill('Paid')
+    free_tables = [table() for _ in range(scale + 1)]
+    spare_users = [_create_staff(f'{tag}_waiter_{number}', 3) for number in range(2 * scale)]
+
+    # Tomorrow evening: two back-to-back bookings on every free table
+    evening = day_bounds(timezone.localdate() + timedelta(days=1))[0] + timedelta(hours=19)
+    reservations = [
+        Reservation.objects.create(
+            table=free, guest_name=f'{tag} Guest', party_size=3,
+            starts_at=evening + timedelta(hours=2 * slot), ends_at=evening + timedelta(hours=2 * slot + 2),
+            created_by=staff.waiter,
+        )
+        for free in free_tables for slot in range(2)
+    ]
+    # Forecasts for every menu item over the prep endpoint's default window
+    DemandForecast.objects.bulk_create([
+        DemandForecast(outlet=get_default_outlet(), menu_item=item, weekday=weekday, hour=hour,
+                       quantity=1.5, refreshed_at=timezone.now())
+        for item in menu for weekday, hour in service_window()[2]
+    ])
+    waiting = [
+        WaitlistEntry.objects.create(guest_name=f'{tag} Walk-in {number}', party_size=2 + number % 4,
+                                     created_by=staff.waiter)
+        for number in range(2 * scale)
+    ]
+
+    # Journal entries old enough to be past the read settle window
+    events = [order_created_event(placed, placed.order_items.all(), staff.waiter) for placed in orders]
+    for event in events:
+        event.recorded_at = timezone.now() - timedelta(hours=1)
+    record_events(events)
+
+    profile_id = store_profile({
+        'url_name': 'get_pending_bills', 'method': 'GET', 'path': '/api/restaurant/bills/pending/',
+        'mode': 'sampling', 'stacks': [{'stack': [['views.py', 1, 'get_pending_bills']], 'seconds': 0.01}],
+        'queries': [],
+    })
+
+    return SimpleNamespace(
+        staff=staff, menu=menu, menu_item=menu[-1], profile_id=profile_id,
+        ready_table=ready_tables[0], kitchen_order=kitchen_orders[0],
+        pending_bill=pending_bills[0], free_table=free_tables[0],
+        spare_user=spare_users[0], open_order=open_order, open_line=open_line,
+        occupied_tables=[placed.table for placed in kitchen_orders[:2]],
+        reservation=reservations[0], waiting_party=waiting[0],
+    )
+
+
+# ---------- harness ----------
+
+@override_settings(
+    # Login / user creation hash passwords; the statements are the same with a fast hasher
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    STAFF_IMPORT_HASH_WORKERS=1,
+)
+class SQLSnapshotTests(TestCase):
+    maxDiff = None
+
+    def setUp(self):
+        profiles = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, profiles)
+        profile_settings = override_settings(PROFILE_DIR=profiles)
+        profile_settings.enable()
+        self.addCleanup(profile_settings.disable)
+
+        self.staff = SimpleNamespace(
+            admin=_create_staff('snapshot_admin', 1),
+            manager=_create_staff('snapshot_manager', 2),
+            waiter=_create_staff('snapshot_waiter', 3),
+            cashier=_create_staff('snapshot_cashier', 4),
+        )
+        DevicePin.objects.create(
+            user=self.staff.waiter, device_id=DEVICE_ID, device_name='Snapshot tablet',
+            pin_hash=make_pin_hash(DEVICE_SECRET, PIN),
+        )
+        # Started up front so its initial load is not charged to a route
+        get_scheduler()
+
+    def _client(self, role):
+        client = APIClient()
+        if role:
+            # A real bearer token, so authentication queries are part of the snapshot
+            token = AccessToken.for_user(getattr(self.staff, role))
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def _call(self, name, spec, targets):
+        """Normalized statements run by one call; its writes are rolled back"""
+        resolve = lambda value: value(targets) if callable(value) else value
+        url = reverse(name, kwargs=resolve(spec['kwargs']))
+        client = self._client(spec['role'])
+        data = resolve(spec['data'])
+        cache.clear()
+        invalidate_menu_index(get_default_outlet().id)
+        invalidate_reservation_index(get_default_outlet().id)
+        invalidate_turn_time_stats()
+        reset_queries()
+
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as captured:
+                if spec['method'] == 'get':
+                    response = client.get(url, resolve(spec['query']) or {})
+                else:
+                    response = getattr(client, spec['method'])(url, data, format='json')
+                if response.streaming:
+                    chunks = iter(response.streaming_content)
+                    if spec['stream'] == 'first':
+                        next(chunks)
+                    else:
+                        for _ in chunks:
+                            pass
+                    response.close()
+            transaction.set_rollback(True)
+
+        self.assertLess(
+            response.status_code, 300,
+            f'{name} returned {response.status_code}: {getattr(response, "data", "")}'
+        )
+        return [normalize_sql(query['sql']) for query in captured.captured_queries]
+
+    def _record(self, targets):
+        return {name: self._call(name, spec, targets) for name, spec in sorted(ROUTES.items())}
+
+    def test_every_route_has_a_spec(self):
+        names = _url_names(restaurant_urls) | _url_names(account_urls)
+        self.assertEqual(sorted(names - set(ROUTES)), [], 'Add these URL names to ROUTES')
+        self.assertEqual(sorted(set(ROUTES) - names), [], 'These ROUTES no longer exist')
+
+    def test_sql_snapshots(self):
+        small = self._record(seed_restaurant(1, 'S', self.staff))
+        for number in range(LARGE_SCALE):
+            targets = seed_restaurant(LARGE_SCALE, f'L{number}', self.staff)
+        large = self._record(targets)
+
+        scaling = {}
+        for name in ROUTES:
+            if len(large[name]) > len(small[name]):
+                grown = Counter(large[name]) - Counter(small[name])
+                scaling[name] = f'{len(small[name])} -> {len(large[name])} queries, repeated: {sorted(grown)}'
+        self.assertEqual(scaling, {}, 'Query count grows with the data (N+1)')
+
+        path = os.path.join(SNAPSHOT_DIR, f'{connection.vendor}.json')
+        if os.environ.get(UPDATE_ENV):
+            os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+            with open(path, 'w') as snapshot_file:
+                json.dump(
+                    {name: {'count': len(statements), 'statements': statements}
+                     for name, statements in sorted(small.items())},
+                    snapshot_file, indent=2,
+                )
+                snapshot_file.write('\n')
+            return
+        if not os.path.exists(path):
+            self.skipTest(f'No SQL snapshots for {connection.vendor}; run with {UPDATE_ENV}=1 to create them')
+
+        with open(path) as snapshot_file:
+            snapshots = json.load(snapshot_file)
+        changed = {}
+        for name, statements in sorted(small.items()):
+            expected = snapshots.get(name, {}).get('statements', [])
+            if statements != expected:
+                added = Counter(statements) - Counter(expected)
+                removed = Counter(expected) - Counter(statements)
+                changed[name] = {
+                    'count': f'{len(expected)} -> {len(statements)}',
+                    'new': sorted(added.elements()),
+                    'gone': sorted(removed.elements()),
+                }
+        self.assertEqual(
+            changed, {},
+            f'SQL differs from {os.path.relpath(path)}; if intended, rerun with {UPDATE_ENV}=1'
+        )
+
+
+# ---------- behavior ----------
+
+def _served_order(table, staff, lines):
+    """Served order on ``table`` with (menu item, quantity) ``lines``"""
+    order = Order.objects.create(table=table, created_by=staff.waiter, status='Served')
+    for item, quantity in lines:
+        OrderItem.objects.create(order=order, menu_item=item, quantity=quantity, price_at_order=item.price)
+    order.calculate_total()
+    return order
+
+
+def _paid_bill(table, staff, paid_at=None):
+    """Bill the table's served orders and mark it paid"""
+    with transaction.atomic():
+        bill = Bill.objects.create(table=table, generated_by=staff.cashier, status='Pending Payment')
+        bill.calculate_bill()
+    bill.status, bill.paid_at = 'Paid', paid_at or timezone.now()
+    bill.save()
+    return bill
+
+
+class ArchivedReferenceTests(TestCase):
+    """Archived bills outlive the tables and menu items they point at"""
+
+    def setUp(self):
+        self.staff = SimpleNamespace(
+            waiter=_create_staff('archive_waiter', 3), cashier=_create_staff('archive_cashier', 4),
+            manager=_create_staff('archive_manager', 2),
+        )
+        self.table = Table.objects.create(table_number='AR-1', seating_capacity=4)
+        self.kept = MenuItem.objects.create(name='Kept Dish', category='Main', price=Decimal('100.00'))
+        self.dropped = MenuItem.objects.create(name='Dropped Dish', category='Starter', price=Decimal('50.00'))
+        _served_order(self.table, self.staff, [(self.kept, 1), (self.dropped, 2)])
+        self.bill = _paid_bill(self.table, self.staff, paid_at=timezone.now() - timedelta(days=40))
+        archive_paid_bills(older_than_days=30)
+        # delete() clears the instances' ids
+        self.table_id, self.dropped_id = self.table.id, self.dropped.id
+        self.dropped.delete()
+        self.table.delete()
+
+    def _client(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_export_keeps_lines_of_deleted_menu_items(self):
+        self.assertEqual(ArchivedOrderItem.objects.count(), 2)
+        rows = list(csv.DictReader(''.join(stream_export('order_items')).splitlines()))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(sorted(row['menu_item'] for row in rows), ['', 'Kept Dish'])
+        self.assertEqual({row['table'] for row in rows}, {''})
+
+        bills = list(csv.DictReader(''.join(stream_export('bills')).splitlines()))
+        self.assertEqual([row['bill_id'] for row in bills], [str(self.bill.id)])
+
+    def test_bill_details_fall_back_to_stored_ids(self):
+        response = self._client(self.staff.cashier).get(reverse('get_bill_details', kwargs={'bill_id': self.bill.id}))
+        self.assertEqual(response.status_code, 200, response.data)
+        data = response.data['data']
+        self.assertEqual(data['table'], f'#{self.table_id}')
+        self.assertEqual(sorted(item['name'] for item in data['items']),
+                         [f'Item #{self.dropped_id}', 'Kept Dish'])
+
+    def test_receipt_falls_back_to_stored_ids(self):
+        response = self._client(self.staff.cashier).get(reverse('get_bill_receipt', kwargs={'bill_id': self.bill.id}))
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        self.assertIn(f'Table #{self.table_id}', text)
+        self.assertIn(f'Item #{self.dropped_id}', text)
+
+
+class OutletHeaderTests(TestCase):
+    def test_unknown_outlet_code_is_a_404(self):
+        client = APIClient()
+        client.force_authenticate(_create_staff('outlet_admin', 1))
+        response = client.get(reverse('get_all_tables'), HTTP_X_OUTLET='nowhere')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'success': False, 'message': 'Outlet nowhere not found'})
+        known = client.get(reverse('get_all_tables'), HTTP_X_OUTLET=get_default_outlet().code)
+        self.assertEqual(known.status_code, 200)
+
+
+class MoneyRoundingTests(TestCase):
+    """The two rounding rules of restaurant/money.py, both half up to the paisa"""
+
+    def test_to_paise_rounds_half_up(self):
+        self.assertEqual(to_paise('9.0025'), 900)
+        self.assertEqual(to_paise(Decimal('9.005')), 901)
+        self.assertEqual(to_paise(Decimal('9.0049')), 900)
+        self.assertEqual(to_paise('-1.005'), -101)
+        self.assertEqual(to_paise(0.1), 10)
+        self.assertEqual(to_paise(1.005), 101)
+        self.assertEqual(to_paise(180), 18000)
+
+    def test_from_paise_is_two_place_decimal(self):
+        self.assertEqual(str(from_paise(18000)), '180.00')
+        self.assertEqual(str(from_paise(5)), '0.05')
+        self.assertEqual(from_paise(to_paise('9.0025')), Decimal('9.00'))
+
+    def test_line_subtotal_rounds_the_unit_price_first(self):
+        self.assertEqual(line_subtotal('33.335', 3), Decimal('100.02'))
+        self.assertEqual(line_subtotal('33.334', 3), Decimal('99.99'))
+        self.assertEqual(line_subtotal(Decimal('0.005'), 7), Decimal('0.07'))
+
+    def test_tax_rounds_half_up_once_per_bill(self):
+        self.assertEqual(tax_paise(1004, Decimal('12.50')), 126)    # 125.5 paise
+        self.assertEqual(tax_paise(1003, Decimal('12.50')), 125)    # 125.375 paise
+        self.assertEqual(tax_paise(10, Decimal('5.00')), 1)         # 0.5 paise
+        self.assertEqual(tax_paise(9, Decimal('5.00')), 0)          # 0.45 paise
+        self.assertEqual(tax_paise(0, Decimal('18.00')), 0)
+
+    def test_money_field_stores_paise(self):
+        item = MenuItem.objects.create(name='Rounded', category='Starter', price=Decimal('9.0025'))
+        item.refresh_from_db()
+        self.assertEqual(item.price, Decimal('9.00'))
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT price FROM menu_items WHERE id = %s', [item.id])
+            self.assertEqual(cursor.fetchone()[0], 900)
+        self.assertEqual(MenuItem.objects.filter(price=Decimal('9.004')).count(), 1)
+
+
+class MoneyMigrationTests(TransactionTestCase):
+    """0012_money_in_paise converts DECIMAL rupees to BIGINT paise and back"""
+
+    before = [('restaurant', '0011_admin_date_indexes')]
+    after = [('restaurant', '0012_money_in_paise')]
+
+    def _migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_decimal_to_paise_round_trip(self):
+        apps = self._migrate(self.before)
+        OldMenuItem = apps.get_model('restaurant', 'MenuItem')
+        outlet = apps.get_model('restaurant', 'Outlet').objects.create(name='Migration Outlet', code='migration')
+        prices = {'Plain': Decimal('180.50'), 'Cheap': Decimal('0.05'), 'Round': Decimal('99.99')}
+        ids = {
+            name: OldMenuItem.objects.create(outlet=outlet, name=name, category='Starter', price=price).id
+            for name, price in prices.items()
+        }
+
+        self._migrate(self.after)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT id, price FROM menu_items')
+            stored = dict(cursor.fetchall())
+        self.assertEqual(stored, {ids[name]: to_paise(price) for name, price in prices.items()})
+
+        apps = self._migrate(self.before)
+        restored = dict(apps.get_model('restaurant', 'MenuItem').objects.values_list('name', 'price'))
+        self.assertEqual(restored, prices)
+
+
+class OrderAmendmentTests(TestCase):
+    """Delta UPDATEs keep Order.total_amount equal to the sum of its lines"""
+
+    def setUp(self):
+        self.staff = SimpleNamespace(
+            waiter=_create_staff('amend_waiter', 3), cashier=_create_staff('amend_cashier', 4),
+            manager=_create_staff('amend_manager', 2),
+        )
+        self.table = Table.objects.create(table_number='AM-1', seating_capacity=4)
+        self.menu = [
+            MenuItem.objects.create(name=f'Amend Dish {number}', category='Main', price=price)
+            for number, price in enumerate([Decimal('120.50'), Decimal('33.33'), Decimal('0.05')])
+        ]
+        self.order = _served_order(self.table, self.staff, [(self.menu[0], 2), (self.menu[1], 1)])
+
+    def assertTotalMatchesLines(self, total):
+        self.order.refresh_from_db()
+        lines = list(self.order.order_items.values_list('price_at_order', 'quantity', 'subtotal'))
+        self.assertEqual([subtotal for _, _, subtotal in lines],
+                         [line_subtotal(price, quantity) for price, quantity, _ in lines])
+        self.assertEqual(self.order.total_amount, sum((subtotal for _, _, subtotal in lines), Decimal('0.00')))
+        self.assertEqual(total, self.order.total_amount)
+
+    def test_amendments_keep_the_total_in_step(self):
+        self.assertEqual(self.order.total_amount, Decimal('274.33'))
+
+        added, total = add_items(self.order.id, [
+            {'menu_item_id': self.menu[2].id, 'quantity': 3}, {'menu_item_id': self.menu[1].id, 'quantity': 2},
+        ], self.staff.waiter)
+        self.assertEqual(total, Decimal('341.14'))
+        self.assertTotalMatchesLines(total)
+
+        line, total = change_quantity(self.order.id, added[1].id, 5, self.staff.waiter)
+        self.assertEqual((line.quantity, line.subtotal), (5, Decimal('166.65')))
+        self.assertEqual(total, Decimal('441.13'))
+        self.assertTotalMatchesLines(total)
+
+        _, total = change_quantity(self.order.id, added[1].id, 1, self.staff.waiter)
+        self.assertTotalMatchesLines(total)
+
+        total = void_item(self.order.id, added[0].id, self.staff.manager)
+        self.assertEqual(total, Decimal('307.66'))
+        self.assertTotalMatchesLines(total)
+
+    def test_billed_order_is_refused(self):
+        _paid_bill(self.table, self.staff)
+        line = self.order.order_items.first()
+
+        with self.assertRaisesMessage(ValueError, 'Order is already billed'):
+            add_items(self.order.id, [{'menu_item_id': self.menu[2].id, 'quantity': 1}])
+        with self.assertRaisesMessage(ValueError, 'Order is already billed'):
+            change_quantity(self.order.id, line.id, 4)
+        with self.assertRaisesMessage(ValueError, 'Order is already billed'):
+            void_item(self.order.id, line.id)
+
+        # Nothing changed: no new lines, same quantities and total
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.order_items.count(), 2)
+        self.assertEqual(self.order.order_items.get(id=line.id).quantity, line.quantity)
+        self.assertEqual(self.order.total_amount, Decimal('274.33'))
+
+        client = APIClient()
+        client.force_authenticate(self.staff.waiter)
+        response = client.post(reverse('add_order_items', kwargs={'order_id': self.order.id}),
+                               {'items': [{'menu_item_id': self.menu[2].id, 'quantity': 1}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['message'], 'Order is already billed')
+
+
+class GenerateBillTests(TestCase):
+    """The bill, its event and its response cover the orders the bill locked"""
+
+    def setUp(self):
+        self.staff = SimpleNamespace(waiter=_create_staff('bill_waiter', 3), cashier=_create_staff('bill_cashier', 4))
+        self.table = Table.objects.create(table_number='GB-1', seating_capacity=4)
+        self.soup = MenuItem.objects.create(name='Bill Soup', category='Starter', price=Decimal('80.00'))
+        self.curry = MenuItem.objects.create(name='Bill Curry', category='Main', price=Decimal('250.00'))
+        self.taken = _served_order(self.table, self.staff, [(self.soup, 1)])
+        self.kept = _served_order(self.table, self.staff, [(self.curry, 2)])
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff.cashier)
+
+    def test_order_billed_before_the_lock_is_left_out(self):
+        calculate_bill = Bill.calculate_bill
+
+        def billed_meanwhile(bill):
+            # Another cashier's bill commits between the check and the lock
+            other = Bill.objects.create(table=self.table, generated_by=self.staff.cashier, status='Pending Payment')
+            Order.objects.filter(id=self.taken.id).update(is_billed=True, bill=other)
+            return calculate_bill(bill)
+
+        with mock.patch.object(Bill, 'calculate_bill', autospec=True, side_effect=billed_meanwhile):
+            response = self.client.post(reverse('generate_bill'), {'table_id': self.table.id}, format='json')
+
+        self.assertEqual(response.status_code, 201, response.data)
+        data = response.data['data']
+        self.assertEqual([item['name'] for item in data['items']], ['Bill Curry'])
+        self.assertEqual(data['subtotal'], '500.00')
+
+        event = OrderEvent.objects.get(event_type='bill_generated', bill_id=data['bill_id'])
+        self.assertEqual(json.loads(event.payload)['o'], [self.kept.id])
+
+
+class ProbedDatesTests(TestCase):
+    """Order / Bill datetimes() probe periods and match SELECT DISTINCT"""
+
+    def setUp(self):
+        self.staff = SimpleNamespace(waiter=_create_staff('dates_waiter', 3))
+        table = Table.objects.create(table_number='PD-1', seating_capacity=2)
+        moments = [timezone.now() - timedelta(days=days) for days in (0, 1, 45, 400)]
+        for moment in moments:
+            order = Order.objects.create(table=table, created_by=self.staff.waiter)
+            Order.objects.filter(id=order.id).update(created_at=moment)
+
+    def test_datetimes_match_distinct(self):
+        distinct = models.QuerySet(Order)
+        for kind in ('year', 'month', 'day'):
+            with self.subTest(kind=kind):
+                self.assertEqual(
+                    list(Order.objects.datetimes('created_at', kind)),
+                    list(distinct.datetimes('created_at', kind)),
+                )
+        self.assertEqual(
+            list(Order.objects.datetimes('created_at', 'month', order='DESC')),
+            list(distinct.datetimes('created_at', 'month', order='DESC')),
+        )
+
+    def test_changelist_date_hierarchy(self):
+        admin_user = User.objects.create_superuser('dates_admin', password='pw12345!x')
+        self.client.force_login(admin_user)
+        year = timezone.localtime().year
+        response = self.client.get(reverse('admin:restaurant_order_changelist'), {'created_at__year': year})
+        self.assertEqual(response.status_code, 200)
+
+
+class ReservationAcrossMidnightTests(TestCase):
+    def setUp(self):
+        self.waiter = _create_staff('reservation_waiter', 3)
+        self.small = Table.objects.create(table_number='A1', seating_capacity=2)
+        self.large = Table.objects.create(table_number='A2', seating_capacity=4)
+        self.day = timezone.localdate() + timedelta(days=2)
+        self.late = day_bounds(self.day)[0] + timedelta(hours=23)
+        invalidate_reservation_index(get_default_outlet().id)
+        self.addCleanup(invalidate_reservation_index, get_default_outlet().id)
+
+    def _reserve(self, table, start, end):
+        return Reservation.objects.create(table=table, guest_name='Booked', party_size=2,
+                                          starts_at=start, ends_at=end, created_by=self.waiter)
+
+    def test_late_booking_sees_next_morning(self):
+        # A1 is taken 00:30-02:00 the next day; a 23:00-01:00 booking must go to A2
+        self._reserve(self.small, self.late + timedelta(minutes=90), self.late + timedelta(hours=3))
+
+        client = APIClient()
+        client.force_authenticate(self.waiter)
+        response = client.get(reverse('get_reservation_availability'), {
+            'party_size': 2, 'starts_at': self.late.isoformat(), 'duration_minutes': 120,
+        })
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['data']['table']['id'], self.large.id)
+
+        reservation = book(2, self.late, self.late + timedelta(hours=2), guest_name='Late')
+        self.assertEqual(reservation.table_id, self.large.id)
+
+    def test_rejected_proposal_tries_the_next_candidate(self):
+        get_reservation_index(self.day)
+        # Booked behind the cached index's back (another worker)
+        self._reserve(self.small, self.late, self.late + timedelta(hours=1))
+
+        with mock.patch('restaurant.reservations.build_reservation_index',
+                        wraps=build_reservation_index) as build:
+            reservation = book(2, self.late, self.late + timedelta(hours=1), guest_name='Next')
+        self.assertEqual(reservation.table_id, self.large.id)
+        self.assertEqual(build.call_count, 0)
+
+    def test_duration_is_capped(self):
+        with self.assertRaisesMessage(ValueError, 'at most'):
+            book(2, self.late, self.late + timedelta(minutes=max_minutes() + 1), guest_name='Long')
+        with self.assertRaisesMessage(ValueError, 'at most'):
+            parse_window(self.late.isoformat(), max_minutes() + 1)
+
+
+@skipUnless(find_spec('numpy'), 'demand forecasting needs numpy')
+class ReservationIndexBulkUpdateTests(TestCase):
+    """Table statuses written with update() (sync, transfers) reach cached allocator indexes"""
+
+    def setUp(self):
+        self.staff = SimpleNamespace(waiter=_create_staff('bulk_waiter', 3))
+        self.source = Table.objects.create(table_number='BU-1', seating_capacity=4)
+        self.target = Table.objects.create(table_number='BU-2', seating_capacity=4)
+        self.item = MenuItem.objects.create(name='Bulk Dish', category='Main', price=Decimal('60.00'))
+        invalidate_reservation_index(get_default_outlet().id)
+        self.addCleanup(invalidate_reservation_index, get_default_outlet().id)
+
+    def _cached_status(self, table):
+        return get_reservation_index().tables[table.id]['status']
+
+    def test_transfer_updates_cached_statuses(self):
+        Order.objects.create(table=self.source, created_by=self.staff.waiter)
+        self.assertEqual(self._cached_status(self.source), 'Occupied')
+        self.assertEqual(self._cached_status(self.target), 'Available')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            transfer_orders(self.source.id, self.target.id, self.staff.waiter)
+        self.assertEqual(self._cached_status(self.source), 'Available')
+        self.assertEqual(self._cached_status(self.target), 'Occupied')
+
+    def test_sync_create_drops_cached_index(self):
+        self.assertEqual(self._cached_status(self.target), 'Available')
+        operation = {
+            'client_uuid': str(uuid.uuid4()), 'type': 'create_order',
+            'payload': {'table_id': self.target.id, 'items': [{'menu_item_id': self.item.id, 'quantity': 1}]},
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            [result] = apply_sync_batch(self.staff.waiter, [operation])
+        self.assertEqual(result['status'], 'applied')
+        self.assertEqual(self._cached_status(self.target), 'Occupied')
+
+
+class ForecastRefreshTests(TestCase):
+    def test_refresh_skips_deleted_menu_items(self):
+        staff = SimpleNamespace(waiter=_create_staff('forecast_waiter', 3),
+                                cashier=_create_staff('forecast_cashier', 4))
+        table = Table.objects.create(table_number='FC-1', seating_capacity=4)
+        kept = MenuItem.objects.create(name='Forecast Kept', category='Main', price=Decimal('100.00'))
+        dropped = MenuItem.objects.create(name='Forecast Dropped', category='Starter', price=Decimal('50.00'))
+        order = _served_order(table, staff, [(kept, 2), (dropped, 1)])
+        order.order_items.update(created_at=timezone.now() - timedelta(days=3))
+        _paid_bill(table, staff, paid_at=timezone.now() - timedelta(days=40))
+        archive_paid_bills(older_than_days=30)
+        dropped.delete()
+        self.assertEqual(ArchivedOrderItem.objects.count(), 2)
+
+        items, stored = refresh_forecasts()
+        self.assertEqual(items, 1)
+        self.assertGreater(stored, 0)
+        self.assertEqual(set(DemandForecast.objects.values_list('menu_item_id', flat=True)), {kept.id})
+
+
+class IdempotencyKeyTests(TestCase):
+    """@idempotent: replay, key reuse, in-flight duplicates and released keys"""
+
+    def setUp(self):
+        self.manager = _create_staff('idempotency_manager', 2)
+        self.factory = APIRequestFactory()
+        self.calls = []
+        self.statuses = []
+
+        @api_view(['POST'])
+        @idempotent
+        def view(request):
+            self.calls.append(request.data)
+            status = self.statuses.pop(0) if self.statuses else 201
+            if status == 'raise':
+                raise RuntimeError('view failed')
+            return Response({'success': status < 300, 'call': len(self.calls)}, status=status)
+        self.view = view
+
+    def _post(self, data, key='key-1'):
+        request = self.factory.post('/idempotent/', data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+        force_authenticate(request, user=self.manager)
+        return self.view(request)
+
+    def test_retry_replays_the_stored_response(self):
+        first = self._post({'table_number': 'I-1'})
+        again = self._post({'table_number': 'I-1'})
+        self.assertEqual((first.status_code, again.status_code), (201, 201))
+        self.assertEqual(again.data, {'success': True, 'call': 1})
+        self.assertEqual(again['Idempotent-Replayed'], 'true')
+        self.assertEqual(len(self.calls), 1)
+
+        # A new key runs the view again
+        self.assertEqual(self._post({'table_number': 'I-1'}, key='key-2').data['call'], 2)
+
+    def test_4xx_is_stored_and_replayed(self):
+        self.statuses = [400]
+        self.assertEqual(self._post({'table_number': ''}).status_code, 400)
+        self.assertEqual(self._post({'table_number': ''}).status_code, 400)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_key_reused_for_another_body_is_a_422(self):
+        self._post({'table_number': 'I-1'})
+        response = self._post({'table_number': 'I-2'})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(len(self.calls), 1)
+
+    def test_duplicate_waits_for_the_in_flight_request(self):
+        record = IdempotencyKey.objects.create(
+            user=self.manager, key='key-1', request_hash=_idempotency_hash({'table_number': 'I-1'}),
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+
+        def finish_first_request(seconds):
+            IdempotencyKey.objects.filter(id=record.id).update(
+                response_status=201, response_body=json.dumps({'success': True, 'call': 'first'})
+            )
+
+        with mock.patch('restaurant.idempotency.time.sleep', side_effect=finish_first_request) as sleep:
+            response = self._post({'table_number': 'I-1'})
+        self.assertTrue(sleep.called)
+        self.assertEqual((response.status_code, response.data['call']), (201, 'first'))
+        self.assertEqual(self.calls, [])
+
+    @override_settings(IDEMPOTENCY_WAIT_TIMEOUT_SECONDS=0)
+    def test_duplicate_gives_up_with_a_409(self):
+        IdempotencyKey.objects.create(
+            user=self.manager, key='key-1', request_hash=_idempotency_hash({'table_number': 'I-1'}),
+            expires_at=timezone.now() + timedelta(hours=1),
+        )
+        self.assertEqual(self._post({'table_number': 'I-1'}).status_code, 409)
+        self.assertEqual(self.calls, [])
+
+    def test_5xx_and_exceptions_release_the_key(self):
+        self.statuses = [500, 'raise']
+        self.assertEqual(self._post({'table_number': 'I-1'}).status_code, 500)
+        self.assertFalse(IdempotencyKey.objects.exists())
+        with self.assertRaises(RuntimeError):
+            self._post({'table_number': 'I-1'})
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        # The retry runs for real
+        self.assertEqual(self._post({'table_number': 'I-1'}).data['call'], 3)
+        self.assertEqual(IdempotencyKey.objects.get().response_status, 201)
+
+    def test_endpoint_creates_one_table_per_key(self):
+        client = APIClient()
+        client.force_authenticate(self.manager)
+        url = reverse('create_table')
+        for _ in range(2):
+            response = client.post(url, {'table_number': 'I-9', 'seating_capacity': 4},
+                                   format='json', HTTP_IDEMPOTENCY_KEY='table-key')
+            self.assertEqual(response.status_code, 201)
+        self.assertEqual(Table.objects.filter(table_number='I-9').count(), 1)
+        self.assertEqual(response['Idempotent-Replayed'], 'true')
+
+
+def _idempotency_hash(data, path='/idempotent/'):
+    """The fingerprint @idempotent stores for a POST of ``data``"""
+    return _fingerprint(SimpleNamespace(method='POST', path=path, data=data))
+
+
+class SyncBatchTests(TestCase):
+    """Offline tablet sync: replays, ordering, per-operation results and catch-up"""
+
+    def setUp(self):
+        self.waiter = _create_staff('sync_waiter', 3)
+        self.manager = _create_staff('sync_manager', 2)
+        self.table = Table.objects.create(table_number='SY-1', seating_capacity=4)
+        self.item = MenuItem.objects.create(name='Sync Dish', category='Main', price=Decimal('80.00'))
+        self.client = APIClient()
+        self.client.force_authenticate(self.waiter)
+
+    def _create_op(self, client_uuid=None, table_id=None, **extra):
+        return {
+            'client_uuid': client_uuid or str(uuid.uuid4()), 'type': 'create_order',
+            'payload': {'table_id': table_id or self.table.id,
+                        'items': [{'menu_item_id': self.item.id, 'quantity': 2}]},
+            **extra,
+        }
+
+    def _status_op(self, order_id, status, minutes_ago):
+        return {
+            'client_uuid': str(uuid.uuid4()), 'type': 'update_order_status',
+            'client_timestamp': (timezone.now() - timedelta(minutes=minutes_ago)).isoformat(),
+            'payload': {'order_id': order_id, 'status': status},
+        }
+
+    def _sync(self, operations, cursor=None):
+        data = {'operations': operations}
+        if cursor:
+            data['cursor'] = cursor
+        response = self.client.post(reverse('sync_batch'), data, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data['data']
+
+    def test_replayed_operation_is_a_duplicate(self):
+        operation = self._create_op()
+        first = self._sync([operation])['results'][0]
+        again = self._sync([operation])['results'][0]
+        self.assertEqual(first['status'], 'applied')
+        self.assertEqual(again['status'], 'duplicate')
+        self.assertEqual(again['order_id'], first['order_id'])
+        self.assertEqual(Order.objects.filter(client_uuid=operation['client_uuid']).count(), 1)
+
+    def test_concurrent_retry_is_answered_as_duplicate(self):
+        operation = self._create_op()
+        first = apply_sync_batch(self.waiter, [operation])[0]
+        # The retry read the stored operations before the first request committed them
+        with mock.patch('restaurant.sync._stored_results', side_effect=[{}, _stored_results([operation['client_uuid']])]):
+            again = apply_sync_batch(self.waiter, [operation, self._create_op()])
+        self.assertEqual((again[0]['status'], again[0]['order_id']), ('duplicate', first['order_id']))
+        self.assertEqual(again[1]['status'], 'applied')
+        self.assertEqual(Order.objects.filter(client_uuid=operation['client_uuid']).count(), 1)
+
+    def test_latest_client_timestamp_wins(self):
+        order_id = self._sync([self._create_op()])['results'][0]['order_id']
+        # Sent out of order: the Served tap happened after the In Kitchen one
+        results = self._sync([
+            self._status_op(order_id, 'Served', minutes_ago=1),
+            self._status_op(order_id, 'In Kitchen', minutes_ago=5),
+        ])['results']
+        self.assertEqual([result['status'] for result in results], ['applied', 'applied'])
+        self.assertEqual(Order.objects.get(id=order_id).status, 'Served')
+
+    def test_operations_are_rejected_one_by_one(self):
+        repeated = str(uuid.uuid4())
+        results = self._sync([
+            self._create_op(),
+            self._create_op(table_id=999999),
+            {'client_uuid': 'not-a-uuid', 'type': 'create_order', 'payload': {}},
+            {'client_uuid': str(uuid.uuid4()), 'type': 'drop_tables', 'payload': {}},
+            self._create_op(client_uuid=repeated),
+            self._create_op(client_uuid=repeated),
+            self._status_op(999999, 'Served', minutes_ago=0),
+        ])['results']
+        self.assertEqual(
+            [(result['status'], result.get('code')) for result in results],
+            [('applied', None), ('rejected', 404), ('rejected', 400), ('rejected', 400),
+             ('applied', None), ('rejected', 409), ('rejected', 404)],
+        )
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_cursor_returns_changes_and_tombstones(self):
+        stale = Table.objects.create(table_number='SY-2', seating_capacity=2)
+        gone = Table.objects.create(table_number='SY-3', seating_capacity=2)
+        Table.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        cursor = encode_cursor(timezone.now() - timedelta(minutes=10))
+
+        order_id = self._sync([self._create_op()])['results'][0]['order_id']
+        manager = APIClient()
+        manager.force_authenticate(self.manager)
+        self.assertEqual(manager.delete(reverse('delete_table', kwargs={'table_id': gone.id})).status_code, 200)
+
+        changes = self._sync([], cursor=cursor)['changes']
+        self.assertEqual([order['id'] for order in changes['orders']], [order_id])
+        self.assertEqual([table['id'] for table in changes['tables']], [self.table.id])
+
+        tables = self.client.get(reverse('get_all_tables'), {'since': cursor}).data
+        self.assertEqual([table['id'] for table in tables['data']], [self.table.id])
+        self.assertEqual(tables['deleted'], [gone.id])
+        self.assertNotIn(stale.id, [table['id'] for table in tables['data']])
+
+
+class CompressionPaddingTests(TestCase):
+    """Compressed bodies carry random-length padding that decoders skip (BREACH)"""
+    body = json.dumps({'token': 'secret', 'rows': [{'id': number} for number in range(200)]}).encode()
+
+    def _check(self, encoding, decompress):
+        outputs = [compress(self.body, encoding) for _ in range(20)]
+        for output in outputs:
+            self.assertEqual(decompress(output), self.body)
+        self.assertGreater(len({len(output) for output in outputs}), 1)
+
+    def test_gzip_is_padded(self):
+        self._check('gzip', gzip.decompress)
+
+    @skipUnless(find_spec('brotli'), 'brotli is optional')
+    def test_brotli_is_padded(self):
+        import brotli
+        self._check('br', brotli.decompress)
+
+
+class PrewarmTriggerTests(TestCase):
+    """Prewarm starts once per worker: after the fork or on the first request, never in ready()"""
+
+    def setUp(self):
+        patcher = mock.patch.object(startup, '_prewarm_started', False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(request_started.disconnect, dispatch_uid='restaurant-prewarm')
+
+    def test_first_request_starts_it_once(self):
+        with mock.patch('os.register_at_fork') as register, mock.patch.object(startup.threading, 'Thread') as thread:
+            startup.schedule_prewarm()
+            register.assert_called_once_with(after_in_child=startup._after_fork)
+            thread.assert_not_called()
+            for _ in range(2):
+                request_started.send(sender=None)
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once_with()
+
+    def test_forked_worker_starts_it_unless_the_parent_had(self):
+        with mock.patch.object(startup, 'prewarm_in_background') as start:
+            startup._after_fork()
+            self.assertEqual(start.call_count, 1)
+            with mock.patch.object(startup, '_prewarm_started', True):
+                startup._after_fork()
+            self.assertEqual(start.call_count, 1)
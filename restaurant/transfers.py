@@ -0,0 +1,109 @@
+# restaurant/transfers.py
+"""
+Table transfer and merge: move a party's unbilled orders to another table.
+
+- transfer: every unbilled order of one table moves to a free table
+  (guests change tables)
+- merge: the unbilled orders of several tables move to one target table
+  (tables pushed together); the target may already have orders
+
+Either way, one UPDATE reassigns the orders and one UPDATE sets the status
+of every table involved: the target becomes Occupied (if it was Available)
+and each source becomes Available, unless it still has a bill waiting for
+payment. The query count does not depend on how many orders move.
+
+Everything runs in one transaction, under row locks taken in a fixed
+order: first the tables (by id), then their unbilled orders (by id), the
+same order rows Bill.calculate_bill() locks. A bill generated at the same
+moment either takes the orders first (they are billed, so they stay
+where they are) or waits and finds them gone from its table.
+"""
+from django.db import transaction
+from django.db.models import Case, Exists, F, OuterRef, Value, When
+from django.utils import timezone
+
+from .events import order_moved_event, record_events
+from .models import Table, Order, Bill
+from .outlets import current_database, outlet_atomic
+from .reservations import notify_table_saved
+
+
+def _table_ids(values):
+    try:
+        return [int(value) for value in values]
+    except (TypeError, ValueError):
+        raise Table.DoesNotExist('Table not found')
+
+
+def move_orders(source_ids, target_id, user=None, require_free_target=False):
+    """
+    Move the unbilled orders of ``source_ids`` to ``target_id``.
+    Returns (number of orders moved, [{id, table_number, status}] of every table).
+    Raises Table.DoesNotExist, or ValueError for a move that is not allowed.
+    """
+    source_ids = sorted(set(_table_ids(source_ids)))
+    [target_id] = _table_ids([target_id])
+    if not source_ids:
+        raise ValueError('Source tables required')
+    if target_id in source_ids:
+        raise ValueError('Target table cannot also be a source')
+    table_ids = source_ids + [target_id]
+
+    with outlet_atomic():
+        tables = {
+            table.id: table
+            for table in Table.objects.select_for_update().filter(id__in=table_ids).order_by('id')
+        }
+        if len(tables) < len(table_ids):
+            raise Table.DoesNotExist('Table not found')
+        target = tables[target_id]
+        if target.status == 'Closed':
+            raise ValueError(f'Table {target.table_number} is closed')
+        if require_free_target and target.status != 'Available':
+            raise ValueError(f'Table {target.table_number} is not available')
+
+        unbilled = Order.objects.filter(table_id__in=source_ids, is_billed=False)
+        moving = list(unbilled.select_for_update().order_by('id').values_list('id', 'table_id'))
+        if not moving:
+            raise ValueError('No unbilled orders to move')
+
+        now = timezone.now()
+        # update() skips auto_now; bump updated_at for sync cursors
+        unbilled.update(table_id=target_id, updated_at=now)
+        Table.objects.filter(id__in=table_ids).update(
+            status=Case(
+                When(id=target_id, status='Available', then=Value('Occupied')),
+                When(id=target_id, then=F('status')),
+                When(
+                    Exists(Bill.objects.filter(table_id=OuterRef('pk'), status='Pending Payment')),
+                    then=F('status'),
+                ),
+                default=Value('Available'),
+            ),
+            updated_at=now,
+        )
+        record_events([
+            order_moved_event(order_id, target.outlet_id, source_id, target_id, user)
+            for order_id, source_id in moving
+        ])
+        statuses = list(Table.objects.filter(id__in=table_ids).values('id', 'table_number', 'status'))
+        # update() sends no Table signals: apply the new statuses to the allocator's cached indexes
+        changed = [
+            (row['id'], tables[row['id']].outlet_id, tables[row['id']].seating_capacity, row['status'])
+            for row in statuses
+        ]
+        transaction.on_commit(
+            lambda: [notify_table_saved(*args) for args in changed], using=current_database()
+        )
+
+    return len(moving), statuses
+
+
+def transfer_orders(source_id, target_id, user=None):
+    """Guests move from ``source_id`` to the free table ``target_id``"""
+    return move_orders([source_id], target_id, user, require_free_target=True)
+
+
+def merge_orders(source_ids, target_id, user=None):
+    """Tables ``source_ids`` are joined onto ``target_id``"""
+    return move_orders(source_ids, target_id, user)
@@ -0,0 +1,219 @@
+# restaurant/turn_times.py
+"""
+Table turn-time statistics and walk-in wait estimates.
+
+A turn is how long a party holds a table: from its first order (the table
+goes Occupied) to the bill's paid_at (the table goes Available again). Each
+worker keeps, per outlet, the median turn over the last
+TURN_TIME_WINDOW_DAYS grouped by capacity bucket and by the hour the party
+sat down, built from one GROUP BY query over paid bills and rebuilt every
+TURN_TIME_REFRESH_SECONDS. Quotes only read these medians; they never
+aggregate orders or bills themselves.
+
+A cell with fewer than TURN_TIME_MIN_SAMPLES turns falls back to the
+bucket's median over all hours, then to TURN_TIME_DEFAULT_MINUTES.
+
+estimate_waits() turns the medians into a wait per party: every open table
+frees up after its expected turn (less the time already spent), and the
+waiting parties, first come first served, take the first table that seats
+them; that table frees again one turn later.
+"""
+import math
+import statistics
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from .models import Bill, Table, WaitlistEntry
+from .outlets import get_current_outlet
+
+
+# Tables are grouped by seats: 2, 4, 6 and 8+ (a 3-top counts as a 4-top)
+CAPACITY_BUCKETS = (2, 4, 6, 8)
+
+# Turns outside this range are data errors (bill paid the next day, or never sat)
+MIN_TURN_MINUTES = 1
+MAX_TURN_MINUTES = 12 * 60
+
+# Quotes are rounded up to this many minutes
+QUOTE_STEP_MINUTES = 5
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def capacity_bucket(capacity):
+    for bucket in CAPACITY_BUCKETS:
+        if capacity <= bucket:
+            return bucket
+    return CAPACITY_BUCKETS[-1]
+
+
+def round_quote(minutes):
+    """Whole minutes, rounded up to QUOTE_STEP_MINUTES"""
+    return math.ceil(minutes / QUOTE_STEP_MINUTES) * QUOTE_STEP_MINUTES
+
+
+class TurnTimeStats:
+    """Median turn minutes by (capacity bucket, hour seated), with fallbacks"""
+
+    def __init__(self, turns, min_samples=5, default_minutes=60):
+        """``turns``: (seating capacity, seated_at, paid_at) of paid bills"""
+        by_hour, by_bucket = defaultdict(list), defaultdict(list)
+        for capacity, seated_at, paid_at in turns:
+            if seated_at is None or paid_at is None:
+                continue
+            minutes = (paid_at - seated_at).total_seconds() / 60
+            if not MIN_TURN_MINUTES <= minutes <= MAX_TURN_MINUTES:
+                continue
+            bucket = capacity_bucket(capacity)
+            by_hour[bucket, timezone.localtime(seated_at).hour].append(minutes)
+            by_bucket[bucket].append(minutes)
+
+        self.default_minutes = default_minutes
+        self.samples = sum(len(minutes) for minutes in by_bucket.values())
+        self.by_hour = {
+            key: (statistics.median(minutes), len(minutes))
+            for key, minutes in by_hour.items() if len(minutes) >= min_samples
+        }
+        self.by_bucket = {
+            bucket: (statistics.median(minutes), len(minutes))
+            for bucket, minutes in by_bucket.items() if len(minutes) >= min_samples
+        }
+
+    def expected(self, capacity, hour):
+        """Expected turn in minutes for a table of ``capacity`` seated at local ``hour``"""
+        bucket = capacity_bucket(capacity)
+        cell = self.by_hour.get((bucket, hour)) or self.by_bucket.get(bucket)
+        return cell[0] if cell else self.default_minutes
+
+    def as_table(self):
+        """Medians for display: [{bucket, hour (None = all hours), minutes, samples}]"""
+        rows = [
+            {'bucket': bucket, 'hour': hour, 'minutes': round(minutes, 1), 'samples': samples}
+            for (bucket, hour), (minutes, samples) in self.by_hour.items()
+        ] + [
+            {'bucket': bucket, 'hour': None, 'minutes': round(minutes, 1), 'samples': samples}
+            for bucket, (minutes, samples) in self.by_bucket.items()
+        ]
+        return sorted(rows, key=lambda row: (row['bucket'], -1 if row['hour'] is None else row['hour']))
+
+
+# ---------- per-outlet cache ----------
+
+_stats = {}   # outlet_id -> (built_at, TurnTimeStats)
+_stats_lock = threading.Lock()
+
+
+def build_turn_time_stats(now=None):
+    """Statistics of the current outlet's paid bills in the rolling window (one query)"""
+    now = now or timezone.now()
+    since = now - timedelta(days=_setting('TURN_TIME_WINDOW_DAYS', 28))
+    turns = (
+        Bill.objects.filter(status='Paid', paid_at__gte=since)
+        .annotate(seated_at=Min('orders__created_at'))
+        .values_list('table__seating_capacity', 'seated_at', 'paid_at')
+        .order_by()
+    )
+    return TurnTimeStats(
+        turns,
+        min_samples=_setting('TURN_TIME_MIN_SAMPLES', 5),
+        default_minutes=_setting('TURN_TIME_DEFAULT_MINUTES', 60),
+    )
+
+
+def get_turn_time_stats():
+    """The current outlet's statistics, rebuilt every TURN_TIME_REFRESH_SECONDS"""
+    outlet = get_current_outlet()
+    outlet_id = outlet.id if outlet is not None else None
+    max_age = _setting('TURN_TIME_REFRESH_SECONDS', 900)
+
+    entry = _stats.get(outlet_id)
+    if entry is not None and time.monotonic() - entry[0] < max_age:
+        return entry[1]
+
+    with _stats_lock:
+        entry = _stats.get(outlet_id)
+        if entry is None or time.monotonic() - entry[0] >= max_age:
+            entry = (time.monotonic(), build_turn_time_stats())
+            _stats[outlet_id] = entry
+    return entry[1]
+
+
+def invalidate_turn_time_stats(outlet_id=None):
+    """Drop cached statistics (all outlets by default); the next quote rebuilds"""
+    if outlet_id is None:
+        _stats.clear()
+    else:
+        _stats.pop(outlet_id, None)
+        _stats.pop(None, None)
+
+
+# ---------- wait estimates ----------
+
+def open_tables():
+    """
+    Every table that can take a walk-in, with the time its current party sat
+    down (first order not yet paid for), in one query
+    """
+    return list(
+        Table.objects.exclude(status='Closed').annotate(
+            occupied_since=Min(
+                'orders__created_at',
+                filter=Q(orders__is_billed=False) | Q(orders__bill__status='Pending Payment'),
+            )
+        ).values_list('seating_capacity', 'status', 'occupied_since').order_by('seating_capacity')
+    )
+
+
+def estimate_waits(party_sizes, tables, stats, now=None):
+    """
+    Minutes until each party (in queue order) is seated, or None when no
+    table seats them. ``tables``: (capacity, status, occupied_since) rows.
+    """
+    now = now or timezone.now()
+    # [capacity, minutes from now until free], smallest tables first
+    slots = []
+    for capacity, status, occupied_since in sorted(tables, key=lambda row: row[0]):
+        if status == 'Available':
+            slots.append([capacity, 0.0])
+            continue
+        seated = occupied_since or now
+        spent = (now - seated).total_seconds() / 60
+        expected = stats.expected(capacity, timezone.localtime(seated).hour)
+        slots.append([capacity, max(expected - spent, 0.0)])
+
+    waits = []
+    for party_size in party_sizes:
+        best = None
+        for slot in slots:
+            # Earliest free; the smaller table on a tie
+            if slot[0] >= party_size and (best is None or slot[1] < best[1]):
+                best = slot
+        if best is None:
+            waits.append(None)
+            continue
+        waits.append(best[1])
+        seated_hour = timezone.localtime(now + timedelta(minutes=best[1])).hour
+        best[1] += stats.expected(best[0], seated_hour)
+    return waits
+
+
+def waiting_queue():
+    """Parties still waiting, first come first served"""
+    return list(WaitlistEntry.objects.filter(status='Waiting').order_by('created_at', 'id'))
+
+
+def quote(party_size, queue=None):
+    """Quoted wait in minutes for a party joining behind ``queue`` now (None: no table fits)"""
+    queue = waiting_queue() if queue is None else queue
+    waits = estimate_waits(
+        [entry.party_size for entry in queue] + [party_size], open_tables(), get_turn_time_stats()
+    )
+    return None if waits[-1] is None else round_quote(waits[-1])
@@ -3,14 +3,36 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
+    # ===== OUTLETS =====
+    path('outlets/', views.get_outlets, name='get_outlets'),
+    path('outlets/create/', views.create_outlet, name='create_outlet'),
+    
     # ===== TABLE MANAGEMENT =====
     path('tables/', views.get_all_tables, name='get_all_tables'),
     path('tables/create/', views.create_table, name='create_table'),
     path('tables/update/<int:table_id>/', views.update_table, name='update_table'),
     path('tables/delete/<int:table_id>/', views.delete_table, name='delete_table'),
+    path('tables/transfer/', views.transfer_table, name='transfer_table'),
+    path('tables/merge/', views.merge_tables, name='merge_tables'),
+    
+    # ===== RESERVATIONS =====
+    path('reservations/', views.get_reservations, name='get_reservations'),
+    path('reservations/availability/', views.get_reservation_availability,
+         name='get_reservation_availability'),
+    path('reservations/create/', views.create_reservation, name='create_reservation'),
+    path('reservations/<int:reservation_id>/status/', views.update_reservation_status,
+         name='update_reservation_status'),
+    
+    # ===== WAITLIST =====
+    path('waitlist/', views.get_waitlist, name='get_waitlist'),
+    path('waitlist/quote/', views.get_waitlist_quote, name='get_waitlist_quote'),
+    path('waitlist/add/', views.add_to_waitlist, name='add_to_waitlist'),
+    path('waitlist/<int:entry_id>/status/', views.update_waitlist_status, name='update_waitlist_status'),
+    path('waitlist/turn-times/', views.get_turn_times, name='get_turn_times'),
     
     # ===== MENU MANAGEMENT =====
     path('menu/', views.get_menu_items, name='get_menu_items'),
+    path('menu/search/', views.search_menu_items, name='search_menu_items'),
     path('menu/create/', views.create_menu_item, name='create_menu_item'),
     path('menu/update/<int:item_id>/', views.update_menu_item, name='update_menu_item'),
     path('menu/delete/<int:item_id>/', views.delete_menu_item, name='delete_menu_item'),
@@ -20,13 +42,38 @@ urlpatterns = [
     path('orders/update-status/<int:order_id>/', views.update_order_status, name='update_order_status'),
     path('orders/table/<int:table_id>/', views.get_table_orders, name='get_table_orders'),
     
+    # ===== ORDER AMENDMENTS =====
+    path('orders/<int:order_id>/items/add/', views.add_order_items, name='add_order_items'),
+    path('orders/<int:order_id>/items/<int:item_id>/quantity/', views.change_order_item_quantity,
+         name='change_order_item_quantity'),
+    path('orders/<int:order_id>/items/<int:item_id>/void/', views.void_order_item, name='void_order_item'),
+    
+    # ===== KITCHEN =====
+    path('kitchen/queue/', views.get_kitchen_queue, name='get_kitchen_queue'),
+    path('kitchen/forecast/', views.get_prep_forecast, name='get_prep_forecast'),
+    
     # ===== BILLING =====
     path('bills/generate/', views.generate_bill, name='generate_bill'),
     path('bills/mark-paid/<int:bill_id>/', views.mark_bill_paid, name='mark_bill_paid'),
     path('bills/pending/', views.get_pending_bills, name='get_pending_bills'),
     path('tables/ready-for-bill/', views.get_tables_ready_for_bill, name='get_tables_ready_for_bill'),
     path('bills/<int:bill_id>/', views.get_bill_details, name='get_bill_details'),
+    path('bills/<int:bill_id>/receipt/', views.get_bill_receipt, name='get_bill_receipt'),
     path('cashier/stats/', views.get_cashier_stats, name='get_cashier_stats'),
 
     path('bills/overdue/', views.get_overdue_bills, name='get_overdue_bills'),
+    path('bills/overdue/stream/', views.stream_overdue_bills, name='stream_overdue_bills'),
+
+    # ===== ORDER EVENTS =====
+    path('events/', views.get_order_events, name='get_order_events'),
+
+    # ===== OFFLINE SYNC =====
+    path('sync/', views.sync_batch, name='sync_batch'),
+
+    # ===== EXPORTS =====
+    path('exports/<str:export_name>/', views.export_data, name='export_data'),
+
+    # ===== PROFILING =====
+    path('profiles/', views.get_profiles, name='get_profiles'),
+    path('profiles/<str:profile_id>/', views.download_profile, name='download_profile'),
 ]
\ No newline at end of file
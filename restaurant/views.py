@@ -1,14 +1,146 @@
 # restaurant/views.py
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
 from django.utils import timezone
-from django.db import transaction
-from .models import Table, MenuItem, Order, OrderItem, Bill
+from django.db.models import Count, Max, Q, Sum
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from .models import Outlet, Table, MenuItem, Order, OrderItem, Bill, Reservation, WaitlistEntry, DemandForecast
+from .archive import get_bill_or_archived, menu_item_label, table_label
+from .idempotency import idempotent
+from .sync import (
+    apply_sync_batch, collect_changes, changes_since, record_deletion,
+    encode_cursor, decode_cursor,
+)
+from .overdue import get_scheduler, event_stream, EventStreamRenderer
+from .outlets import outlet_atomic, get_current_outlet, bind_outlet, database_for_outlet
+from .fieldsets import Fieldset, Field, Nested, money
+from .menu_search import get_menu_index
+from .kitchen import prep_queue
+from .forecasting import expected_quantities, service_window
+from .amendments import add_items, change_quantity, void_item
+from .transfers import transfer_orders, merge_orders
+from .reservations import (
+    book, day_bounds, get_reservation_index, is_live, parse_day, parse_party_size, parse_window,
+    set_status as set_reservation_status,
+)
+from .turn_times import estimate_waits, get_turn_time_stats, open_tables, quote, round_quote, waiting_queue
+from .events import (
+    order_created_event, order_status_event, bill_event, record_events,
+    read_events, serialize_event,
+)
+from .receipts import (
+    RECEIPT_OUTPUTS, RECEIPT_WIDTHS, DEFAULT_RECEIPT_WIDTH, render_bill_receipt,
+    CONTENT_TYPES as RECEIPT_CONTENT_TYPES,
+)
+from .exports import (
+    EXPORTS, EXPORT_FORMATS, stream_export, parse_export_bound,
+    export_filename, export_content_type,
+)
+from .profiling import PROFILE_FORMATS, list_profiles, load_profile, to_collapsed, to_speedscope
 from decimal import Decimal
 import json
 
 
+# ==================== OUTLETS ====================
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_outlets(request):
+    """
+    List outlets
+    Access: Admin and Manager (Managers only see their own outlet)
+    """
+    try:
+        profile = request.user.profile
+        if profile.role_id not in [1, 2]:
+            return Response({
+                'success': False,
+                'message': 'You do not have permission to view outlets'
+            }, status=403)
+        
+        outlets = Outlet.objects.all()
+        if profile.outlet_id is not None:
+            outlets = outlets.filter(id=profile.outlet_id)
+        
+        return Response({
+            'success': True,
+            'data': [
+                {
+                    'id': outlet.id,
+                    'name': outlet.name,
+                    'code': outlet.code,
+                    'address': outlet.address,
+                    'is_active': outlet.is_active
+                }
+                for outlet in outlets
+            ]
+        })
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@idempotent
+def create_outlet(request):
+    """
+    Create outlet
+    Access: Admin only
+    Its data goes to settings.OUTLET_DATABASES[code] if mapped, else 'default'
+    """
+    try:
+        if request.user.profile.role_id != 1:
+            return Response({
+                'success': False,
+                'message': 'Only Admin can create outlets'
+            }, status=403)
+        
+        name = request.data.get('name')
+        code = request.data.get('code')
+        
+        if not name or not code:
+            return Response({
+                'success': False,
+                'message': 'Name and code required'
+            }, status=400)
+        
+        if Outlet.objects.filter(code=code).exists():
+            return Response({
+                'success': False,
+                'message': 'Outlet code already exists'
+            }, status=400)
+        
+        outlet = Outlet.objects.create(
+            name=name,
+            code=code,
+            address=request.data.get('address', '')
+        )
+        
+        return Response({
+            'success': True,
+            'message': 'Outlet created successfully',
+            'data': {
+                'id': outlet.id,
+                'name': outlet.name,
+                'code': outlet.code,
+                'database': database_for_outlet(outlet)
+            }
+        }, status=201)
+        
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
 # ==================== TABLE MANAGEMENT ====================
 
 @api_view(['GET'])
@@ -18,9 +150,23 @@ def get_all_tables(request):
     Get all tables with live status
     Requirement: Table Management - Show live dashboard
     Access: All roles can view
+    ?since=<cursor> returns only tables changed since the cursor, plus the
+    ids of deleted tables; every response carries the next cursor
     """
     try:
+        cursor = encode_cursor(timezone.now())
         tables = Table.objects.all()
+        deleted = None
+        
+        if request.query_params.get('since'):
+            try:
+                since = decode_cursor(request.query_params['since'])
+            except ValueError as e:
+                return Response({
+                    'success': False,
+                    'message': str(e)
+                }, status=400)
+            tables, deleted = changes_since(tables, since)
         
         tables_data = []
         for table in tables:
@@ -32,10 +178,14 @@ def get_all_tables(request):
                 'created_at': table.created_at,
             })
         
-        return Response({
+        response = {
             'success': True,
-            'data': tables_data
-        })
+            'data': tables_data,
+            'cursor': cursor
+        }
+        if deleted is not None:
+            response['deleted'] = deleted
+        return Response(response)
     except Exception as e:
         return Response({
             'success': False,
@@ -45,6 +195,7 @@ def get_all_tables(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def create_table(request):
     """
     Create new table
@@ -101,6 +252,7 @@ def create_table(request):
 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def update_table(request, table_id):
     """
     Update table
@@ -156,6 +308,7 @@ def update_table(request, table_id):
 
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def delete_table(request, table_id):
     """
     Delete table
@@ -170,7 +323,9 @@ def delete_table(request, table_id):
         
         table = Table.objects.get(id=table_id)
         table_number = table.table_number
-        table.delete()
+        with outlet_atomic():
+            record_deletion(table)
+            table.delete()
         
         return Response({
             'success': True,
@@ -189,36 +344,59 @@ def delete_table(request, table_id):
         }, status=500)
 
 
-# ==================== MENU MANAGEMENT ====================
 
-@api_view(['GET'])
+# ==================== TABLE TRANSFER & MERGE ====================
+# Unbilled orders move in one UPDATE under row locks (restaurant/transfers.py)
+
+def _table_move_response(message, moved, tables):
+    return Response({
+        'success': True,
+        'message': message,
+        'data': {
+            'orders_moved': moved,
+            'tables': tables
+        }
+    })
+
+
+@api_view(['POST'])
 @permission_classes([IsAuthenticated])
-def get_menu_items(request):
+@idempotent
+def transfer_table(request):
     """
-    Get all menu items (or only available ones)
-    Access: All roles
+    Move all unbilled orders of a table to a free table (guests change tables)
+    Body: {"source_table_id": 3, "target_table_id": 7}
+    Access: Waiter, Manager
     """
     try:
-        # Waiter should only see available items
-        if request.user.profile.role_id == 3:  # Waiter
-            menu_items = MenuItem.objects.filter(is_available=True)
-        else:
-            menu_items = MenuItem.objects.all()
+        if request.user.profile.role_id not in [2, 3]:
+            return Response({
+                'success': False,
+                'message': 'Only Waiter or Manager can transfer tables'
+            }, status=403)
         
-        items_data = []
-        for item in menu_items:
-            items_data.append({
-                'id': item.id,
-                'name': item.name,
-                'category': item.category,
-                'price': str(item.price),
-                'is_available': item.is_available
-            })
+        source_table_id = request.data.get('source_table_id')
+        target_table_id = request.data.get('target_table_id')
+        
+        if not source_table_id or not target_table_id:
+            return Response({
+                'success': False,
+                'message': 'Source and target table required'
+            }, status=400)
         
+        moved, tables = transfer_orders(source_table_id, target_table_id, request.user)
+        return _table_move_response(f'{moved} orders transferred', moved, tables)
+        
+    except ValueError as e:
         return Response({
-            'success': True,
-            'data': items_data
-        })
+            'success': False,
+            'message': str(e)
+        }, status=400)
+    except Table.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Table not found'
+        }, status=404)
     except Exception as e:
         return Response({
             'success': False,
@@ -228,85 +406,101 @@ def get_menu_items(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-def create_menu_item(request):
+@idempotent
+def merge_tables(request):
     """
-    Create menu item
-    Requirement: Manager CRUD menu
-    Access: Manager only
+    Merge tables: move all unbilled orders of the source tables to the target table
+    Body: {"source_table_ids": [3, 4], "target_table_id": 5}
+    Access: Waiter, Manager
     """
     try:
-        if request.user.profile.role_id != 2:
+        if request.user.profile.role_id not in [2, 3]:
             return Response({
                 'success': False,
-                'message': 'Only Manager can create menu items'
+                'message': 'Only Waiter or Manager can merge tables'
             }, status=403)
         
-        name = request.data.get('name')
-        category = request.data.get('category')
-        price = request.data.get('price')
-        is_available = request.data.get('is_available', True)
+        source_table_ids = request.data.get('source_table_ids')
+        target_table_id = request.data.get('target_table_id')
         
-        if not name or not category or not price:
+        if not isinstance(source_table_ids, list) or not source_table_ids or not target_table_id:
             return Response({
                 'success': False,
-                'message': 'Name, category, and price required'
+                'message': 'Source tables (list) and target table required'
             }, status=400)
         
-        menu_item = MenuItem.objects.create(
-            name=name,
-            category=category,
-            price=Decimal(price),
-            is_available=is_available
-        )
+        moved, tables = merge_orders(source_table_ids, target_table_id, request.user)
+        return _table_move_response(f'{len(tables) - 1} tables merged, {moved} orders moved', moved, tables)
         
+    except ValueError as e:
         return Response({
-            'success': True,
-            'message': 'Menu item created successfully',
-            'data': {
-                'id': menu_item.id,
-                'name': menu_item.name,
-                'category': menu_item.category,
-                'price': str(menu_item.price),
-                'is_available': menu_item.is_available
-            }
-        }, status=201)
-        
+            'success': False,
+            'message': str(e)
+        }, status=400)
+    except Table.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Table not found'
+        }, status=404)
     except Exception as e:
         return Response({
             'success': False,
             'message': str(e)
         }, status=500)
 
+# ==================== RESERVATIONS ====================
+# Best-fit table allocation from an in-memory interval index (restaurant/reservations.py)
 
-@api_view(['PUT'])
+def _reservation_data(reservation):
+    return {
+        'id': reservation.id,
+        'guest_name': reservation.guest_name,
+        'phone': reservation.phone,
+        'party_size': reservation.party_size,
+        'table_id': reservation.table_id,
+        'table_number': reservation.table.table_number,
+        'starts_at': reservation.starts_at,
+        'ends_at': reservation.ends_at,
+        'status': reservation.status,
+    }
+
+
+def _reservation_forbidden(request):
+    if request.user.profile.role_id not in [2, 3]:
+        return Response({
+            'success': False,
+            'message': 'Only Waiter or Manager can manage reservations'
+        }, status=403)
+    return None
+
+
+@api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def update_menu_item(request, item_id):
-    """Update menu item - Manager only"""
+def get_reservations(request):
+    """
+    Reservations starting on one day (?date=YYYY-MM-DD, default today)
+    Access: Waiter, Manager
+    """
     try:
-        if request.user.profile.role_id != 2:
-            return Response({
-                'success': False,
-                'message': 'Only Manager can update menu items'
-            }, status=403)
-        
-        item = MenuItem.objects.get(id=item_id)
+        forbidden = _reservation_forbidden(request)
+        if forbidden:
+            return forbidden
         
-        item.name = request.data.get('name', item.name)
-        item.category = request.data.get('category', item.category)
-        item.price = Decimal(request.data.get('price', item.price))
-        item.is_available = request.data.get('is_available', item.is_available)
-        item.save()
+        start, end = day_bounds(parse_day(request.query_params.get('date')))
+        reservations = Reservation.objects.filter(
+            starts_at__gte=start, starts_at__lt=end
+        ).select_related('table')
         
         return Response({
             'success': True,
-            'message': 'Menu item updated successfully'
+            'data': [_reservation_data(reservation) for reservation in reservations]
         })
         
-    except MenuItem.DoesNotExist:
+    except ValueError as e:
         return Response({
             'success': False,
-            'message': 'Menu item not found'
-        }, status=404)
+            'message': str(e)
+        }, status=400)
     except Exception as e:
         return Response({
             'success': False,
@@ -314,31 +508,41 @@ def update_menu_item(request, item_id):
         }, status=500)
 
 
-@api_view(['DELETE'])
+@api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def delete_menu_item(request, item_id):
-    """Delete menu item - Manager only"""
+def get_reservation_availability(request):
+    """
+    Best-fit free table for a party, without booking it
+    ?party_size=4&starts_at=2026-10-19T20:00&duration_minutes=90
+    Access: Waiter, Manager
+    """
     try:
-        if request.user.profile.role_id != 2:
-            return Response({
-                'success': False,
-                'message': 'Only Manager can delete menu items'
-            }, status=403)
+        forbidden = _reservation_forbidden(request)
+        if forbidden:
+            return forbidden
         
-        item = MenuItem.objects.get(id=item_id)
-        item_name = item.name
-        item.delete()
+        party_size = parse_party_size(request.query_params.get('party_size'))
+        start, end = parse_window(
+            request.query_params.get('starts_at'), request.query_params.get('duration_minutes')
+        )
+        index = get_reservation_index(timezone.localdate(start))
+        table_id = index.best_fit(party_size, start, end, live=is_live(start))
         
         return Response({
             'success': True,
-            'message': f'Menu item {item_name} deleted successfully'
+            'data': {
+                'available': table_id is not None,
+                'table': index.table_info(table_id) if table_id is not None else None,
+                'starts_at': start,
+                'ends_at': end
+            }
         })
         
-    except MenuItem.DoesNotExist:
+    except ValueError as e:
         return Response({
             'success': False,
-            'message': 'Menu item not found'
-        }, status=404)
+            'message': str(e)
+        }, status=400)
     except Exception as e:
         return Response({
             'success': False,
@@ -346,81 +550,46 @@ def delete_menu_item(request, item_id):
         }, status=500)
 
 
-# ==================== ORDER MANAGEMENT ====================
-
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-def create_order(request):
+@idempotent
+def create_reservation(request):
     """
-    Create order with multiple items
-    Requirement: Create orders, assign to table, add multiple menu items
-    Access: Waiter only
-    CRITICAL: Auto-change table status from Available to Occupied
+    Book a table; the smallest free table that seats the party is assigned
+    unless table_id is given
+    Body: {"guest_name": "Rao", "phone": "98...", "party_size": 4,
+           "starts_at": "2026-10-19T20:00", "duration_minutes": 90, "table_id": 7 (optional)}
+    Access: Waiter, Manager
     """
     try:
-        # Check if user is Waiter
-        if request.user.profile.role_id != 3:
-            return Response({
-                'success': False,
-                'message': 'Only Waiter can create orders'
-            }, status=403)
-        
-        table_id = request.data.get('table_id')
-        items = request.data.get('items', [])  # [{menu_item_id, quantity}, ...]
-        
-        if not table_id or not items:
-            return Response({
-                'success': False,
-                'message': 'Table and items required'
-            }, status=400)
-        
-        table = Table.objects.get(id=table_id)
-        
-        # Create order with transaction
-        with transaction.atomic():
-            order = Order.objects.create(
-                table=table,
-                created_by=request.user,
-                status='Placed'
-            )
-            
-            # Create order items
-            for item_data in items:
-                menu_item = MenuItem.objects.get(id=item_data['menu_item_id'])
-                quantity = item_data['quantity']
-                
-                OrderItem.objects.create(
-                    order=order,
-                    menu_item=menu_item,
-                    quantity=quantity,
-                    price_at_order=menu_item.price
-                )
-            
-            # Calculate total
-            order.calculate_total()
-            
-            # Signal will auto-change table status to Occupied
+        forbidden = _reservation_forbidden(request)
+        if forbidden:
+            return forbidden
+        
+        start, end = parse_window(request.data.get('starts_at'), request.data.get('duration_minutes'))
+        reservation = book(
+            request.data.get('party_size'), start, end,
+            guest_name=request.data.get('guest_name'),
+            phone=request.data.get('phone'),
+            table_id=request.data.get('table_id'),
+            user=request.user,
+        )
         
         return Response({
             'success': True,
-            'message': 'Order created successfully',
-            'data': {
-                'order_id': order.id,
-                'table': table.table_number,
-                'status': order.status,
-                'total_amount': str(order.total_amount)
-            }
+            'message': f'Table {reservation.table.table_number} reserved',
+            'data': _reservation_data(reservation)
         }, status=201)
         
-    except Table.DoesNotExist:
+    except ValueError as e:
         return Response({
             'success': False,
-            'message': 'Table not found'
-        }, status=404)
-    except MenuItem.DoesNotExist:
+            'message': str(e)
+        }, status=400)
+    except Table.DoesNotExist:
         return Response({
             'success': False,
-            'message': 'Menu item not found'
+            'message': 'Table not found'
         }, status=404)
     except Exception as e:
         return Response({
@@ -431,21 +600,624 @@ def create_order(request):
 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
-def update_order_status(request, order_id):
+@idempotent
+def update_reservation_status(request, reservation_id):
     """
-    Update order status (Placed → In Kitchen → Served)
-    Requirement: Track order status
-    Access: Waiter only
+    Seat, cancel or mark a booked reservation as a no-show
+    Body: {"status": "Seated" | "Cancelled" | "No Show"}
+    Seating occupies the table; cancelling frees the window for new bookings
+    Access: Waiter, Manager
     """
     try:
-        if request.user.profile.role_id != 3:
-            return Response({
-                'success': False,
-                'message': 'Only Waiter can update order status'
-            }, status=403)
+        forbidden = _reservation_forbidden(request)
+        if forbidden:
+            return forbidden
         
-        order = Order.objects.get(id=order_id)
-        new_status = request.data.get('status')
+        reservation = set_reservation_status(reservation_id, request.data.get('status'))
+        
+        return Response({
+            'success': True,
+            'message': f'Reservation {reservation.status}',
+            'data': _reservation_data(reservation)
+        })
+        
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+    except Reservation.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Reservation not found'
+        }, status=404)
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+# ==================== WAITLIST ====================
+# Walk-in queue; waits estimated from in-memory turn-time medians (restaurant/turn_times.py)
+
+def _waitlist_data(entry, estimated_minutes=None):
+    return {
+        'id': entry.id,
+        'guest_name': entry.guest_name,
+        'phone': entry.phone,
+        'party_size': entry.party_size,
+        'status': entry.status,
+        'quoted_minutes': entry.quoted_minutes,
+        'estimated_wait_minutes': estimated_minutes,
+        'table_id': entry.table_id,
+        'created_at': entry.created_at,
+        'seated_at': entry.seated_at,
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_waitlist(request):
+    """
+    Parties waiting, first come first served, each with a fresh wait estimate
+    Access: Waiter, Manager
+    """
+    try:
+        if request.user.profile.role_id not in [2, 3]:
+            return Response({
+                'success': False,
+                'message': 'Only Waiter or Manager can view the waitlist'
+            }, status=403)
+        
+        queue = waiting_queue()
+        waits = estimate_waits([entry.party_size for entry in queue], open_tables(), get_turn_time_stats())
+        
+        return Response({
+            'success': True,
+            'count': len(queue),
+            'data': [
+                _waitlist_data(entry, None if wait is None else round_quote(wait))
+                for entry, wait in zip(queue, waits)
+            ]
+        })
+        
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_waitlist_quote(request):
+    """
+    Wait a party of ?party_size= would be quoted if it joined now
+    Access: Waiter, Manager
+    """
+    try:
+        if request.user.profile.role_id not in [2, 3]:
+            return Response({
+                'success': False,
+                'message': 'Only Waiter or Manager can quote waits'
+            }, status=403)
+        
+        party_size = parse_party_size(request.query_params.get('party_size'))
+        queue = waiting_queue()
+        
+        return Response({
+            'success': True,
+            'data': {
+                'party_size': party_size,
+                'parties_ahead': len(queue),
+                'estimated_wait_minutes': quote(party_size, queue)
+            }
+        })
+        
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@idempotent
+def add_to_waitlist(request):
+    """
+    Put a walk-in party on the waitlist and quote its wait
+    Body: {"guest_name": "Rao", "phone": "98...", "party_size": 4}
+    Access: Waiter, Manager
+    """
+    try:
+        if request.user.profile.role_id not in [2, 3]:
+            return Response({
+                'success': False,
+                'message': 'Only Waiter or Manager can add to the waitlist'
+            }, status=403)
+        
+        guest_name = request.data.get('guest_name')
+        if not guest_name:
+            return Response({
+                'success': False,
+                'message': 'Guest name required'
+            }, status=400)
+        party_size = parse_party_size(request.data.get('party_size'))
+        
+        entry = WaitlistEntry.objects.create(
+            guest_name=guest_name,
+            phone=request.data.get('phone') or '',
+            party_size=party_size,
+            quoted_minutes=quote(party_size),
+            created_by=request.user
+        )
+        
+        return Response({
+            'success': True,
+            'message': 'Added to waitlist',
+            'data': _waitlist_data(entry, entry.quoted_minutes)
+        }, status=201)
+        
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+@idempotent
+def update_waitlist_status(request, entry_id):
+    """
+    Seat a waiting party (optionally at table_id, which becomes Occupied) or
+    mark it as left
+    Body: {"status": "Seated" | "Left", "table_id": 7}
+    Access: Waiter, Manager
+    """
+    try:
+        if request.user.profile.role_id not in [2, 3]:
+            return Response({
+                'success': False,
+                'message': 'Only Waiter or Manager can update the waitlist'
+            }, status=403)
+        
+        new_status = request.data.get('status')
+        if new_status not in ['Seated', 'Left']:
+            return Response({
+                'success': False,
+                'message': 'Status must be Seated or Left'
+            }, status=400)
+        
+        with outlet_atomic():
+            entry = WaitlistEntry.objects.select_for_update().get(id=entry_id)
+            if entry.status != 'Waiting':
+                return Response({
+                    'success': False,
+                    'message': f'Party has already {"been seated" if entry.status == "Seated" else "left"}'
+                }, status=400)
+            
+            entry.status = new_status
+            if new_status == 'Seated':
+                entry.seated_at = timezone.now()
+                if request.data.get('table_id'):
+                    table = Table.objects.select_for_update().get(id=request.data['table_id'])
+                    if table.status == 'Closed':
+                        return Response({
+                            'success': False,
+                            'message': f'Table {table.table_number} is closed'
+                        }, status=400)
+                    entry.table = table
+                    if table.status == 'Available':
+                        table.status = 'Occupied'
+                        table.save()
+            entry.save()
+        
+        return Response({
+            'success': True,
+            'message': f'Party {entry.status.lower()}',
+            'data': _waitlist_data(entry)
+        })
+        
+    except WaitlistEntry.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Waitlist entry not found'
+        }, status=404)
+    except (Table.DoesNotExist, ValueError):
+        return Response({
+            'success': False,
+            'message': 'Table not found'
+        }, status=404)
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_turn_times(request):
+    """
+    Median table turn times behind the wait estimates, by capacity bucket and
+    hour seated (hour null: all hours)
+    Access: Manager only
+    """
+    try:
+        if request.user.profile.role_id != 2:
+            return Response({
+                'success': False,
+                'message': 'Manager only'
+            }, status=403)
+        
+        stats = get_turn_time_stats()
+        
+        return Response({
+            'success': True,
+            'samples': stats.samples,
+            'default_minutes': stats.default_minutes,
+            'data': stats.as_table()
+        })
+        
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+# ==================== MENU MANAGEMENT ====================
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_menu_items(request):
+    """
+    Get all menu items (or only available ones)
+    Access: All roles
+    ?since=<cursor> returns only items changed since the cursor, plus the
+    ids of deleted items; every response carries the next cursor
+    """
+    try:
+        is_waiter = request.user.profile.role_id == 3
+        cursor = encode_cursor(timezone.now())
+        menu_items = MenuItem.objects.all()
+        deleted = None
+        
+        if request.query_params.get('since'):
+            try:
+                since = decode_cursor(request.query_params['since'])
+            except ValueError as e:
+                return Response({
+                    'success': False,
+                    'message': str(e)
+                }, status=400)
+            menu_items, deleted = changes_since(menu_items, since)
+        elif is_waiter:
+            # Waiter should only see available items
+            menu_items = menu_items.filter(is_available=True)
+        
+        items_data = []
+        for item in menu_items:
+            if is_waiter and not item.is_available:
+                # Item became unavailable: the waiter's tablet drops it
+                deleted.append(item.id)
+                continue
+            items_data.append({
+                'id': item.id,
+                'name': item.name,
+                'category': item.category,
+                'price': str(item.price),
+                'is_available': item.is_available
+            })
+        
+        response = {
+            'success': True,
+            'data': items_data,
+            'cursor': cursor
+        }
+        if deleted is not None:
+            response['deleted'] = deleted
+        return Response(response)
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_menu_items(request):
+    """
+    Search menu items by name: prefix, substring and typo-tolerant matches,
+    served from an in-memory index (restaurant/menu_search.py)
+    Query params: q (required), category, available (true/false), limit (default 20)
+    Access: All roles (Waiters only get available items)
+    """
+    try:
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({
+                'success': False,
+                'message': 'q is required'
+            }, status=400)
+        
+        category = request.query_params.get('category') or None
+        if category is not None and category not in dict(MenuItem.CATEGORY_CHOICES):
+            return Response({
+                'success': False,
+                'message': 'Invalid category'
+            }, status=400)
+        
+        available = request.query_params.get('available')
+        if request.user.profile.role_id == 3:  # Waiter
+            available = True
+        elif available is not None:
+            available = available.lower() in ['1', 'true', 'yes']
+        
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            return Response({
+                'success': False,
+                'message': 'limit must be a number'
+            }, status=400)
+        
+        results = get_menu_index().search(query, category=category, available=available, limit=limit)
+        
+        return Response({
+            'success': True,
+            'count': len(results),
+            'data': results
+        })
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@idempotent
+def create_menu_item(request):
+    """
+    Create menu item
+    Requirement: Manager CRUD menu
+    Access: Manager only
+    """
+    try:
+        if request.user.profile.role_id != 2:
+            return Response({
+                'success': False,
+                'message': 'Only Manager can create menu items'
+            }, status=403)
+        
+        name = request.data.get('name')
+        category = request.data.get('category')
+        price = request.data.get('price')
+        is_available = request.data.get('is_available', True)
+        
+        if not name or not category or not price:
+            return Response({
+                'success': False,
+                'message': 'Name, category, and price required'
+            }, status=400)
+        
+        menu_item = MenuItem.objects.create(
+            name=name,
+            category=category,
+            price=Decimal(price),
+            is_available=is_available
+        )
+        
+        return Response({
+            'success': True,
+            'message': 'Menu item created successfully',
+            'data': {
+                'id': menu_item.id,
+                'name': menu_item.name,
+                'category': menu_item.category,
+                'price': str(menu_item.price),
+                'is_available': menu_item.is_available
+            }
+        }, status=201)
+        
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+@idempotent
+def update_menu_item(request, item_id):
+    """Update menu item - Manager only"""
+    try:
+        if request.user.profile.role_id != 2:
+            return Response({
+                'success': False,
+                'message': 'Only Manager can update menu items'
+            }, status=403)
+        
+        item = MenuItem.objects.get(id=item_id)
+        
+        item.name = request.data.get('name', item.name)
+        item.category = request.data.get('category', item.category)
+        item.price = Decimal(request.data.get('price', item.price))
+        item.is_available = request.data.get('is_available', item.is_available)
+        item.save()
+        
+        return Response({
+            'success': True,
+            'message': 'Menu item updated successfully'
+        })
+        
+    except MenuItem.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Menu item not found'
+        }, status=404)
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+@api_view(['DELETE'])
+@permission_classes([IsAuthenticated])
+@idempotent
+def delete_menu_item(request, item_id):
+    """Delete menu item - Manager only"""
+    try:
+        if request.user.profile.role_id != 2:
+            return Response({
+                'success': False,
+                'message': 'Only Manager can delete menu items'
+            }, status=403)
+        
+        item = MenuItem.objects.get(id=item_id)
+        item_name = item.name
+        with outlet_atomic():
+            record_deletion(item)
+            item.delete()
+        
+        return Response({
+            'success': True,
+            'message': f'Menu item {item_name} deleted successfully'
+        })
+        
+    except MenuItem.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Menu item not found'
+        }, status=404)
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+# ==================== ORDER MANAGEMENT ====================
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@idempotent
+def create_order(request):
+    """
+    Create order with multiple items
+    Requirement: Create orders, assign to table, add multiple menu items
+    Access: Waiter only
+    CRITICAL: Auto-change table status from Available to Occupied
+    """
+    try:
+        # Check if user is Waiter
+        if request.user.profile.role_id != 3:
+            return Response({
+                'success': False,
+                'message': 'Only Waiter can create orders'
+            }, status=403)
+        
+        table_id = request.data.get('table_id')
+        items = request.data.get('items', [])  # [{menu_item_id, quantity}, ...]
+        
+        if not table_id or not items:
+            return Response({
+                'success': False,
+                'message': 'Table and items required'
+            }, status=400)
+        
+        table = Table.objects.get(id=table_id)
+        
+        # Create order with transaction (on the outlet's database)
+        with outlet_atomic():
+            order = Order.objects.create(
+                table=table,
+                created_by=request.user,
+                status='Placed'
+            )
+            
+            # Create order items
+            lines = []
+            for item_data in items:
+                menu_item = MenuItem.objects.get(id=item_data['menu_item_id'])
+                quantity = item_data['quantity']
+                
+                lines.append(OrderItem.objects.create(
+                    order=order,
+                    menu_item=menu_item,
+                    quantity=quantity,
+                    price_at_order=menu_item.price
+                ))
+            
+            # Calculate total
+            order.calculate_total()
+            
+            record_events([order_created_event(order, lines, request.user)])
+            
+            # Signal will auto-change table status to Occupied
+        
+        return Response({
+            'success': True,
+            'message': 'Order created successfully',
+            'data': {
+                'order_id': order.id,
+                'table': table.table_number,
+                'status': order.status,
+                'total_amount': str(order.total_amount)
+            }
+        }, status=201)
+        
+    except Table.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Table not found'
+        }, status=404)
+    except MenuItem.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Menu item not found'
+        }, status=404)
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+@idempotent
+def update_order_status(request, order_id):
+    """
+    Update order status (Placed → In Kitchen → Served)
+    Requirement: Track order status
+    Access: Waiter only
+    """
+    try:
+        if request.user.profile.role_id != 3:
+            return Response({
+                'success': False,
+                'message': 'Only Waiter can update order status'
+            }, status=403)
+        
+        order = Order.objects.get(id=order_id)
+        new_status = request.data.get('status')
         
         if new_status not in ['Placed', 'In Kitchen', 'Served']:
             return Response({
@@ -453,8 +1225,10 @@ def update_order_status(request, order_id):
                 'message': 'Invalid status'
             }, status=400)
         
-        order.status = new_status
-        order.save()
+        with outlet_atomic():
+            order.status = new_status
+            order.save()
+            record_events([order_status_event(order, new_status, request.user)])
         
         return Response({
             'success': True,
@@ -473,39 +1247,51 @@ def update_order_status(request, order_id):
         }, status=500)
 
 
+def _order_items_by_order(order_ids):
+    items_by_order = {}
+    for item in OrderItem.objects.filter(order_id__in=order_ids).order_by('id').values(
+        'order_id', 'menu_item__name', 'quantity', 'price_at_order', 'subtotal'
+    ):
+        items_by_order.setdefault(item['order_id'], []).append({
+            'menu_item': item['menu_item__name'],
+            'quantity': item['quantity'],
+            'price': str(item['price_at_order']),
+            'subtotal': str(item['subtotal'])
+        })
+    return items_by_order
+
+
+TABLE_ORDER_FIELDS = Fieldset(
+    id=Field('id'),
+    status=Field('status'),
+    is_billed=Field('is_billed'),
+    items=Nested(_order_items_by_order),
+    total_amount=money('total_amount'),
+    created_at=Field('created_at'),
+)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_table_orders(request, table_id):
-    """Get all orders for a specific table"""
+    """
+    Get all orders for a specific table
+    Supports ?fields= / ?include=items (see restaurant/fieldsets.py)
+    """
     try:
         table = Table.objects.get(id=table_id)
-        orders = table.orders.all()
-        
-        orders_data = []
-        for order in orders:
-            items_data = []
-            for item in order.order_items.all():
-                items_data.append({
-                    'menu_item': item.menu_item.name,
-                    'quantity': item.quantity,
-                    'price': str(item.price_at_order),
-                    'subtotal': str(item.subtotal)
-                })
-            
-            orders_data.append({
-                'id': order.id,
-                'status': order.status,
-                'is_billed': order.is_billed,
-                'items': items_data,
-                'total_amount': str(order.total_amount),
-                'created_at': order.created_at
-            })
+        orders_data = TABLE_ORDER_FIELDS.apply(request, Order.objects.filter(table=table))
         
         return Response({
             'success': True,
             'data': orders_data
         })
         
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=400)
     except Table.DoesNotExist:
         return Response({
             'success': False,
@@ -518,10 +1304,262 @@ def get_table_orders(request, table_id):
         }, status=500)
 
 
+# ==================== ORDER AMENDMENTS ====================
+# Unbilled orders only; each amendment is a delta update (restaurant/amendments.py)
+
+def _amendment_forbidden(request):
+    if request.user.profile.role_id not in [2, 3]:
+        return Response({
+            'success': False,
+            'message': 'Only Waiter or Manager can amend orders'
+        }, status=403)
+    return None
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@idempotent
+def add_order_items(request, order_id):
+    """
+    Add items to an unbilled order
+    Body: {"items": [{"menu_item_id": 1, "quantity": 2}, ...]}
+    Access: Waiter, Manager
+    """
+    try:
+        forbidden = _amendment_forbidden(request)
+        if forbidden:
+            return forbidden
+
+        lines, total = add_items(order_id, request.data.get('items') or [], request.user)
+
+        return Response({
+            'success': True,
+            'message': 'Items added to order',
+            'data': {
+                'order_id': order_id,
+                'items': [{
+                    'id': line.id,
+                    'menu_item_id': line.menu_item_id,
+                    'quantity': line.quantity,
+                    'price': str(line.price_at_order),
+                    'subtotal': str(line.subtotal)
+                } for line in lines],
+                'total_amount': str(total)
+            }
+        }, status=201)
+
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+    except Order.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Order not found'
+        }, status=404)
+    except MenuItem.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Menu item not found'
+        }, status=404)
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+@idempotent
+def change_order_item_quantity(request, order_id, item_id):
+    """
+    Change the quantity of one item on an unbilled order
+    Body: {"quantity": 3}
+    Access: Waiter, Manager
+    """
+    try:
+        forbidden = _amendment_forbidden(request)
+        if forbidden:
+            return forbidden
+
+        line, total = change_quantity(order_id, item_id, request.data.get('quantity'), request.user)
+
+        return Response({
+            'success': True,
+            'message': f'Quantity changed to {line.quantity}',
+            'data': {
+                'order_id': order_id,
+                'item_id': line.id,
+                'quantity': line.quantity,
+                'subtotal': str(line.subtotal),
+                'total_amount': str(total)
+            }
+        })
+
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+    except (Order.DoesNotExist, OrderItem.DoesNotExist):
+        return Response({
+            'success': False,
+            'message': 'Order item not found'
+        }, status=404)
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+@api_view(['DELETE'])
+@permission_classes([IsAuthenticated])
+@idempotent
+def void_order_item(request, order_id, item_id):
+    """
+    Void (remove) one item from an unbilled order
+    Access: Waiter, Manager
+    """
+    try:
+        forbidden = _amendment_forbidden(request)
+        if forbidden:
+            return forbidden
+
+        total = void_item(order_id, item_id, request.user)
+
+        return Response({
+            'success': True,
+            'message': 'Item voided',
+            'data': {
+                'order_id': order_id,
+                'total_amount': str(total)
+            }
+        })
+
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=400)
+    except (Order.DoesNotExist, OrderItem.DoesNotExist):
+        return Response({
+            'success': False,
+            'message': 'Order item not found'
+        }, status=404)
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+# ==================== KITCHEN ====================
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_kitchen_queue(request):
+    """
+    Prep queue: quantities per menu item across all Placed / In Kitchen orders
+    Query params: category (comma separated, e.g. Drinks or Starter,Main) as a station filter
+    Access: All roles
+    """
+    try:
+        categories = [
+            category.strip()
+            for category in request.query_params.get('category', '').split(',')
+            if category.strip()
+        ]
+        valid_categories = dict(MenuItem.CATEGORY_CHOICES)
+        invalid = [category for category in categories if category not in valid_categories]
+        if invalid:
+            return Response({
+                'success': False,
+                'message': f"Invalid category: {', '.join(invalid)}"
+            }, status=400)
+        
+        queue = prep_queue(categories)
+        
+        return Response({
+            'success': True,
+            'summary': {
+                'pending': sum(entry['pending'] for entry in queue),
+                'in_progress': sum(entry['in_progress'] for entry in queue)
+            },
+            'data': queue
+        })
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_prep_forecast(request):
+    """
+    Expected quantity per menu item over the next service window, from the
+    forecasts fitted by `manage.py refresh_forecasts` (restaurant/forecasting.py)
+    Query params: hours (window length, default FORECAST_WINDOW_HOURS),
+    category (comma separated station filter), limit
+    Access: Manager only
+    """
+    try:
+        if request.user.profile.role_id != 2:
+            return Response({
+                'success': False,
+                'message': 'Manager only'
+            }, status=403)
+        
+        try:
+            hours = int(request.query_params.get('hours') or getattr(settings, 'FORECAST_WINDOW_HOURS', 4))
+            limit = int(request.query_params.get('limit') or 0)
+        except ValueError:
+            hours = limit = -1
+        if not 1 <= hours <= 24 or limit < 0:
+            return Response({
+                'success': False,
+                'message': 'hours must be 1-24 and limit a non-negative number'
+            }, status=400)
+        categories = [
+            category.strip()
+            for category in request.query_params.get('category', '').split(',')
+            if category.strip()
+        ]
+        
+        start, end, slots = service_window(hours=hours)
+        forecast = [
+            {
+                'menu_item_id': row['menu_item_id'],
+                'name': row['menu_item__name'],
+                'category': row['menu_item__category'],
+                'expected_quantity': round(row['expected'], 1)
+            }
+            for row in expected_quantities(slots, categories, limit)
+        ]
+        
+        return Response({
+            'success': True,
+            'window': {'start': start, 'end': end},
+            'refreshed_at': DemandForecast.objects.aggregate(last=Max('refreshed_at'))['last'],
+            'data': forecast
+        })
+        
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
 # ==================== BILLING ====================
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def generate_bill(request):
     """
     ✅ FIXED - Generate bill for a table (only unbilled served orders)
@@ -544,43 +1582,46 @@ def generate_bill(request):
         table = Table.objects.get(id=table_id)
         
         # ✅ FIXED - Check for UNBILLED served orders only
-        unbilled_orders = list(
-            table.orders.filter(status='Served', is_billed=False)
-        )
-        
-        if not unbilled_orders:
-            return Response({
-                'success': False,
-                'message': 'No unbilled served orders found for this table'
-            }, status=400)
-        
-        # Create bill
-        bill = Bill.objects.create(
-            table=table,
-            generated_by=request.user,
-            status='Pending Payment'
-        )
-        
-        # ✅ Calculate bill (this will mark orders as billed)
-        total = bill.calculate_bill()
-        
-        if total == Decimal('0.00'):
-            bill.delete()
-            return Response({
-                'success': False,
-                'message': 'No items to bill'
-            }, status=400)
-        
-        # Get all items for response
-        items_data = []
-        for order in unbilled_orders:
-            for item in order.order_items.all():
-                items_data.append({
-                    'name': item.menu_item.name,
-                    'quantity': item.quantity,
-                    'price': str(item.price_at_order),
-                    'subtotal': str(item.subtotal)
-                })
+        if not table.orders.filter(status='Served', is_billed=False).exists():
+            return Response({
+                'success': False,
+                'message': 'No unbilled served orders found for this table'
+            }, status=400)
+        
+        with outlet_atomic():
+            # Create bill
+            bill = Bill.objects.create(
+                table=table,
+                generated_by=request.user,
+                status='Pending Payment'
+            )
+            
+            # ✅ Calculate bill (this will mark orders as billed)
+            total = bill.calculate_bill()
+            
+            if total == Decimal('0.00'):
+                bill.delete()
+                return Response({
+                    'success': False,
+                    'message': 'No items to bill'
+                }, status=400)
+            
+            # The orders calculate_bill() locked and billed, not the ones seen
+            # above: an order served or billed meanwhile would differ
+            record_events([bill_event(
+                'bill_generated', bill, bill.billed_order_ids, request.user
+            )])
+            
+            # Get all items for response
+            items_data = []
+            for order in Order.objects.filter(id__in=bill.billed_order_ids).prefetch_related('order_items__menu_item'):
+                for item in order.order_items.all():
+                    items_data.append({
+                        'name': item.menu_item.name,
+                        'quantity': item.quantity,
+                        'price': str(item.price_at_order),
+                        'subtotal': str(item.subtotal)
+                    })
         
         return Response({
             'success': True,
@@ -622,42 +1663,29 @@ def get_tables_ready_for_bill(request):
                 'message': 'Only Cashier can view this'
             }, status=403)
         
-        tables_ready = []
+        # Unbilled served orders per table, summed in one query
+        unbilled = {
+            row['table_id']: row
+            for row in Order.objects.filter(
+                status='Served', is_billed=False, table__status__in=['Bill Requested', 'Occupied']
+            ).order_by().values('table_id').annotate(total=Sum('total_amount'), orders_count=Count('id'))
+        }
+        tables = Table.objects.filter(id__in=list(unbilled))
         
         # Priority 1: Tables with "Bill Requested" status
-        bill_requested_tables = Table.objects.filter(status='Bill Requested')
-        
-        for table in bill_requested_tables:
-            unbilled_served_orders = table.orders.filter(status='Served', is_billed=False)
-            
-            if unbilled_served_orders.exists():
-                total = sum(order.total_amount for order in unbilled_served_orders)
-                
-                tables_ready.append({
-                    'table_id': table.id,
-                    'table_number': table.table_number,
-                    'seating_capacity': table.seating_capacity,
-                    'status': table.status,
-                    'total_amount': str(total),
-                    'orders_count': unbilled_served_orders.count()
-                })
-        
         # Priority 2: Occupied tables with unbilled served orders (backup)
-        occupied_tables = Table.objects.filter(status='Occupied')
-        
-        for table in occupied_tables:
-            unbilled_served_orders = table.orders.filter(status='Served', is_billed=False)
-            
-            if unbilled_served_orders.exists():
-                total = sum(order.total_amount for order in unbilled_served_orders)
-                
+        tables_ready = []
+        for status in ['Bill Requested', 'Occupied']:
+            for table in tables:
+                if table.status != status:
+                    continue
                 tables_ready.append({
                     'table_id': table.id,
                     'table_number': table.table_number,
                     'seating_capacity': table.seating_capacity,
                     'status': table.status,
-                    'total_amount': str(total),
-                    'orders_count': unbilled_served_orders.count()
+                    'total_amount': str(unbilled[table.id]['total']),
+                    'orders_count': unbilled[table.id]['orders_count']
                 })
         
         return Response({
@@ -685,16 +1713,17 @@ def get_bill_details(request, bill_id):
                 'message': 'Only Cashier can view bills'
             }, status=403)
         
-        bill = Bill.objects.get(id=bill_id)
+        # Falls back to the archive for bills moved out of the live tables
+        bill = get_bill_or_archived(bill_id)
         
         # Get all items from the bill's orders
         items_data = []
-        orders = bill.orders.all()
+        orders = bill.orders.prefetch_related('order_items__menu_item')
 
         for order in orders:
             for item in order.order_items.all():
                 items_data.append({
-                    'name': item.menu_item.name,
+                    'name': menu_item_label(item),
                     'quantity': item.quantity,
                     'price': str(item.price_at_order),
                     'subtotal': str(item.subtotal)
@@ -704,7 +1733,7 @@ def get_bill_details(request, bill_id):
             'success': True,
             'data': {
                 'bill_id': bill.id,
-                'table': bill.table.table_number,
+                'table': table_label(bill),
                 'items': items_data,
                 'subtotal': str(bill.subtotal),
                 'tax_percentage': str(bill.tax_percentage),
@@ -726,6 +1755,60 @@ def get_bill_details(request, bill_id):
             'message': str(e)
         }, status=500)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_bill_receipt(request, bill_id):
+    """
+    Rendered receipt for a bill
+    Query params: output = text (default) | escpos | pdf, width = 32 | 42 | 48 characters
+    Access: Cashier only
+    """
+    try:
+        if request.user.profile.role_id != 4:
+            return Response({
+                'success': False,
+                'message': 'Only Cashier can print receipts'
+            }, status=403)
+        
+        output = request.query_params.get('output', 'text')
+        if output not in RECEIPT_OUTPUTS:
+            return Response({
+                'success': False,
+                'message': f"Invalid output. Choose from: {', '.join(RECEIPT_OUTPUTS)}"
+            }, status=400)
+        
+        try:
+            width = int(request.query_params.get('width', DEFAULT_RECEIPT_WIDTH))
+        except ValueError:
+            width = None
+        if width not in RECEIPT_WIDTHS:
+            return Response({
+                'success': False,
+                'message': f"Invalid width. Choose from: {', '.join(map(str, RECEIPT_WIDTHS))}"
+            }, status=400)
+        
+        bill = get_bill_or_archived(bill_id)
+        rendered = render_bill_receipt(bill, output, width)
+        
+        response = HttpResponse(rendered, content_type=RECEIPT_CONTENT_TYPES[output])
+        if output == 'escpos':
+            response['Content-Disposition'] = f'attachment; filename="receipt-{bill.id}.bin"'
+        elif output == 'pdf':
+            response['Content-Disposition'] = f'inline; filename="receipt-{bill.id}.pdf"'
+        return response
+        
+    except Bill.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': 'Bill not found'
+        }, status=404)
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_cashier_stats(request):
@@ -753,23 +1836,22 @@ def get_cashier_stats(request):
             generated_at__range=(today_start, today_end)
         )
         
-        # Calculate stats
-        pending_bills = today_bills.filter(status='Pending Payment')
-        paid_bills = today_bills.filter(status='Paid')
-        
-        # Calculate today's revenue (only paid bills)
-        today_revenue = sum(
-            Decimal(bill.total_amount) 
-            for bill in paid_bills
+        # Calculate stats in one query; revenue (paid bills only) is an integer SUM of paise
+        stats = today_bills.aggregate(
+            today_revenue=Sum('total_amount', filter=Q(status='Paid')),
+            bills_pending=Count('id', filter=Q(status='Pending Payment')),
+            bills_paid=Count('id', filter=Q(status='Paid')),
+            total_bills=Count('id'),
         )
+        today_revenue = stats['today_revenue'] if stats['today_revenue'] is not None else 0
         
         return Response({
             'success': True,
             'data': {
                 'today_revenue': str(today_revenue),
-                'bills_pending': pending_bills.count(),
-                'bills_paid': paid_bills.count(),
-                'total_bills': today_bills.count()
+                'bills_pending': stats['bills_pending'],
+                'bills_paid': stats['bills_paid'],
+                'total_bills': stats['total_bills']
             }
         })
         
@@ -782,6 +1864,7 @@ def get_cashier_stats(request):
 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def mark_bill_paid(request, bill_id):
     """
     Mark bill as paid
@@ -798,9 +1881,13 @@ def mark_bill_paid(request, bill_id):
         
         bill = Bill.objects.get(id=bill_id)
         
-        bill.status = 'Paid'
-        bill.paid_at = timezone.now()
-        bill.save()
+        with outlet_atomic():
+            bill.status = 'Paid'
+            bill.paid_at = timezone.now()
+            bill.save()
+            record_events([bill_event(
+                'bill_paid', bill, bill.orders.values_list('id', flat=True), request.user
+            )])
         
         # Signal will auto-change table status to Available
         
@@ -827,10 +1914,24 @@ def mark_bill_paid(request, bill_id):
         }, status=500)
 
 
+PENDING_BILL_FIELDS = Fieldset(
+    id=Field('id'),
+    table=Field('table__table_number'),
+    subtotal=money('subtotal'),
+    tax_amount=money('tax_amount'),
+    total_amount=money('total_amount'),
+    status=Field('status'),
+    generated_at=Field('generated_at'),
+)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_pending_bills(request):
-    """Get all pending bills - Cashier access"""
+    """
+    Get all pending bills - Cashier access
+    Supports ?fields= (see restaurant/fieldsets.py)
+    """
     try:
         if request.user.profile.role_id != 4:
             return Response({
@@ -838,25 +1939,20 @@ def get_pending_bills(request):
                 'message': 'Only Cashier can view bills'
             }, status=403)
         
-        bills = Bill.objects.filter(status='Pending Payment')
-        
-        bills_data = []
-        for bill in bills:
-            bills_data.append({
-                'id': bill.id,
-                'table': bill.table.table_number,
-                'subtotal': str(bill.subtotal),
-                'tax_amount': str(bill.tax_amount),
-                'total_amount': str(bill.total_amount),
-                'status': bill.status,
-                'generated_at': bill.generated_at
-            })
+        bills_data = PENDING_BILL_FIELDS.apply(
+            request, Bill.objects.filter(status='Pending Payment')
+        )
         
         return Response({
             'success': True,
             'data': bills_data
         })
         
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=400)
     except Exception as e:
         return Response({
             'success': False,
@@ -870,8 +1966,9 @@ def get_pending_bills(request):
 @permission_classes([IsAuthenticated])
 def get_overdue_bills(request):
     """
-    Get bills pending for more than 30 minutes
+    Get bills pending for more than OVERDUE_BILL_MINUTES (default 30)
     Requirement #5: Alert manager
+    Served from the in-memory overdue set kept by the scheduler (no DB scan)
     """
     try:
         if request.user.profile.role_id != 2:  # Manager only
@@ -880,27 +1977,7 @@ def get_overdue_bills(request):
                 'message': 'Manager only'
             }, status=403)
         
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        # Get bills pending for more than 30 minutes
-        threshold = timezone.now() - timedelta(minutes=1)
-        overdue_bills = Bill.objects.filter(
-            status='Pending Payment',
-            generated_at__lt=threshold
-        )
-        
-        bills_data = []
-        for bill in overdue_bills:
-            minutes_pending = (timezone.now() - bill.generated_at).total_seconds() / 60
-            
-            bills_data.append({
-                'id': bill.id,
-                'table': bill.table.table_number,
-                'total_amount': str(bill.total_amount),
-                'minutes_pending': int(minutes_pending),
-                'generated_at': bill.generated_at
-            })
+        bills_data = get_scheduler().overdue_bills(get_current_outlet().id)
         
         return Response({
             'success': True,
@@ -913,4 +1990,299 @@ def get_overdue_bills(request):
             'success': False,
             'message': str(e)
         }, status=500)
-    
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([EventStreamRenderer, JSONRenderer])
+def stream_overdue_bills(request):
+    """
+    Server-sent events for overdue bills
+    Events: snapshot (current overdue list), overdue (bill crossed the
+    threshold), cleared (overdue bill paid)
+    Access: Manager only
+    """
+    try:
+        if request.user.profile.role_id != 2:  # Manager only
+            return Response({
+                'success': False,
+                'message': 'Manager only'
+            }, status=403)
+
+        response = StreamingHttpResponse(
+            event_stream(
+                get_scheduler(),
+                JSONEncoder(separators=(',', ':')),
+                outlet_id=get_current_outlet().id
+            ),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+# ==================== ORDER EVENTS ====================
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_order_events(request):
+    """
+    Tail the order event journal: events with a sequence above ?after=, oldest first
+    Query params: after (last sequence seen, default 0), limit (max 1000)
+    Store "next" and pass it as ?after= on the next poll.
+    Access: Admin, Manager
+    """
+    try:
+        if request.user.profile.role_id not in [1, 2]:
+            return Response({
+                'success': False,
+                'message': 'Only Admin and Manager can read order events'
+            }, status=403)
+        
+        try:
+            after = int(request.query_params.get('after', 0))
+            limit = min(int(request.query_params.get('limit', 500)), 1000)
+        except ValueError:
+            return Response({
+                'success': False,
+                'message': 'after and limit must be integers'
+            }, status=400)
+        
+        events = read_events(after, max(limit, 1))
+        
+        return Response({
+            'success': True,
+            'count': len(events),
+            'next': events[-1].id if events else after,
+            'data': [serialize_event(event) for event in events]
+        })
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+# ==================== OFFLINE SYNC ====================
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def sync_batch(request):
+    """
+    Apply operations queued by an offline tablet and return server changes
+    Body: {
+        "cursor": "<cursor from the previous sync, optional>",
+        "operations": [
+            {"client_uuid": "...", "type": "create_order", "client_timestamp": "...",
+             "payload": {"table_id": 1, "items": [{"menu_item_id": 1, "quantity": 2}]}},
+            {"client_uuid": "...", "type": "update_order_status", "client_timestamp": "...",
+             "payload": {"order_id": 5 | "order_client_uuid": "...", "status": "Served"}}
+        ]
+    }
+    Access: Waiter only
+    All operations are applied in one transaction; replays (same client_uuid)
+    return the stored result with status "duplicate"
+    """
+    try:
+        if request.user.profile.role_id != 3:
+            return Response({
+                'success': False,
+                'message': 'Only Waiter can sync orders'
+            }, status=403)
+
+        operations = request.data.get('operations', [])
+        if not isinstance(operations, list):
+            return Response({
+                'success': False,
+                'message': 'operations must be a list'
+            }, status=400)
+
+        max_operations = getattr(settings, 'SYNC_MAX_OPERATIONS', 500)
+        if len(operations) > max_operations:
+            return Response({
+                'success': False,
+                'message': f'At most {max_operations} operations per sync'
+            }, status=400)
+
+        since = None
+        if request.data.get('cursor'):
+            try:
+                since = decode_cursor(request.data.get('cursor'))
+            except ValueError as e:
+                return Response({
+                    'success': False,
+                    'message': str(e)
+                }, status=400)
+
+        results = apply_sync_batch(request.user, operations)
+        changes, cursor = collect_changes(since)
+
+        return Response({
+            'success': True,
+            'data': {
+                'results': results,
+                'changes': changes,
+                'cursor': cursor
+            }
+        })
+
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+# ==================== EXPORTS ====================
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_data(request, export_name):
+    """
+    Stream bills / orders / order items for accounting
+    Query params: output=csv|ndjson, from, to (date or datetime),
+                  status, gzip=1
+    Access: Admin and Manager
+    Rows are streamed in keyset chunks, so memory stays constant
+    """
+    try:
+        if request.user.profile.role_id not in [1, 2]:
+            return Response({
+                'success': False,
+                'message': 'Only Admin or Manager can export data'
+            }, status=403)
+
+        if export_name not in EXPORTS:
+            return Response({
+                'success': False,
+                'message': f"Unknown export. Choose from: {', '.join(EXPORTS)}"
+            }, status=404)
+
+        export_format = request.query_params.get('output', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response({
+                'success': False,
+                'message': 'Output must be csv or ndjson'
+            }, status=400)
+
+        try:
+            date_from = parse_export_bound(request.query_params.get('from'))
+            date_to = parse_export_bound(request.query_params.get('to'), end_of_day=True)
+        except ValueError as e:
+            return Response({
+                'success': False,
+                'message': str(e)
+            }, status=400)
+
+        compress = request.query_params.get('gzip') in ['1', 'true']
+
+        # The body is produced after the view returns: keep the outlet bound
+        response = StreamingHttpResponse(
+            bind_outlet(get_current_outlet(), stream_export(
+                export_name,
+                export_format=export_format,
+                date_from=date_from,
+                date_to=date_to,
+                status=request.query_params.get('status'),
+                compress=compress,
+            )),
+            content_type=export_content_type(export_format, compress),
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{export_filename(export_name, export_format, compress)}"'
+        )
+        return response
+
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+# ==================== PROFILING ====================
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_profiles(request):
+    """
+    Stored request profiles, newest first (without stacks and queries)
+    Profile a request with ?profile=sampling|deterministic (see restaurant/profiling.py)
+    Access: Admin and Manager
+    """
+    try:
+        if request.user.profile.role_id not in [1, 2]:
+            return Response({
+                'success': False,
+                'message': 'Only Admin or Manager can view profiles'
+            }, status=403)
+
+        profiles = list_profiles()
+
+        return Response({
+            'success': True,
+            'count': len(profiles),
+            'data': profiles
+        })
+
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def download_profile(request, profile_id):
+    """
+    One stored profile
+    Query params: output = json (default, with the SQL list) | collapsed | speedscope
+    Access: Admin and Manager
+    """
+    try:
+        if request.user.profile.role_id not in [1, 2]:
+            return Response({
+                'success': False,
+                'message': 'Only Admin or Manager can view profiles'
+            }, status=403)
+
+        output = request.query_params.get('output', 'json')
+        if output not in PROFILE_FORMATS:
+            return Response({
+                'success': False,
+                'message': f"Invalid output. Choose from: {', '.join(PROFILE_FORMATS)}"
+            }, status=400)
+
+        profile = load_profile(profile_id)
+
+        if output == 'collapsed':
+            response = HttpResponse(to_collapsed(profile), content_type='text/plain; charset=utf-8')
+            response['Content-Disposition'] = f'attachment; filename="profile-{profile_id}.txt"'
+            return response
+        if output == 'speedscope':
+            response = HttpResponse(json.dumps(to_speedscope(profile)), content_type='application/json')
+            response['Content-Disposition'] = f'attachment; filename="profile-{profile_id}.speedscope.json"'
+            return response
+
+        return Response({
+            'success': True,
+            'data': profile
+        })
+
+    except FileNotFoundError:
+        return Response({
+            'success': False,
+            'message': 'Profile not found'
+        }, status=404)
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=500)